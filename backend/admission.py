@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict
+
+
+@dataclass(frozen=True)
+class ClassLimits:
+    """Concurrency cap, queue length and queue timeout of one request class."""
+
+    concurrency: int
+    max_queue: int
+    timeout_s: float
+
+
+class Overloaded(Exception):
+    """A request was not admitted: its queue is full or it waited too long."""
+
+    def __init__(self, klass: str, reason: str, retry_after_s: int) -> None:
+        super().__init__(f"{klass} requests overloaded ({reason})")
+        self.klass = klass
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class _ClassState:
+    def __init__(self, limits: ClassLimits) -> None:
+        self.limits = limits
+        self.running = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.max_queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+        self.service_s_total = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.limits.concurrency,
+            "queueLimit": self.limits.max_queue,
+            "timeoutSeconds": self.limits.timeout_s,
+            "running": self.running,
+            "queued": len(self.waiters),
+            "maxQueued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timedOut": self.timed_out,
+            "waitSecondsAvg": (
+                self.wait_s_total / self.admitted if self.admitted else 0.0
+            ),
+            "waitSecondsMax": self.wait_s_max,
+            "serviceSecondsAvg": (
+                self.service_s_total / self.completed if self.completed else 0.0
+            ),
+        }
+
+
+class AdmissionController:
+    """Per-class concurrency caps over a shared pool of `total` slots.
+
+    Classes are listed in priority order: when a slot frees up, queued
+    requests of earlier classes are started first. A request that finds its
+    class's queue full, or is still queued after the class timeout, raises
+    Overloaded with a Retry-After estimate. Used from the event loop only.
+    """
+
+    def __init__(self, classes: Dict[str, ClassLimits], *, total: int) -> None:
+        self.total = max(1, total)
+        self._classes = {k: _ClassState(v) for k, v in classes.items()}
+        self._running = 0
+
+    @asynccontextmanager
+    async def slot(self, klass: str) -> AsyncIterator[None]:
+        state = self._classes[klass]
+        t0 = time.perf_counter()
+        if self._may_start(klass):
+            self._start(state)
+        else:
+            await self._wait(klass, state)
+        wait_s = time.perf_counter() - t0
+        state.admitted += 1
+        state.wait_s_total += wait_s
+        state.wait_s_max = max(state.wait_s_max, wait_s)
+
+        t1 = time.perf_counter()
+        try:
+            yield
+        finally:
+            state.completed += 1
+            state.service_s_total += time.perf_counter() - t1
+            self._release(state)
+
+    def stats(self) -> dict:
+        return {
+            "totalSlots": self.total,
+            "running": self._running,
+            "classes": {k: s.stats() for k, s in self._classes.items()},
+        }
+
+    def _may_start(self, klass: str) -> bool:
+        if self._running >= self.total:
+            return False
+        for k, s in self._classes.items():
+            if k == klass:
+                return s.running < s.limits.concurrency and not s.waiters
+            if s.waiters and s.running < s.limits.concurrency:
+                # A higher-priority request is waiting for this slot.
+                return False
+        return False
+
+    async def _wait(self, klass: str, state: _ClassState) -> None:
+        if len(state.waiters) >= state.limits.max_queue:
+            state.rejected += 1
+            raise Overloaded(klass, "queue full", self._retry_after(state))
+
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.append(future)
+        state.max_queued = max(state.max_queued, len(state.waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), state.limits.timeout_s)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up: hand the slot on.
+                self._release(state)
+            else:
+                future.cancel()
+                state.waiters.remove(future)
+            if isinstance(e, asyncio.TimeoutError):
+                state.timed_out += 1
+                raise Overloaded(klass, "queue timeout", self._retry_after(state))
+            raise
+
+    def _start(self, state: _ClassState) -> None:
+        state.running += 1
+        self._running += 1
+
+    def _release(self, state: _ClassState) -> None:
+        state.running -= 1
+        self._running -= 1
+        self._grant()
+
+    def _grant(self) -> None:
+        for state in self._classes.values():
+            while (
+                state.waiters
+                and self._running < self.total
+                and state.running < state.limits.concurrency
+            ):
+                future = state.waiters.popleft()
+                self._start(state)
+                future.set_result(None)
+
+    @staticmethod
+    def _retry_after(state: _ClassState) -> int:
+        service_s = state.service_s_total / state.completed if state.completed else 1.0
+        backlog = (len(state.waiters) + state.running) / state.limits.concurrency
+        return int(min(60, max(1, math.ceil(service_s * backlog))))
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+# (mtime_ns, size) of a source file. Two stats with the same fingerprint are
+# assumed to describe the same file contents.
+Fingerprint = Tuple[int, int]
+
+
+def file_fingerprint(path: Path) -> Fingerprint:
+    st = os.stat(path)
+    return (int(st.st_mtime_ns), int(st.st_size))
+
+
+def nbytes_of(value: Any) -> int:
+    """Approximate memory held by a cached value (arrays and containers of arrays)."""
+
+    if isinstance(value, np.ndarray):
+        # Memory-mapped arrays are backed by the page cache, not the heap.
+        if isinstance(value, np.memmap) or isinstance(value.base, np.memmap):
+            return 0
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(nbytes_of(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes_of(v) for v in value)
+    if hasattr(value, "__dataclass_fields__"):
+        return sum(nbytes_of(getattr(value, f)) for f in value.__dataclass_fields__)
+    return 0
+
+
+def _freeze(value: Any) -> Any:
+    # Cached arrays are shared between requests; make accidental in-place
+    # writes fail loudly instead of corrupting other callers' data.
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    elif hasattr(value, "__dataclass_fields__"):
+        for f in value.__dataclass_fields__:
+            _freeze(getattr(value, f))
+    return value
+
+
+@dataclass
+class _Entry:
+    fingerprint: Fingerprint
+    value: Any
+    nbytes: int
+
+
+class ArrayCache:
+    """Process-wide LRU cache of values derived from dataset files.
+
+    Entries are keyed on (path, tag) and validated against the file's
+    (mtime, size) on every lookup, so an edited file is re-parsed on the next
+    access. The total size of cached arrays is bounded by `max_bytes`; least
+    recently used entries are evicted first.
+
+    Loads are single-flight: concurrent misses on the same key with the same
+    fingerprint wait for the first caller's parse instead of starting their
+    own, and get its result (or exception).
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[tuple[str, Hashable], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._inflight: dict[tuple[str, Hashable], tuple[Fingerprint, Future]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        with self._lock:
+            self._max_bytes = max(0, int(value))
+            self._evict()
+
+    @property
+    def current_bytes(self) -> int:
+        return self._bytes
+
+    def get(
+        self,
+        path: Path,
+        loader: Callable[[Path], T],
+        *,
+        tag: Hashable = None,
+    ) -> T:
+        key = (str(path), tag)
+        fp = file_fingerprint(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.fingerprint == fp:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                self._drop(key)
+            pending = self._inflight.get(key)
+            if pending is not None and pending[0] == fp:
+                self.coalesced += 1
+                future = pending[1]
+            else:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = (fp, future)
+                pending = None
+
+        if pending is not None:
+            return future.result()
+
+        # Parse outside the lock so unrelated files can load concurrently.
+        try:
+            value = _freeze(loader(path))
+        except BaseException as e:
+            with self._lock:
+                self._finish(key, future)
+            future.set_exception(e)
+            raise
+        size = nbytes_of(value)
+
+        with self._lock:
+            self._finish(key, future)
+            if size <= self._max_bytes:
+                if key in self._entries:
+                    self._drop(key)
+                self._entries[key] = _Entry(fingerprint=fp, value=value, nbytes=size)
+                self._bytes += size
+                self._evict()
+        future.set_result(value)
+        return value
+
+    def peek(self, path: Path, *, tag: Hashable = None) -> Optional[Any]:
+        """The cached value if present and fresh; never loads or counts stats."""
+
+        key = (str(path), tag)
+        try:
+            fp = file_fingerprint(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.fingerprint != fp:
+                return None
+            return entry.value
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            p = str(path)
+            for key in [k for k in self._entries if k[0] == p]:
+                self._drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+                "evictions": self.evictions,
+            }
+
+    def _finish(self, key: tuple[str, Hashable], future: Future) -> None:
+        # A newer load for a changed file may have replaced this one.
+        pending = self._inflight.get(key)
+        if pending is not None and pending[1] is future:
+            del self._inflight[key]
+
+    def _drop(self, key: tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
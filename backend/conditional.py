@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from starlette.requests import Request
+
+from .cache import Fingerprint, file_fingerprint
+
+# Bump when response bodies change for the same inputs (e.g. a new field),
+# so clients do not keep revalidating stale copies.
+ETAG_VERSION = 1
+
+# Clients may store responses but must revalidate them on every use; with
+# the validators below that costs a few stat() calls on the server.
+CACHE_CONTROL = "private, no-cache"
+
+
+def source_fingerprints(paths: Iterable[Path]) -> list[Optional[Fingerprint]]:
+    """(mtime, size) of each path, None for missing files."""
+
+    out: list[Optional[Fingerprint]] = []
+    for p in paths:
+        try:
+            out.append(file_fingerprint(p))
+        except OSError:
+            out.append(None)
+    return out
+
+
+def response_validators(
+    request: Request,
+    fingerprints: Sequence[Optional[Fingerprint]],
+    *,
+    key: str = "",
+    weak: bool = False,
+) -> dict[str, str]:
+    """ETag, Last-Modified and caching headers for a response built from files.
+
+    The ETag covers the path, every query parameter, the Accept header (it
+    selects JSON or binary), `key` (other inputs, e.g. trip ids) and the
+    fingerprint of every source file.
+    """
+
+    h = hashlib.sha1()
+    h.update(f"v{ETAG_VERSION}\0{request.url.path}\0".encode("utf-8"))
+    for k, v in sorted(request.query_params.multi_items()):
+        h.update(f"{k}={v}\0".encode("utf-8"))
+    h.update(f"{request.headers.get('accept', '')}\0{key}\0".encode("utf-8"))
+    for fp in fingerprints:
+        h.update(b"-\0" if fp is None else f"{fp[0]}:{fp[1]}\0".encode("utf-8"))
+    etag = f'"{h.hexdigest()}"'
+
+    headers = {
+        "ETag": f"W/{etag}" if weak else etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept",
+    }
+    mtimes = [fp[0] for fp in fingerprints if fp is not None]
+    if mtimes:
+        headers["Last-Modified"] = formatdate(max(mtimes) / 1e9, usegmt=True)
+    return headers
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, validators: dict[str, str]) -> bool:
+    """Whether the client copy named by If-None-Match/If-Modified-Since is current."""
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence; GET uses the weak comparison.
+        if if_none_match.strip() == "*":
+            return True
+        etag = _opaque(validators["ETag"])
+        return any(_opaque(t) == etag for t in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = validators.get("Last-Modified")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+                if_modified_since
+            )
+        except (TypeError, ValueError):
+            return False
+    return False
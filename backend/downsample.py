@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Literal, Sequence
+
+import numpy as np
+
+DownsampleMethod = Literal["minmax", "lttb", "stride"]
+
+
+def _stride_indices(n: int, max_points: int) -> np.ndarray:
+    step = -(-n // max_points)
+    return np.arange(0, n, step)
+
+
+def _minmax_indices(
+    n: int, values: Sequence[np.ndarray], max_points: int
+) -> np.ndarray:
+    # Every bucket contributes the positions of its min and max for each
+    # channel, so n_buckets * 2 * channels (+ endpoints) stays <= max_points.
+    n_buckets = max(1, (max_points - 2) // (2 * max(1, len(values))))
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+    starts = np.arange(n_buckets) * size
+
+    picks = [np.array([0, n - 1])]
+    for v in values:
+        v = np.asarray(v, dtype=float)
+        # NaNs never win a bucket; an all-NaN bucket falls back to its first row.
+        lo = np.where(np.isnan(v), np.inf, v)
+        hi = np.where(np.isnan(v), -np.inf, v)
+        if pad:
+            lo = np.concatenate([lo, np.full(pad, np.inf)])
+            hi = np.concatenate([hi, np.full(pad, -np.inf)])
+        picks.append(starts + np.argmin(lo.reshape(n_buckets, size), axis=1))
+        picks.append(starts + np.argmax(hi.reshape(n_buckets, size), axis=1))
+
+    idx = np.unique(np.concatenate(picks))
+    return idx[idx < n]
+
+
+def _lttb_indices(t: np.ndarray, v: np.ndarray, max_points: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets (Steinarsson, 2013): keep the endpoints
+    # and, per bucket, the point forming the largest triangle with the
+    # previously kept point and the average of the next bucket.
+    n = t.shape[0]
+    t = np.asarray(t, dtype=float)
+    v = np.nan_to_num(np.asarray(v, dtype=float), nan=0.0)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+
+    out = np.empty(max_points, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], max(edges[i] + 1, edges[i + 1])
+        nlo, nhi = edges[i + 1], (edges[i + 2] if i + 2 < edges.shape[0] else n)
+        nhi = max(nlo + 1, nhi)
+        avg_t = t[nlo:nhi].mean()
+        avg_v = v[nlo:nhi].mean()
+        area = np.abs(
+            (t[a] - avg_t) * (v[lo:hi] - v[a]) - (t[a] - t[lo:hi]) * (avg_v - v[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return np.unique(out)
+
+
+def downsample_indices(
+    t: np.ndarray,
+    values: Sequence[np.ndarray],
+    max_points: int,
+    method: DownsampleMethod = "minmax",
+) -> np.ndarray:
+    """Row indices of at most `max_points` samples that keep the series shape.
+
+    - `minmax`: per-bucket min and max of every channel in `values`, so peaks
+      (e.g. harsh braking in x_kf) survive.
+    - `lttb`: Largest-Triangle-Three-Buckets on the first channel.
+    - `stride`: evenly spaced rows, like the `downsample` parameter.
+    """
+
+    n = int(t.shape[0])
+    if max_points < 2:
+        raise ValueError("max_points must be >= 2")
+    if n <= max_points:
+        return np.arange(n)
+    if method == "stride":
+        return _stride_indices(n, max_points)
+    if method == "minmax":
+        idx = _minmax_indices(n, values, max_points)
+        # Tiny budgets cannot hold a min and a max per channel.
+        return idx if idx.shape[0] <= max_points else _stride_indices(n, max_points)
+    if method == "lttb":
+        if not values:
+            return _stride_indices(n, max_points)
+        return _lttb_indices(t, values[0], max_points)
+    raise ValueError(f"Unknown downsample method: {method}")
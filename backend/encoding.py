@@ -0,0 +1,117 @@
+"""Binary column encoding for time-series responses.
+
+Layout (all integers little-endian):
+
+    0   4 bytes   magic b"UAHB"
+    4   uint32    header length H
+    8   H bytes   UTF-8 JSON header, space-padded so the data starts 8-aligned
+    ..  buffers   one per column, each starting on an 8-byte boundary
+
+The header is `{"version": 1, "meta": {...}, "columns": [...]}` where each
+column is `{"name", "dtype" ("<f4" | "<f8"), "length", "offset", "byteLength",
+"delta"}` and `offset` is relative to the start of the data section. A
+`delta` column stores `x[0], x[1]-x[0], ...` of the values rounded to its
+dtype; decode with a running sum in f64 to get those rounded values back. A
+delta column may be "<f8" in an f32 payload when its steps do not fit f32.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Iterable, Literal, Mapping
+
+import numpy as np
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+FORMAT_VERSION = 1
+
+Precision = Literal["f32", "f64"]
+
+_MAGIC = b"UAHB"
+_ALIGN = 8
+_DTYPES: dict[str, str] = {"f32": "<f4", "f64": "<f8"}
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def _deltas(a: np.ndarray, dtype: str) -> tuple[np.ndarray, str]:
+    # Differences of the values as rounded to `dtype`, so the reader's f64
+    # running sum lands on those rounded values instead of drifting with the
+    # rounding error of every delta. Close neighbours subtract exactly in
+    # f32; if some delta does not fit, the column is sent as f64.
+    q = a.astype(dtype).astype(float)
+    d = np.diff(q, prepend=0.0)
+    if dtype != "<f8" and not np.array_equal(
+        np.cumsum(d.astype(dtype).astype(float)), q
+    ):
+        return d, "<f8"
+    return d, dtype
+
+
+def encode_columns(
+    meta: Mapping[str, object],
+    columns: Mapping[str, np.ndarray],
+    *,
+    precision: Precision = "f64",
+    delta: Iterable[str] = (),
+) -> bytes:
+    """Encode `columns` as raw little-endian buffers behind a small JSON header."""
+
+    dtype = _DTYPES[precision]
+    delta_names = set(delta)
+
+    buffers: list[bytes] = []
+    specs: list[dict] = []
+    offset = 0
+    for name, arr in columns.items():
+        a = np.asarray(arr, dtype=float)
+        # A NaN would poison the running sum from there on.
+        is_delta = name in delta_names and a.shape[0] > 0 and np.isfinite(a).all()
+        col_dtype = dtype
+        if is_delta:
+            a, col_dtype = _deltas(a, dtype)
+        raw = a.astype(col_dtype, copy=False).tobytes()
+        specs.append(
+            {
+                "name": name,
+                "dtype": col_dtype,
+                "length": int(a.shape[0]),
+                "offset": offset,
+                "byteLength": len(raw),
+                "delta": bool(is_delta),
+            }
+        )
+        buffers.append(raw + b"\0" * _pad(len(raw)))
+        offset += len(buffers[-1])
+
+    header = json.dumps(
+        {"version": FORMAT_VERSION, "meta": dict(meta), "columns": specs},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    header += b" " * _pad(len(_MAGIC) + 4 + len(header))
+
+    return b"".join([_MAGIC, struct.pack("<I", len(header)), header, *buffers])
+
+
+def decode_columns(payload: bytes) -> tuple[dict, dict[str, np.ndarray]]:
+    """Inverse of `encode_columns` (used by tools and benchmarks)."""
+
+    if payload[:4] != _MAGIC:
+        raise ValueError("Not a UAHB payload")
+    (header_len,) = struct.unpack_from("<I", payload, 4)
+    start = 8 + header_len
+    header = json.loads(payload[8:start].decode("utf-8"))
+
+    out: dict[str, np.ndarray] = {}
+    for spec in header["columns"]:
+        a = np.frombuffer(
+            payload,
+            dtype=spec["dtype"],
+            count=spec["length"],
+            offset=start + spec["offset"],
+        ).astype(float)
+        out[spec["name"]] = np.cumsum(a) if spec["delta"] else a
+    return header["meta"], out
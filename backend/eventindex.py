@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache import Fingerprint, file_fingerprint
+from .parsing import parse_event_file
+from .trips import TripIndex
+
+
+def event_type(file_name: str) -> str:
+    """`EVENTS_LIST_LANE_CHANGES.txt` -> `LANE_CHANGES`."""
+
+    stem = file_name.split(".", 1)[0]
+    for prefix in ("EVENTS_LIST_", "EVENTS_"):
+        if stem.startswith(prefix):
+            return stem[len(prefix) :]
+    return stem
+
+
+# `direction` of events whose file has none.
+NO_DIRECTION = -128
+
+
+def _driver_of(trip_id: str) -> str:
+    return trip_id.split("|")[0] or "(unknown)"
+
+
+@dataclass(frozen=True)
+class EventIndex:
+    """Every event of every trip as parallel arrays (one entry per event).
+
+    String fields are stored as integer codes into the vocabularies
+    (`trip_ids`, `drivers`, `types`, `labels`). `direction` is NO_DIRECTION
+    and `duration` NaN where the source file has none.
+    """
+
+    trip_ids: Tuple[str, ...]
+    drivers: Tuple[str, ...]
+    types: Tuple[str, ...]
+    labels: Tuple[str, ...]
+    trip_driver: np.ndarray
+    trip: np.ndarray
+    t: np.ndarray
+    type: np.ndarray
+    label: np.ndarray
+    direction: np.ndarray
+    duration: np.ndarray
+    sources: Dict[str, Fingerprint]
+
+    @property
+    def n_events(self) -> int:
+        return int(self.t.shape[0])
+
+    def query(
+        self,
+        *,
+        types: Sequence[str] = (),
+        drivers: Sequence[str] = (),
+        trip_ids: Sequence[str] = (),
+        direction: Optional[int] = None,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None,
+        t_start: Optional[float] = None,
+        t_end: Optional[float] = None,
+    ) -> np.ndarray:
+        """Positions of the matching events, ordered by trip and time.
+
+        Every given filter must match. `types` accepts `LANE_CHANGES` or the
+        file stem `EVENTS_LIST_LANE_CHANGES`. Durations: `min_duration <= d
+        < max_duration`; events without a duration never match either bound.
+        """
+
+        keep = np.ones(self.n_events, dtype=bool)
+        if types:
+            keep &= np.isin(self.type, self._codes(self.types, map(event_type, types)))
+        if drivers:
+            wanted = self._codes(self.drivers, drivers)
+            keep &= np.isin(self.trip_driver[self.trip], wanted)
+        if trip_ids:
+            keep &= np.isin(self.trip, self._codes(self.trip_ids, trip_ids))
+        if direction is not None:
+            keep &= self.direction == direction
+        if min_duration is not None:
+            keep &= self.duration >= min_duration
+        if max_duration is not None:
+            keep &= self.duration < max_duration
+        if t_start is not None:
+            keep &= self.t >= t_start
+        if t_end is not None:
+            keep &= self.t <= t_end
+        return np.flatnonzero(keep)
+
+    def record(self, i: int) -> dict:
+        trip = int(self.trip[i])
+        duration = float(self.duration[i])
+        direction = int(self.direction[i])
+        return {
+            "tripId": self.trip_ids[trip],
+            "driverId": self.drivers[int(self.trip_driver[trip])],
+            "t": float(self.t[i]),
+            "type": self.types[int(self.type[i])],
+            "label": self.labels[int(self.label[i])],
+            "direction": None if direction == NO_DIRECTION else direction,
+            "durationSeconds": None if np.isnan(duration) else duration,
+        }
+
+    def counts(self, positions: np.ndarray, by: str) -> Dict[str, int]:
+        """Number of events at `positions` per type, driver or trip."""
+
+        if by == "type":
+            codes, vocab = self.type[positions], self.types
+        elif by == "driver":
+            codes, vocab = self.trip_driver[self.trip[positions]], self.drivers
+        else:
+            codes, vocab = self.trip[positions], self.trip_ids
+        n = np.bincount(codes, minlength=len(vocab))
+        return {vocab[i]: int(c) for i, c in enumerate(n.tolist()) if c}
+
+    @staticmethod
+    def _codes(vocab: Tuple[str, ...], names) -> List[int]:
+        lookup = {name: i for i, name in enumerate(vocab)}
+        return [lookup[n] for n in names if n in lookup]
+
+
+def _build(
+    trips: TripIndex, parsed: Dict[str, Tuple[Fingerprint, List[dict]]]
+) -> EventIndex:
+    trip_ids = tuple(t.id for t in trips.trips)
+    drivers = tuple(sorted({_driver_of(t) for t in trip_ids}))
+    driver_code = {d: i for i, d in enumerate(drivers)}
+    types: Dict[str, int] = {}
+    labels: Dict[str, int] = {}
+
+    trip_col: List[int] = []
+    t_col: List[float] = []
+    type_col: List[int] = []
+    label_col: List[int] = []
+    direction_col: List[int] = []
+    duration_col: List[float] = []
+    sources: Dict[str, Fingerprint] = {}
+
+    by_folder: Dict[Path, List[str]] = {}
+    for path in sorted(parsed):
+        by_folder.setdefault(Path(path).parent, []).append(path)
+
+    for code, trip in enumerate(trips.trips):
+        events: List[Tuple[float, int, int, int, float]] = []
+        for path in by_folder.get(trip.folder_path, []):
+            fp, records = parsed[path]
+            sources[path] = fp
+            ty = types.setdefault(event_type(Path(path).name), len(types))
+            for e in records:
+                lab = labels.setdefault(e["label"], len(labels))
+                d = e["durationSeconds"]
+                events.append(
+                    (
+                        e["t"],
+                        ty,
+                        lab,
+                        NO_DIRECTION if e["direction"] is None else e["direction"],
+                        float("nan") if d is None else d,
+                    )
+                )
+        events.sort(key=lambda e: e[0])
+        for t, ty, lab, direction, d in events:
+            trip_col.append(code)
+            t_col.append(t)
+            type_col.append(ty)
+            label_col.append(lab)
+            direction_col.append(direction)
+            duration_col.append(d)
+
+    return EventIndex(
+        trip_ids=trip_ids,
+        drivers=drivers,
+        types=tuple(types),
+        labels=tuple(labels),
+        trip_driver=np.array([driver_code[_driver_of(t)] for t in trip_ids], np.int32),
+        trip=np.array(trip_col, dtype=np.int32),
+        t=np.array(t_col, dtype=float),
+        type=np.array(type_col, dtype=np.int16),
+        label=np.array(label_col, dtype=np.int32),
+        direction=np.array(direction_col, dtype=np.int16),
+        duration=np.array(duration_col, dtype=float),
+        sources=sources,
+    )
+
+
+class EventIndexStore:
+    """Dataset-wide EventIndex, rebuilt when event files change.
+
+    Queries are served from the last built snapshot and never wait on the
+    filesystem, except for the very first one. Once the snapshot is older
+    than `max_age_s`, or the trip index changed (reindex), the next query
+    starts a refresh on a background thread: the EVENTS* files are listed
+    and stat'ed, and only files whose (mtime, size) changed are parsed
+    again.
+    """
+
+    def __init__(self, max_age_s: float = 10.0) -> None:
+        self.max_age_s = max_age_s
+        self._index: Optional[EventIndex] = None
+        self._trips: Optional[TripIndex] = None
+        self._parsed: Dict[str, Tuple[Fingerprint, List[dict]]] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Held for a whole refresh, so only one scans the files at a time.
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self, trips: TripIndex) -> EventIndex:
+        with self._lock:
+            index = self._index
+            if index is not None:
+                if not self._is_fresh(trips) and not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._refresh_in_background,
+                        args=(trips,),
+                        name="event-index",
+                        daemon=True,
+                    ).start()
+                return index
+        return self._refresh(trips)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _is_fresh(self, trips: TripIndex) -> bool:
+        age = time.monotonic() - self._checked_at
+        return self._trips is trips and age < self.max_age_s
+
+    def _refresh_in_background(self, trips: TripIndex) -> None:
+        try:
+            self._refresh(trips)
+        except Exception:
+            # Keep serving the previous snapshot; the next query retries.
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh(self, trips: TripIndex) -> EventIndex:
+        with self._refresh_lock:
+            with self._lock:
+                if self._index is not None and self._is_fresh(trips):
+                    return self._index
+                previous, previous_trips = self._index, self._trips
+
+            parsed: Dict[str, Tuple[Fingerprint, List[dict]]] = {}
+            for trip in trips.trips:
+                for p in trip.folder_path.glob("EVENTS*"):
+                    try:
+                        if not p.is_file():
+                            continue
+                        fp = file_fingerprint(p)
+                        cached = self._parsed.get(str(p))
+                        if cached is not None and cached[0] == fp:
+                            parsed[str(p)] = cached
+                        else:
+                            parsed[str(p)] = (fp, parse_event_file(p))
+                    except OSError:
+                        # Ignore unreadable files
+                        continue
+
+            index = previous
+            if (
+                index is None
+                or previous_trips is None
+                or [t.id for t in previous_trips.trips] != [t.id for t in trips.trips]
+                or {k: v[0] for k, v in parsed.items()} != index.sources
+            ):
+                index = _build(trips, parsed)
+            self._parsed = parsed
+            with self._lock:
+                self._index = index
+                self._trips = trips
+                self._checked_at = time.monotonic()
+            return index
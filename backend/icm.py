@@ -1,11 +1,37 @@
 from __future__ import annotations
 
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
-from .trips import Trip, get_accelerometers, get_gps_track, get_series
+from .cache import Fingerprint, file_fingerprint
+from .metrics import stage
+from .profiling import CURRENT_PROFILE
+from .sidecar import FileColumns
+from .trips import (
+    _ACCEL_AXIS_TO_COL,
+    ARRAY_CACHE,
+    SHARED_CACHE,
+    SIDECAR_STORE,
+    Trip,
+    get_file_columns,
+)
+
+# Keyword defaults of compute_trip_icm (and of /api/icm).
+DEFAULT_ICM_PARAMS: Dict[str, float] = {
+    "speed_margin_kmh": 5.0,
+    "accel_threshold_g": 0.25,
+    "brake_threshold_g": 0.35,
+    "yaw_rate_threshold_dps": 18.0,
+    "default_speed_limit_kmh": 120.0,
+}
 
 
 @dataclass(frozen=True)
@@ -34,6 +60,38 @@ class TripIcmResult:
         }
 
 
+@dataclass(frozen=True)
+class TripIcmSweep:
+    """ICM of one trip over a parameter grid (see compute_trip_icm_sweep).
+
+    `icm_scores[i, j, k, l]` is the score for speed_margin_kmh[i],
+    accel_threshold_g[j], brake_threshold_g[k] and yaw_rate_threshold_dps[l].
+    """
+
+    trip_id: str
+    driver_id: str
+    distance_km: float
+    duration_s: float
+    speeding_s: np.ndarray
+    harsh_accel_events: np.ndarray
+    harsh_brake_events: np.ndarray
+    harsh_turn_events: np.ndarray
+    icm_scores: np.ndarray
+
+    def to_dict(self) -> dict:
+        return {
+            "tripId": self.trip_id,
+            "driverId": self.driver_id,
+            "distanceKm": self.distance_km,
+            "durationSeconds": self.duration_s,
+            "speedingSeconds": self.speeding_s.tolist(),
+            "harshAccelEvents": self.harsh_accel_events.tolist(),
+            "harshBrakeEvents": self.harsh_brake_events.tolist(),
+            "harshTurnEvents": self.harsh_turn_events.tolist(),
+            "icm": self.icm_scores.tolist(),
+        }
+
+
 def _driver_from_trip_id(trip_id: str) -> str:
     # trip id format is relative path with / replaced by | (frontend uses the same logic)
     if not trip_id:
@@ -60,43 +118,222 @@ def _integrate_distance_km(t_s: np.ndarray, speed_kmh: np.ndarray) -> float:
     return max(0.0, dist_km)
 
 
+def rising_edges(mask: np.ndarray) -> np.ndarray:
+    """True where `mask` switches from False to True (event starts)."""
+
+    m = mask.astype(bool)
+    return np.logical_and(m, np.logical_not(np.r_[False, m[:-1]]))
+
+
 def _count_events_from_boolean(mask: np.ndarray) -> int:
     if mask.size == 0:
         return 0
-    m = mask.astype(bool)
-    # count rising edges
-    rising = np.logical_and(m, np.logical_not(np.r_[False, m[:-1]]))
-    return int(np.sum(rising))
+    return int(np.sum(rising_edges(mask)))
 
 
-def _speed_limit_kmh(trip: Trip) -> Optional[np.ndarray]:
-    """Try to obtain per-sample speed limit from PROC_OPENSTREETMAP_DATA.
+def _count_events_above(values: np.ndarray, thresholds: Sequence[float]) -> np.ndarray:
+    """Event counts of `isfinite(values) & (values >= th)` for every threshold.
 
-    Column mapping (excluding time):
-    col1: current road maxspeed
-    col2: reliability flag
+    Sample i starts an event at `th` exactly when values[i-1] < th <= values[i],
+    so each rising sample is an interval (values[i-1], values[i]] and the count
+    for `th` is the number of intervals containing it: two sorts and a
+    searchsorted per threshold instead of one pass over the signal each.
     """
 
-    try:
-        series_maxspeed = get_series(trip, file_stem="PROC_OPENSTREETMAP_DATA", col=1)
-        series_reliab = get_series(trip, file_stem="PROC_OPENSTREETMAP_DATA", col=2)
-    except (FileNotFoundError, ValueError):
-        return None
+    th = np.asarray(thresholds, dtype=float)
+    v = np.asarray(values, dtype=float)
+    if v.size == 0:
+        return np.zeros(th.shape, dtype=np.int64)
+    v = np.where(np.isfinite(v), v, -np.inf)
+    prev = np.r_[-np.inf, v[:-1]]
+    up = v > prev
+    hi = np.sort(v[up])
+    lo = np.sort(prev[up])
+    # #{hi >= th} - #{lo >= th}; lo >= th implies hi >= th.
+    return np.searchsorted(lo, th, side="left") - np.searchsorted(hi, th, side="left")
+
+
+def _icm_score(
+    duration_s: float,
+    distance_km: float,
+    speeding_s: Any,
+    harsh_accel_events: Any,
+    harsh_brake_events: Any,
+    harsh_turn_events: Any,
+) -> Any:
+    # Works on scalars and on broadcastable arrays (threshold sweeps).
+    # The design here penalizes rates, so trips of different duration/distance are comparable.
+    hours = max(1e-6, duration_s / 3600.0)
+    km = max(1e-6, distance_km)
+
+    speeding_min = np.asarray(speeding_s, dtype=float) / 60.0
+    speeding_min_per_hour = speeding_min / hours
 
-    maxspeed = np.asarray(series_maxspeed.v, dtype=float)
-    reliab = np.asarray(series_reliab.v, dtype=float)
+    harsh_accel_per_100km = np.asarray(harsh_accel_events) / km * 100.0
+    harsh_brake_per_100km = np.asarray(harsh_brake_events) / km * 100.0
+    harsh_turn_per_100km = np.asarray(harsh_turn_events) / km * 100.0
 
-    # The series returned is aligned to its own timestamps; the consumer must align.
-    # Here we just return the values and let the caller align by length if possible.
-    if maxspeed.size == 0:
-        return None
+    # Penalties (caps avoid going negative too aggressively)
+    # 2 points per min/hr speeding
+    p_speed = np.minimum(45.0, 2.0 * speeding_min_per_hour)
+    p_accel = np.minimum(20.0, 1.0 * harsh_accel_per_100km)
+    p_brake = np.minimum(25.0, 1.2 * harsh_brake_per_100km)
+    p_turn = np.minimum(20.0, 0.8 * harsh_turn_per_100km)
+
+    score = 100.0 - (p_speed + p_accel + p_brake + p_turn)
+    return np.clip(score, 0.0, 100.0)
+
+
+class TripFeatures:
+    """Signals used by ICM scoring and /evidence, derived from one trip.
+
+    RAW_GPS, RAW_ACCELEROMETERS and PROC_OPENSTREETMAP_DATA are each loaded
+    at most once per instance, on first use. Threshold-independent signals
+    (distance, yaw rate, effective OSM limit) are computed once and reused;
+    the threshold masks below are single vectorized comparisons over them.
+
+    Accessing a signal whose file is missing raises FileNotFoundError.
+    """
 
-    # Keep only reliable entries if flag is usable; otherwise keep raw.
-    if reliab.size == maxspeed.size:
-        good = np.isfinite(reliab) & (reliab > 0)
-        maxspeed = np.where(good, maxspeed, np.nan)
+    def __init__(self, trip: Trip) -> None:
+        self.trip = trip
 
-    return maxspeed
+    @cached_property
+    def _gps(self) -> FileColumns:
+        return get_file_columns(self.trip, "RAW_GPS")
+
+    @cached_property
+    def _accel(self) -> FileColumns:
+        return get_file_columns(self.trip, "RAW_ACCELEROMETERS")
+
+    @property
+    def gps_t(self) -> np.ndarray:
+        return np.asarray(self._gps.col(0), dtype=float)
+
+    @property
+    def speed_kmh(self) -> np.ndarray:
+        return np.asarray(self._gps.col(1), dtype=float)
+
+    @property
+    def accel_t(self) -> np.ndarray:
+        return np.asarray(self._accel.col(0), dtype=float)
+
+    @property
+    def ax_g(self) -> np.ndarray:
+        return np.asarray(self._accel.col(_ACCEL_AXIS_TO_COL["x_kf"]), dtype=float)
+
+    @property
+    def yaw_deg(self) -> np.ndarray:
+        return np.asarray(self._accel.col(_ACCEL_AXIS_TO_COL["yaw"]), dtype=float)
+
+    @cached_property
+    def duration_s(self) -> float:
+        t = self.gps_t
+        return float(max(0.0, (t[-1] - t[0]) if t.size >= 2 else 0.0))
+
+    @cached_property
+    def distance_km(self) -> float:
+        return _integrate_distance_km(self.gps_t, self.speed_kmh)
+
+    @cached_property
+    def _gps_dt(self) -> np.ndarray:
+        dt = np.diff(self.gps_t)
+        return np.where(dt > 0, dt, 0.0)
+
+    @cached_property
+    def yaw_rate_dps(self) -> np.ndarray:
+        """d(yaw)/dt aligned with accel_t; sample i uses i-1 -> i (NaN at 0)."""
+
+        t = self.accel_t
+        if t.shape[0] < 2:
+            return np.full((t.shape[0],), np.nan)
+        dt = np.diff(t)
+        dt = np.where(dt > 0, dt, np.nan)
+        return np.r_[np.nan, np.diff(self.yaw_deg) / dt]
+
+    @cached_property
+    def osm_limit_kmh(self) -> Optional[np.ndarray]:
+        """Per-GPS-sample OSM maxspeed (NaN where unreliable), or None.
+
+        PROC_OPENSTREETMAP_DATA column mapping (excluding time):
+        col1: current road maxspeed
+        col2: reliability flag
+
+        The OSM rows are only used when they align with RAW_GPS by length.
+        """
+
+        try:
+            osm = get_file_columns(self.trip, "PROC_OPENSTREETMAP_DATA")
+            maxspeed = np.asarray(osm.col(1), dtype=float)
+            reliab = np.asarray(osm.col(2), dtype=float)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if maxspeed.size == 0 or maxspeed.size != self.speed_kmh.size:
+            return None
+
+        # Keep only reliable entries if flag is usable; otherwise keep raw.
+        if reliab.size == maxspeed.size:
+            good = np.isfinite(reliab) & (reliab > 0)
+            maxspeed = np.where(good, maxspeed, np.nan)
+        return maxspeed
+
+    def limit_kmh(self, default_speed_limit_kmh: float) -> np.ndarray:
+        limit = self.osm_limit_kmh
+        if limit is None:
+            return np.full_like(self.speed_kmh, float(default_speed_limit_kmh))
+        return np.where(
+            np.isfinite(limit) & (limit > 0), limit, float(default_speed_limit_kmh)
+        )
+
+    def speeding_mask(
+        self, speed_margin_kmh: float, default_speed_limit_kmh: float
+    ) -> np.ndarray:
+        speed = self.speed_kmh
+        limit = self.limit_kmh(default_speed_limit_kmh)
+        return np.isfinite(speed) & (speed > (limit + float(speed_margin_kmh)))
+
+    def speeding_seconds(
+        self, speed_margin_kmh: float, default_speed_limit_kmh: float
+    ) -> float:
+        if self.gps_t.size < 2:
+            return 0.0
+        mask = self.speeding_mask(speed_margin_kmh, default_speed_limit_kmh)
+        return float(np.sum(self._gps_dt * mask[:-1]))
+
+    def speeding_seconds_grid(
+        self, speed_margins_kmh: Sequence[float], default_speed_limit_kmh: float
+    ) -> np.ndarray:
+        """speeding_seconds for every margin, as one (margins x samples) mask."""
+
+        margins = np.asarray(speed_margins_kmh, dtype=float)
+        if self.gps_t.size < 2:
+            return np.zeros(margins.shape, dtype=float)
+        speed = self.speed_kmh
+        limit = self.limit_kmh(default_speed_limit_kmh)
+        mask = np.isfinite(speed) & (speed > (limit + margins[:, None]))
+        return np.sum(self._gps_dt * mask[:, :-1], axis=1)
+
+    def accel_exceed(self, accel_threshold_g: float) -> np.ndarray:
+        ax = self.ax_g
+        return np.isfinite(ax) & (ax >= float(accel_threshold_g))
+
+    def brake_exceed(self, brake_threshold_g: float) -> np.ndarray:
+        ax = self.ax_g
+        return np.isfinite(ax) & (ax <= -float(brake_threshold_g))
+
+    def turn_exceed(self, yaw_rate_threshold_dps: float) -> np.ndarray:
+        rate = self.yaw_rate_dps
+        return np.isfinite(rate) & (np.abs(rate) >= float(yaw_rate_threshold_dps))
+
+
+def _count_or_zeros(
+    counts: Callable[[], np.ndarray], thresholds: Sequence[float]
+) -> np.ndarray:
+    try:
+        return counts()
+    except (FileNotFoundError, ValueError):
+        return np.zeros(len(thresholds), dtype=np.int64)
 
 
 def compute_trip_icm(
@@ -108,89 +345,45 @@ def compute_trip_icm(
     yaw_rate_threshold_dps: float = 18.0,
     default_speed_limit_kmh: float = 120.0,
 ) -> TripIcmResult:
-    gps = get_gps_track(trip, downsample=1)
-    t = np.asarray(gps.t, dtype=float)
-    speed = np.asarray(gps.speed, dtype=float)
-
-    duration_s = float(max(0.0, (t[-1] - t[0]) if t.size >= 2 else 0.0))
-    distance_km = _integrate_distance_km(t, speed)
-
-    # Speeding seconds
-    speed_limit = None
-    sl = _speed_limit_kmh(trip)
-    # If OSM series length matches GPS length, treat as aligned. Otherwise fallback.
-    if sl is not None and sl.size == speed.size:
-        speed_limit = sl
-
-    if speed_limit is None:
-        speed_limit = np.full_like(speed, float(default_speed_limit_kmh))
-
-    limit = np.asarray(speed_limit, dtype=float)
-    limit = np.where(
-        np.isfinite(limit) & (limit > 0), limit, float(default_speed_limit_kmh)
-    )
+    features = TripFeatures(trip)
 
-    speeding_mask = np.isfinite(speed) & (speed > (limit + float(speed_margin_kmh)))
-    if t.size >= 2:
-        dt = np.diff(t)
-        dt = np.where(dt > 0, dt, 0.0)
-        speeding_s = float(np.sum(dt * speeding_mask[:-1]))
-    else:
-        speeding_s = 0.0
+    # Missing RAW_GPS raises FileNotFoundError: the trip cannot be scored.
+    duration_s = features.duration_s
+    distance_km = features.distance_km
+
+    speeding_s = features.speeding_seconds(speed_margin_kmh, default_speed_limit_kmh)
 
     # Harsh accel / brake from x_kf (Gs)
     try:
-        ax = get_accelerometers(trip, axis="x_kf", downsample=1)
-        ax_v = np.asarray(ax.v, dtype=float)
+        harsh_accel_events = _count_events_from_boolean(
+            features.accel_exceed(accel_threshold_g)
+        )
+        harsh_brake_events = _count_events_from_boolean(
+            features.brake_exceed(brake_threshold_g)
+        )
     except (FileNotFoundError, ValueError):
-        ax_v = np.asarray([], dtype=float)
-
-    harsh_accel_events = _count_events_from_boolean(
-        np.isfinite(ax_v) & (ax_v >= float(accel_threshold_g))
-    )
-    harsh_brake_events = _count_events_from_boolean(
-        np.isfinite(ax_v) & (ax_v <= -float(brake_threshold_g))
-    )
+        harsh_accel_events = 0
+        harsh_brake_events = 0
 
     # Harsh turning from yaw rate (deg/s) using RAW_ACCELEROMETERS yaw (deg)
     try:
-        yaw = get_accelerometers(trip, axis="yaw", downsample=1)
-        yaw_t = np.asarray(yaw.t, dtype=float)
-        yaw_v = np.asarray(yaw.v, dtype=float)
-        if yaw_t.size >= 2:
-            dy = np.diff(yaw_v)
-            dt_y = np.diff(yaw_t)
-            dt_y = np.where(dt_y > 0, dt_y, np.nan)
-            yaw_rate = dy / dt_y
-            harsh_turn_events = _count_events_from_boolean(
-                np.isfinite(yaw_rate)
-                & (np.abs(yaw_rate) >= float(yaw_rate_threshold_dps))
-            )
-        else:
-            harsh_turn_events = 0
+        harsh_turn_events = _count_events_from_boolean(
+            features.turn_exceed(yaw_rate_threshold_dps)
+        )
     except (FileNotFoundError, ValueError):
         harsh_turn_events = 0
 
     # ICM scoring: start at 100 and subtract progressively.
-    # The design here penalizes rates, so trips of different duration/distance are comparable.
-    hours = max(1e-6, duration_s / 3600.0)
-    km = max(1e-6, distance_km)
-
-    speeding_min = speeding_s / 60.0
-    speeding_min_per_hour = speeding_min / hours
-
-    harsh_accel_per_100km = harsh_accel_events / km * 100.0
-    harsh_brake_per_100km = harsh_brake_events / km * 100.0
-    harsh_turn_per_100km = harsh_turn_events / km * 100.0
-
-    # Penalties (caps avoid going negative too aggressively)
-    p_speed = min(45.0, 2.0 * speeding_min_per_hour)  # 2 points per min/hr speeding
-    p_accel = min(20.0, 1.0 * harsh_accel_per_100km)
-    p_brake = min(25.0, 1.2 * harsh_brake_per_100km)
-    p_turn = min(20.0, 0.8 * harsh_turn_per_100km)
-
-    score = 100.0 - (p_speed + p_accel + p_brake + p_turn)
-    score = float(max(0.0, min(100.0, score)))
+    score = float(
+        _icm_score(
+            duration_s,
+            distance_km,
+            speeding_s,
+            harsh_accel_events,
+            harsh_brake_events,
+            harsh_turn_events,
+        )
+    )
 
     return TripIcmResult(
         trip_id=trip.id,
@@ -205,6 +398,322 @@ def compute_trip_icm(
     )
 
 
+def compute_trip_icm_sweep(
+    trip: Trip,
+    *,
+    speed_margin_kmh: Sequence[float] = (5.0,),
+    accel_threshold_g: Sequence[float] = (0.25,),
+    brake_threshold_g: Sequence[float] = (0.35,),
+    yaw_rate_threshold_dps: Sequence[float] = (18.0,),
+    default_speed_limit_kmh: float = 120.0,
+) -> TripIcmSweep:
+    """compute_trip_icm for every combination of the given parameter values.
+
+    Each signal is read and scanned once: event counts for all thresholds of
+    an axis come from _count_events_above, and the scores for the full grid
+    are one broadcast of the scoring formula.
+    """
+
+    features = TripFeatures(trip)
+
+    # Missing RAW_GPS raises FileNotFoundError: the trip cannot be scored.
+    duration_s = features.duration_s
+    distance_km = features.distance_km
+
+    speeding_s = features.speeding_seconds_grid(
+        speed_margin_kmh, default_speed_limit_kmh
+    )
+    accel = _count_or_zeros(
+        lambda: _count_events_above(features.ax_g, accel_threshold_g),
+        accel_threshold_g,
+    )
+    brake = _count_or_zeros(
+        lambda: _count_events_above(-features.ax_g, brake_threshold_g),
+        brake_threshold_g,
+    )
+    turn = _count_or_zeros(
+        lambda: _count_events_above(
+            np.abs(features.yaw_rate_dps), yaw_rate_threshold_dps
+        ),
+        yaw_rate_threshold_dps,
+    )
+
+    scores = _icm_score(
+        duration_s,
+        distance_km,
+        speeding_s[:, None, None, None],
+        accel[None, :, None, None],
+        brake[None, None, :, None],
+        turn[None, None, None, :],
+    )
+
+    return TripIcmSweep(
+        trip_id=trip.id,
+        driver_id=_driver_from_trip_id(trip.id),
+        distance_km=float(distance_km),
+        duration_s=float(duration_s),
+        speeding_s=speeding_s,
+        harsh_accel_events=accel,
+        harsh_brake_events=brake,
+        harsh_turn_events=turn,
+        icm_scores=scores,
+    )
+
+
+def _compute_or_none(trip: Trip, params: Dict[str, float]) -> Optional[TripIcmResult]:
+    try:
+        # Includes loading files not cached yet (also timed as load/parse).
+        with stage("compute", "icm_trip"):
+            return compute_trip_icm(trip, **params)
+    except FileNotFoundError:
+        # Skip trips missing required data
+        return None
+
+
+def _sweep_or_none(trip: Trip, params: Dict[str, Any]) -> Optional[TripIcmSweep]:
+    try:
+        with stage("compute", "icm_sweep_trip"):
+            return compute_trip_icm_sweep(trip, **params)
+    except FileNotFoundError:
+        return None
+
+
+def _init_worker(
+    cache_max_bytes: int,
+    sidecar_root: Optional[Path],
+    sidecar_enabled: bool,
+    shared_root: Optional[Path],
+    shared_max_bytes: int,
+) -> None:
+    # Workers are spawned, so they do not inherit main.py's configuration.
+    ARRAY_CACHE.max_bytes = cache_max_bytes
+    SIDECAR_STORE.root = sidecar_root
+    SIDECAR_STORE.enabled = sidecar_enabled
+    SHARED_CACHE.root = shared_root
+    SHARED_CACHE.max_bytes = shared_max_bytes
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn rather than fork: the server process runs threads.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                # Each worker has its own ARRAY_CACHE; together they stay
+                # within the configured budget instead of multiplying it.
+                initargs=(
+                    ARRAY_CACHE.max_bytes // workers,
+                    SIDECAR_STORE.root,
+                    SIDECAR_STORE.enabled,
+                    SHARED_CACHE.root,
+                    SHARED_CACHE.max_bytes,
+                ),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_icm_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+# Files compute_trip_icm reads; a change to any of them invalidates the trip.
+_ICM_SOURCE_FILES = (
+    "RAW_GPS.txt",
+    "RAW_ACCELEROMETERS.txt",
+    "PROC_OPENSTREETMAP_DATA.txt",
+)
+
+TripFingerprint = Tuple[Optional[Fingerprint], ...]
+_CachedIcm = Tuple[TripFingerprint, Optional["TripIcmResult"]]
+
+
+def trip_fingerprint(trip: Trip) -> TripFingerprint:
+    """(mtime, size) of every ICM input of `trip` (None for missing files)."""
+
+    out: list[Optional[Fingerprint]] = []
+    for name in _ICM_SOURCE_FILES:
+        try:
+            out.append(file_fingerprint(trip.folder_path / name))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+class IcmResultCache:
+    """Per-trip ICM results keyed by scoring parameters and input fingerprint.
+
+    A lookup only hits when the trip's source files still have the mtime and
+    size they had when the result was computed, so `/api/icm` recomputes just
+    the trips whose inputs changed. Trips skipped for missing data are cached
+    too (as None).
+    """
+
+    def __init__(self, max_entries: int = 50_000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, _CachedIcm]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def params_key(params: Dict[str, float]) -> tuple:
+        return tuple(sorted((k, float(v)) for k, v in params.items()))
+
+    def get(
+        self, params_key: tuple, trip_id: str, fingerprint: TripFingerprint
+    ) -> tuple[bool, Optional[TripIcmResult]]:
+        key = (params_key, trip_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(
+        self,
+        params_key: tuple,
+        trip_id: str,
+        fingerprint: TripFingerprint,
+        result: Optional[TripIcmResult],
+    ) -> None:
+        key = (params_key, trip_id)
+        with self._lock:
+            self._entries[key] = (fingerprint, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+ICM_CACHE = IcmResultCache()
+
+
+def _compute_many(
+    trips: List[Trip],
+    params: Dict[str, Any],
+    workers: int,
+    fn: Callable[[Trip, Dict[str, Any]], Any] = _compute_or_none,
+) -> List[Any]:
+    profile = CURRENT_PROFILE.get()
+    if profile is not None and workers > 1 and len(trips) > 1:
+        # cProfile cannot see into the pool processes: score in this thread
+        # so a ?profile=1 report covers the scoring.
+        profile.note(
+            f"Trips were scored serially instead of on {workers} pool workers."
+        )
+        workers = 1
+    if workers <= 1 or len(trips) <= 1:
+        return [fn(t, params) for t in trips]
+    pool = _get_pool(workers)
+    chunksize = max(1, len(trips) // (workers * 4))
+    # Per-trip stages are recorded in the worker processes; time the batch here.
+    with stage("compute", "pool_batch"):
+        return list(pool.map(fn, trips, [params] * len(trips), chunksize=chunksize))
+
+
+def compute_icm_for_trips(
+    trips: List[Trip],
+    *,
+    workers: int = 1,
+    cache: Optional[IcmResultCache] = None,
+    **params: float,
+) -> List[TripIcmResult]:
+    """Score every trip, on a process pool of `workers` when > 1.
+
+    Results keep the order of `trips` regardless of completion order, and
+    trips missing required data are skipped, exactly like the serial loop.
+    With a `cache`, only trips without a fresh cached result are computed.
+    """
+
+    if cache is None:
+        results = _compute_many(trips, params, workers)
+        return [r for r in results if r is not None]
+
+    key = IcmResultCache.params_key(params)
+    fingerprints = [trip_fingerprint(t) for t in trips]
+    results: List[Optional[TripIcmResult]] = [None] * len(trips)
+    stale: List[int] = []
+    for i, (trip, fp) in enumerate(zip(trips, fingerprints)):
+        found, result = cache.get(key, trip.id, fp)
+        if found:
+            results[i] = result
+        else:
+            stale.append(i)
+
+    computed = _compute_many([trips[i] for i in stale], params, workers)
+    for i, result in zip(stale, computed):
+        results[i] = result
+        cache.put(key, trips[i].id, fingerprints[i], result)
+
+    return [r for r in results if r is not None]
+
+
+def compute_icm_sweep_for_trips(
+    trips: List[Trip], *, workers: int = 1, **grid: Any
+) -> List[TripIcmSweep]:
+    """compute_trip_icm_sweep over `trips`, skipping trips missing data."""
+
+    results = _compute_many(trips, grid, workers, _sweep_or_none)
+    return [r for r in results if r is not None]
+
+
+def aggregate_driver_sweeps(sweeps: List[TripIcmSweep]) -> List[Dict[str, Any]]:
+    """Per-driver score grids, weighted by distance like aggregate_driver_scores."""
+
+    by_driver: Dict[str, List[TripIcmSweep]] = {}
+    for r in sweeps:
+        by_driver.setdefault(r.driver_id or "(unknown)", []).append(r)
+
+    out: List[Dict[str, Any]] = []
+    for driver_id, trips in sorted(by_driver.items(), key=lambda kv: kv[0]):
+        weights = np.array([max(0.0, t.distance_km) for t in trips])
+        scores = np.stack([t.icm_scores for t in trips])
+        total_km = float(weights.sum())
+        if total_km > 0:
+            icm = np.tensordot(weights, scores, axes=1) / total_km
+        else:
+            icm = scores.mean(axis=0)
+
+        out.append(
+            {
+                "driverId": driver_id,
+                "icm": icm.tolist(),
+                "distanceKm": total_km,
+                "tripIds": sorted(t.trip_id for t in trips),
+            }
+        )
+    return out
+
+
 def aggregate_driver_scores(trip_results: List[TripIcmResult]) -> List[Dict[str, Any]]:
     by_driver: Dict[str, List[TripIcmResult]] = {}
     for r in trip_results:
@@ -0,0 +1,83 @@
+"""Convert trip text files into memory-mapped columnar sidecars.
+
+Usage:
+    python -m backend.ingest [--dataset-root PATH] [--sidecar-dir PATH]
+        [--in-dataset] [--force]
+
+Loaders build missing sidecars on demand; running this ahead of time moves
+the text parsing cost out of the first requests.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from .sidecar import default_sidecar_root
+from .trips import SIDECAR_STORE, build_trip_index, ingest_trip
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.ingest")
+    parser.add_argument(
+        "--dataset-root",
+        type=Path,
+        default=Path(
+            os.environ.get(
+                "UAH_DATASET_ROOT",
+                str((Path(__file__).resolve().parents[1] / "data").resolve()),
+            )
+        ),
+    )
+    parser.add_argument(
+        "--sidecar-dir",
+        type=Path,
+        default=(
+            Path(os.environ["UAH_SIDECAR_DIR"])
+            if os.environ.get("UAH_SIDECAR_DIR")
+            else None
+        ),
+        help="Store sidecars here (default: a per-dataset user cache dir).",
+    )
+    parser.add_argument(
+        "--in-dataset",
+        action="store_true",
+        default=os.environ.get("UAH_SIDECAR_IN_DATASET") == "1",
+        help="Store sidecars inside each trip folder instead.",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild fresh sidecars too."
+    )
+    args = parser.parse_args(argv)
+
+    if args.sidecar_dir is not None:
+        SIDECAR_STORE.root = args.sidecar_dir
+    elif args.in_dataset:
+        SIDECAR_STORE.root = None
+    else:
+        SIDECAR_STORE.root = default_sidecar_root(args.dataset_root)
+    SIDECAR_STORE.enabled = True
+
+    idx = build_trip_index(args.dataset_root)
+    started = time.perf_counter()
+    n_files = 0
+    for trip in idx.trips:
+        try:
+            written = ingest_trip(trip, force=args.force)
+        except OSError as e:
+            print(f"{trip.id}: failed ({e})", file=sys.stderr)
+            continue
+        n_files += len(written)
+        if written:
+            print(f"{trip.id}: {', '.join(written)}")
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(idx.trips)} trips, {n_files} files converted in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
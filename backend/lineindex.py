@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .cache import Fingerprint, file_fingerprint
+from .parsing import parse_bytes
+
+# Bump when the on-disk layout changes so old indexes are rebuilt.
+LINE_INDEX_VERSION = 2
+
+# One byte offset is kept for every LINE_INDEX_STRIDE-th data row, so a page
+# read scans at most this many extra lines before its first row.
+LINE_INDEX_STRIDE = 256
+
+_NL = ord("\n")
+_COMMENT = ord("#")
+
+
+@dataclass(frozen=True)
+class LineIndex:
+    """Byte offsets of every `stride`-th data row of a dataset text file.
+
+    Data rows are the lines with as many fields as the first non-blank,
+    non-comment line, i.e. the rows `parse_file` returns (it drops ragged
+    rows), so row `i` here is row `i` of its columns.
+    """
+
+    fingerprint: Fingerprint
+    n_rows: int
+    n_cols: int
+    stride: int
+    offsets: np.ndarray
+
+
+def _field_counts(buf: bytes, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Number of whitespace-separated fields before any '#' on each line."""
+
+    raw = np.frombuffer(buf, dtype=np.uint8)
+    # Field separators are what bytes.split() splits on: b" \t\n\v\f\r".
+    space = (raw == 32) | ((raw >= 9) & (raw <= 13))
+    field_starts = np.flatnonzero(~space & np.r_[True, space[:-1]])
+    counts = np.searchsorted(field_starts, ends) - np.searchsorted(field_starts, starts)
+    # Lines with a comment are rare; count their fields by hand.
+    hashes = np.flatnonzero(raw == _COMMENT)
+    if hashes.shape[0]:
+        lines = np.unique(np.searchsorted(starts, hashes, side="right") - 1)
+        for i in lines.tolist():
+            counts[i] = len(buf[starts[i] : ends[i]].split(b"#", 1)[0].split())
+    return counts
+
+
+def _data_lines(
+    buf: bytes, n_cols: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """(start, end) byte positions of the data lines in `buf`, and their width.
+
+    Lines with a field count other than `n_cols` (by default the count of
+    the first line that has any) are skipped like `parse_file` skips them.
+    """
+
+    raw = np.frombuffer(buf, dtype=np.uint8)
+    nl = np.flatnonzero(raw == _NL)
+    starts = np.r_[0, nl + 1]
+    ends = np.r_[nl, raw.shape[0]]
+    keep = starts < ends
+    starts, ends = starts[keep], ends[keep]
+
+    counts = _field_counts(buf, starts, ends)
+    if n_cols is None:
+        nonblank = np.flatnonzero(counts)
+        n_cols = int(counts[nonblank[0]]) if nonblank.shape[0] else 0
+    data = (counts == n_cols) & (counts > 0)
+    return starts[data], ends[data], n_cols
+
+
+def build_line_index(path: Path, stride: int = LINE_INDEX_STRIDE) -> LineIndex:
+    fp = file_fingerprint(path)
+    buf = path.read_bytes()
+    starts, _, n_cols = _data_lines(buf)
+    return LineIndex(
+        fingerprint=fp,
+        n_rows=int(starts.shape[0]),
+        n_cols=n_cols,
+        stride=stride,
+        offsets=starts[::stride].astype(np.int64),
+    )
+
+
+def load_line_index(location: Path, source: Path) -> Optional[LineIndex]:
+    """The index stored at `location`, or None if missing or stale."""
+
+    try:
+        with np.load(location) as z:
+            meta = z["meta"]
+            offsets = z["offsets"]
+        version, mtime_ns, size, n_rows, n_cols, stride = (int(x) for x in meta)
+    except (OSError, ValueError, KeyError):
+        return None
+    fp = file_fingerprint(source)
+    if version != LINE_INDEX_VERSION or (mtime_ns, size) != fp:
+        return None
+    return LineIndex(
+        fingerprint=fp, n_rows=n_rows, n_cols=n_cols, stride=stride, offsets=offsets
+    )
+
+
+def save_line_index(location: Path, index: LineIndex) -> None:
+    """Atomically write `index` to `location`. Raises OSError on failure."""
+
+    meta = np.array(
+        [
+            LINE_INDEX_VERSION,
+            index.fingerprint[0],
+            index.fingerprint[1],
+            index.n_rows,
+            index.n_cols,
+            index.stride,
+        ],
+        dtype=np.int64,
+    )
+    location.parent.mkdir(parents=True, exist_ok=True)
+    tmp = location.parent / f".{location.name}.{uuid.uuid4().hex}"
+    try:
+        with open(tmp, "wb") as f:
+            np.savez(f, meta=meta, offsets=index.offsets)
+        os.replace(tmp, location)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def read_rows(path: Path, index: LineIndex, rows: range) -> np.ndarray:
+    """Parse only the data rows in `rows` (a non-empty, increasing range).
+
+    The byte range between the index entries around the first and last row
+    is read and split into lines; just the selected lines are parsed.
+    """
+
+    first, last = rows[0], rows[-1]
+    lo = first // index.stride
+    hi = last // index.stride + 1
+    begin = int(index.offsets[lo])
+    with open(path, "rb") as f:
+        f.seek(begin)
+        if hi < index.offsets.shape[0]:
+            buf = f.read(int(index.offsets[hi]) - begin)
+        else:
+            buf = f.read()
+
+    starts, ends, _ = _data_lines(buf, index.n_cols)
+    base = lo * index.stride
+    local = np.arange(first - base, last - base + 1, rows.step)
+    chunk = b"\n".join(
+        buf[s:e] for s, e in zip(starts[local].tolist(), ends[local].tolist())
+    )
+
+    cols = parse_bytes(chunk, path.stem)
+    if not cols:
+        return np.empty((0, 0), dtype=float)
+    return np.column_stack([cols[i] for i in range(len(cols))])
@@ -1,25 +1,68 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, Callable, Literal, Mapping, Optional
 
 import numpy as np
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
-from .icm import aggregate_driver_scores, compute_trip_icm
+from .admission import AdmissionController, ClassLimits, Overloaded
+from .cache import Fingerprint
+from .conditional import is_not_modified, response_validators, source_fingerprints
+from .downsample import DownsampleMethod
+from .encoding import BINARY_MEDIA_TYPE, Precision, encode_columns
+from .eventindex import EventIndexStore
+from .icm import (
+    DEFAULT_ICM_PARAMS,
+    ICM_CACHE,
+    TripFeatures,
+    aggregate_driver_scores,
+    aggregate_driver_sweeps,
+    compute_icm_for_trips,
+    compute_icm_sweep_for_trips,
+    rising_edges,
+    shutdown_icm_pool,
+    trip_fingerprint,
+)
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY,
+    MetricsMiddleware,
+    Samples,
+    process_rss_bytes,
+    stage,
+)
+from .profiling import CURRENT_PROFILE, ProfileMiddleware
+from .segments import SEGMENT_KINDS, SegmentIndexStore
+from .sharedcache import default_shared_root
+from .sidecar import default_sidecar_root
+from .tripindex import TripIndexStore
 from .trips import (
     AccelAxis,
+    ARRAY_CACHE,
+    SHARED_CACHE,
+    SIDECAR_STORE,
+    Trip,
     TripIndex,
-    build_trip_index,
     get_accelerometers,
     get_available_series_files,
+    get_channels,
     get_events,
     get_gps_track,
     get_series,
     get_table,
+    parse_channel_spec,
+    time_window,
+    trip_file_path,
 )
+from .warmup import DEFAULT_WARMUP, Warmup, parse_steps
 
 
 APP_ROOT = Path(__file__).resolve().parents[1]
@@ -32,16 +75,381 @@ DATASET_ROOT = Path(
     )
 )
 
-app = FastAPI(title="UAH DriveSet Web Viewer")
+# Byte budget for parsed trip files shared by all endpoints.
+ARRAY_CACHE.max_bytes = int(os.environ.get("UAH_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Columnar sidecars (see backend/ingest.py); UAH_SIDECAR=0 disables them.
+# They go to the user cache dir (UAH_SIDECAR_DIR elsewhere) and only into the
+# trip folders with UAH_SIDECAR_IN_DATASET=1.
+SIDECAR_STORE.enabled = os.environ.get("UAH_SIDECAR", "1") != "0"
+if os.environ.get("UAH_SIDECAR_DIR"):
+    SIDECAR_STORE.root = Path(os.environ["UAH_SIDECAR_DIR"])
+elif os.environ.get("UAH_SIDECAR_IN_DATASET") != "1":
+    SIDECAR_STORE.root = default_sidecar_root(DATASET_ROOT)
+
+# Parsed columns shared by all uvicorn workers (see backend/sharedcache.py):
+# UAH_SHARED_CACHE=1 keeps them in /dev/shm, UAH_SHARED_CACHE_DIR elsewhere.
+if os.environ.get("UAH_SHARED_CACHE_DIR"):
+    SHARED_CACHE.root = Path(os.environ["UAH_SHARED_CACHE_DIR"])
+elif os.environ.get("UAH_SHARED_CACHE") == "1":
+    SHARED_CACHE.root = default_shared_root(DATASET_ROOT)
+SHARED_CACHE.max_bytes = (
+    int(os.environ.get("UAH_SHARED_CACHE_MAX_MB", "1024")) * 1024 * 1024
+)
+
+# Worker processes used to score trips in /api/icm (1 = serial, in-process).
+# The workers split UAH_CACHE_MAX_MB between them.
+ICM_WORKERS = max(
+    1, int(os.environ.get("UAH_ICM_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+)
+
+
+# Trip index manifest (see backend/tripindex.py), kept with the sidecars;
+# UAH_TRIP_INDEX=0 disables it.
+INDEX_DIR = SIDECAR_STORE.root or DATASET_ROOT / ".columns"
+_manifest_env = os.environ.get("UAH_TRIP_INDEX", "")
+if _manifest_env == "0":
+    TRIP_INDEX_MANIFEST = None
+elif _manifest_env:
+    TRIP_INDEX_MANIFEST = Path(_manifest_env)
+else:
+    TRIP_INDEX_MANIFEST = INDEX_DIR / "trip_index.json"
+TRIP_INDEX = TripIndexStore(DATASET_ROOT, TRIP_INDEX_MANIFEST)
+
+# Seconds between background rescans of the dataset (0 = only on demand).
+TRIP_INDEX_WATCH_S = float(os.environ.get("UAH_TRIP_INDEX_WATCH_S", "0"))
+
+# Dataset-wide event index; EVENTS* files are re-stat'ed at most this often.
+EVENT_INDEX = EventIndexStore(
+    max_age_s=float(os.environ.get("UAH_EVENT_INDEX_MAX_AGE_S", "10"))
+)
+
+# Harsh accel/brake/turn and speeding segments of all trips, kept in
+# INDEX_DIR/segments.npz (UAH_SEGMENT_INDEX=0 keeps them in memory only).
+SEGMENT_INDEX = SegmentIndexStore(
+    None if os.environ.get("UAH_SEGMENT_INDEX") == "0" else INDEX_DIR / "segments.npz",
+    max_age_s=float(os.environ.get("UAH_SEGMENT_INDEX_MAX_AGE_S", "30")),
+    workers=ICM_WORKERS,
+)
+
+
+# Threads that run the data endpoints (file loads, parsing, scoring).
+DATA_THREADS = max(
+    1,
+    int(os.environ.get("UAH_DATA_THREADS", "0")) or min(32, (os.cpu_count() or 1) + 4),
+)
+DATA_EXECUTOR = ThreadPoolExecutor(
+    max_workers=DATA_THREADS, thread_name_prefix="uah-data"
+)
+
+RequestClass = Literal["interactive", "batch"]
+
+
+def _class_limits(
+    name: str, concurrency: int, queue: int, timeout_s: float
+) -> ClassLimits:
+    env = f"UAH_{name.upper()}"
+    return ClassLimits(
+        concurrency=max(1, int(os.environ.get(f"{env}_CONCURRENCY", concurrency))),
+        max_queue=max(0, int(os.environ.get(f"{env}_QUEUE", queue))),
+        timeout_s=float(os.environ.get(f"{env}_TIMEOUT_S", timeout_s)),
+    )
+
+
+# Interactive (chart/table) requests go first; batch requests (ICM, evidence,
+# dataset-wide queries) may only take part of the data threads.
+ADMISSION = AdmissionController(
+    {
+        "interactive": _class_limits("interactive", DATA_THREADS, 64, 10.0),
+        "batch": _class_limits("batch", max(1, DATA_THREADS // 2), 16, 30.0),
+    },
+    total=DATA_THREADS,
+)
+
+
+# Startup warm-up (see backend/warmup.py): comma-separated steps out of
+# index,sidecars,cache,icm,segments; UAH_WARMUP=0 disables it.
+WARMUP = Warmup(
+    parse_steps(os.environ.get("UAH_WARMUP", DEFAULT_WARMUP)),
+    trips=lambda: TRIP_INDEX.index(),
+    icm=lambda trips: compute_icm_for_trips(
+        trips, workers=ICM_WORKERS, cache=ICM_CACHE, **DEFAULT_ICM_PARAMS
+    ),
+    segments=SEGMENT_INDEX.get,
+    concurrency=int(os.environ.get("UAH_WARMUP_CONCURRENCY", "2")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if TRIP_INDEX_WATCH_S > 0:
+        TRIP_INDEX.start_watcher(TRIP_INDEX_WATCH_S)
+    WARMUP.start()
+    yield
+    WARMUP.stop()
+    TRIP_INDEX.stop_watcher()
+    DATA_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    shutdown_icm_pool()
+
+
+class _TimedJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        with stage("serialize", "json_encode"):
+            return super().render(content)
+
+
+app = FastAPI(
+    title="UAH DriveSet Web Viewer",
+    lifespan=lifespan,
+    default_response_class=_TimedJSONResponse,
+)
 
-_trip_index: TripIndex | None = None
+# `?profile=1` on /api/* routes (see backend/profiling.py). Off unless
+# UAH_PROFILE=1 or a UAH_PROFILE_TOKEN (then required in X-Profile-Token).
+PROFILE_TOKEN = os.environ.get("UAH_PROFILE_TOKEN") or None
+if os.environ.get("UAH_PROFILE") == "1" or PROFILE_TOKEN:
+    app.add_middleware(
+        ProfileMiddleware,
+        token=PROFILE_TOKEN,
+        save_dir=(
+            Path(os.environ["UAH_PROFILE_DIR"])
+            if os.environ.get("UAH_PROFILE_DIR")
+            else None
+        ),
+    )
+app.add_middleware(MetricsMiddleware)
 
 
 def trip_index() -> TripIndex:
-    global _trip_index
-    if _trip_index is None:
-        _trip_index = build_trip_index(DATASET_ROOT)
-    return _trip_index
+    return TRIP_INDEX.index()
+
+
+def _offload(klass: RequestClass) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Serve a blocking endpoint as `async def`, running its body on DATA_EXECUTOR.
+
+    Keeps data loads off Starlette's shared thread pool and bounded by
+    DATA_THREADS; duplicate loads of one file are coalesced by ARRAY_CACHE.
+    Requests wait for a slot of their class in ADMISSION and get a 503 with
+    Retry-After when overloaded.
+    """
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        async def run(*args: Any, **kwargs: Any) -> Any:
+            try:
+                async with ADMISSION.slot(klass):
+                    call = functools.partial(fn, *args, **kwargs)
+                    profile = CURRENT_PROFILE.get()
+                    if profile is not None:
+                        call = profile.wrap(call)
+                    loop = asyncio.get_running_loop()
+                    future = loop.run_in_executor(DATA_EXECUTOR, call)
+                    try:
+                        return await asyncio.shield(future)
+                    except asyncio.CancelledError:
+                        # The thread keeps running; hold the slot until it ends.
+                        await asyncio.wait([future])
+                        raise
+            except Overloaded as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail=str(e),
+                    headers={"Retry-After": str(e.retry_after_s)},
+                ) from e
+
+        return run
+
+    return decorate
+
+
+@app.get("/api/ready")
+def get_ready() -> JSONResponse:
+    """Warm-up progress; 503 until it has finished, for load balancer checks."""
+
+    status = WARMUP.status()
+    return JSONResponse(
+        status,
+        status_code=200 if status["ready"] else 503,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@app.get("/api/admission")
+def get_admission() -> dict:
+    """Running and queued requests per class, with wait times."""
+
+    return ADMISSION.stats()
+
+
+def _collect_process() -> list[tuple[str, str, str, Samples]]:
+    cache = ARRAY_CACHE.stats()
+    icm = ICM_CACHE.stats()
+    lookups = cache["hits"] + cache["misses"] + cache["coalesced"]
+    icm_lookups = icm["hits"] + icm["misses"]
+    out: list[tuple[str, str, str, Samples]] = [
+        (
+            "uah_process_resident_memory_bytes",
+            "gauge",
+            "Resident set size of the server process.",
+            [({}, process_rss_bytes())],
+        ),
+        (
+            "uah_cache_lookups_total",
+            "counter",
+            "Cache lookups by result (coalesced: waited on an in-flight load).",
+            [
+                ({"cache": "array", "result": "hit"}, cache["hits"]),
+                ({"cache": "array", "result": "miss"}, cache["misses"]),
+                ({"cache": "array", "result": "coalesced"}, cache["coalesced"]),
+                ({"cache": "icm", "result": "hit"}, icm["hits"]),
+                ({"cache": "icm", "result": "miss"}, icm["misses"]),
+            ],
+        ),
+        (
+            "uah_cache_hit_ratio",
+            "gauge",
+            "Hits (and coalesced loads) over lookups since start.",
+            [
+                (
+                    {"cache": "array"},
+                    (cache["hits"] + cache["coalesced"]) / lookups if lookups else 0.0,
+                ),
+                ({"cache": "icm"}, icm["hits"] / icm_lookups if icm_lookups else 0.0),
+            ],
+        ),
+        (
+            "uah_cache_bytes",
+            "gauge",
+            "Bytes held by the parsed-file cache.",
+            [({"cache": "array"}, cache["bytes"])],
+        ),
+        (
+            "uah_cache_entries",
+            "gauge",
+            "Entries in each cache.",
+            [
+                ({"cache": "array"}, cache["entries"]),
+                ({"cache": "icm"}, icm["entries"]),
+            ],
+        ),
+    ]
+
+    shared = SHARED_CACHE.stats()
+    if shared["enabled"]:
+        out.append(
+            (
+                "uah_shared_cache_lookups_total",
+                "counter",
+                "Shared column cache lookups in this process (wait: built by"
+                " another worker while this one waited).",
+                [
+                    ({"result": "hit"}, shared["hits"]),
+                    ({"result": "miss"}, shared["misses"]),
+                    ({"result": "wait"}, shared["waits"]),
+                ],
+            )
+        )
+        out.append(
+            (
+                "uah_shared_cache_bytes",
+                "gauge",
+                "Bytes in the shared column cache directory.",
+                [({}, shared["bytes"])],
+            )
+        )
+
+    classes = ADMISSION.stats()["classes"]
+    for name, key, kind, help in (
+        ("uah_admission_running", "running", "gauge", "Requests running."),
+        ("uah_admission_queued", "queued", "gauge", "Requests waiting for a slot."),
+        ("uah_admission_admitted_total", "admitted", "counter", "Requests admitted."),
+        ("uah_admission_rejected_total", "rejected", "counter", "Queue was full."),
+        ("uah_admission_timeouts_total", "timedOut", "counter", "Timed out in queue."),
+        (
+            "uah_admission_wait_seconds_max",
+            "waitSecondsMax",
+            "gauge",
+            "Longest queue wait.",
+        ),
+    ):
+        samples: Samples = [({"class": k}, c[key]) for k, c in classes.items()]
+        out.append((name, kind, help, samples))
+    return out
+
+
+REGISTRY.register_collector(_collect_process)
+
+
+@app.get("/api/metrics")
+def get_metrics() -> Response:
+    """Prometheus text format: latency, stage timers, bytes, caches, queues, RSS."""
+
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+ResponseFormat = Literal["json", "bin"]
+
+
+def _conditional(
+    request: Request,
+    response: Response,
+    fingerprints: list[Optional[Fingerprint]],
+    *,
+    key: str = "",
+    weak: bool = False,
+) -> dict[str, str]:
+    """Set ETag/Last-Modified on `response`, or answer 304 if the client is current.
+
+    Called before any file is parsed, so a revalidation only costs stat().
+    """
+
+    headers = response_validators(request, fingerprints, key=key, weak=weak)
+    if is_not_modified(request, headers):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return headers
+
+
+def _trip_conditional(
+    request: Request, response: Response, trip: Trip, paths: list[Path]
+) -> dict[str, str]:
+    # The video (and so offsetSeconds) is part of every trip response.
+    key = f"{trip.video_path}\0{trip.offset_seconds!r}"
+    return _conditional(request, response, source_fingerprints(paths), key=key)
+
+
+def _columns_response(
+    request: Request,
+    format: ResponseFormat | None,
+    meta: dict,
+    columns: dict[str, np.ndarray],
+    *,
+    precision: Precision = "f64",
+    delta_t: bool = False,
+    headers: Mapping[str, str] | None = None,
+):
+    """JSON body, or the binary column format when asked for.
+
+    Binary is selected with `?format=bin` or `Accept: application/octet-stream`
+    (an explicit `format=json` wins over the header).
+    """
+
+    if format is None:
+        accept = request.headers.get("accept", "")
+        format = "bin" if BINARY_MEDIA_TYPE in accept else "json"
+    if format == "bin":
+        with stage("serialize", "bin"):
+            payload = encode_columns(
+                meta,
+                columns,
+                precision=precision,
+                delta=("t",) if delta_t else (),
+            )
+        return Response(
+            content=payload, media_type=BINARY_MEDIA_TYPE, headers=dict(headers or {})
+        )
+    with stage("serialize", "tolist"):
+        return {**meta, **{name: arr.tolist() for name, arr in columns.items()}}
 
 
 @app.get("/api/trips")
@@ -53,6 +461,66 @@ def list_trips() -> dict:
     }
 
 
+@app.post("/api/trips/reindex")
+def reindex_trips(full: bool = Query(default=False)) -> dict:
+    """Rescan the dataset for added/removed trips (`full` ignores the manifest)."""
+
+    idx = TRIP_INDEX.refresh(full=full)
+    EVENT_INDEX.invalidate()
+    SEGMENT_INDEX.invalidate()
+    return {"trips": len(idx.trips), **TRIP_INDEX.stats()}
+
+
+@app.get("/api/events")
+@_offload("batch")
+def query_events(
+    request: Request,
+    response: Response,
+    type: list[str] = Query(default=[]),
+    driver: list[str] = Query(default=[]),
+    trip: list[str] = Query(default=[]),
+    direction: int | None = Query(default=None, ge=-1, le=1),
+    min_duration: float | None = Query(default=None),
+    max_duration: float | None = Query(default=None),
+    t_start: float | None = Query(default=None),
+    t_end: float | None = Query(default=None),
+    limit: int = Query(default=1000, ge=0, le=100_000),
+    offset: int = Query(default=0, ge=0),
+) -> dict:
+    """Events of all trips, e.g. `?type=LANE_CHANGES&direction=-1&max_duration=2`.
+
+    Repeated `type`/`driver`/`trip` values are alternatives; different
+    filters must all match. Served from the in-memory event index.
+    """
+
+    index = EVENT_INDEX.get(trip_index())
+    _conditional(
+        request,
+        response,
+        [index.sources[p] for p in sorted(index.sources)],
+        key="\0".join(index.trip_ids),
+    )
+    hits = index.query(
+        types=type,
+        drivers=driver,
+        trip_ids=trip,
+        direction=direction,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        t_start=t_start,
+        t_end=t_end,
+    )
+    return {
+        "total": int(hits.shape[0]),
+        "offset": offset,
+        "limit": limit,
+        "types": list(index.types),
+        "byType": index.counts(hits, "type"),
+        "byDriver": index.counts(hits, "driver"),
+        "events": [index.record(i) for i in hits[offset : offset + limit].tolist()],
+    }
+
+
 @app.get("/api/trips/{trip_id}/video")
 def get_trip_video(trip_id: str):
     idx = trip_index()
@@ -65,32 +533,65 @@ def get_trip_video(trip_id: str):
 
 
 @app.get("/api/trips/{trip_id}/accelerometers")
+@_offload("interactive")
 def get_trip_accelerometers(
+    request: Request,
+    response: Response,
     trip_id: str,
     axis: AccelAxis = Query(default="x"),
     downsample: int = Query(default=1, ge=1, le=1000),
+    max_points: int | None = Query(default=None, ge=2, le=1_000_000),
+    method: DownsampleMethod = Query(default="minmax"),
+    t_start: float | None = Query(default=None),
+    t_end: float | None = Query(default=None),
+    format: ResponseFormat | None = Query(default=None),
+    precision: Precision = Query(default="f64"),
+    delta_t: bool = Query(default=False),
 ):
     idx = trip_index()
     trip = idx.by_id.get(trip_id)
     if trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    data = get_accelerometers(trip, axis=axis, downsample=downsample)
-    return {
-        "tripId": trip.id,
-        "axis": axis,
-        "offsetSeconds": trip.offset_seconds,
-        "t": data.t.tolist(),
-        "v": data.v.tolist(),
-    }
+    validators = _trip_conditional(
+        request, response, trip, [trip.folder_path / "RAW_ACCELEROMETERS.txt"]
+    )
+    data = get_accelerometers(
+        trip,
+        axis=axis,
+        downsample=downsample,
+        max_points=max_points,
+        method=method,
+        t_start=t_start,
+        t_end=t_end,
+    )
+    return _columns_response(
+        request,
+        format,
+        {"tripId": trip.id, "axis": axis, "offsetSeconds": trip.offset_seconds},
+        {"t": data.t, "v": data.v},
+        precision=precision,
+        delta_t=delta_t,
+        headers=validators,
+    )
 
 
 @app.get("/api/trips/{trip_id}/series")
+@_offload("interactive")
 def get_trip_series(
+    request: Request,
+    response: Response,
     trip_id: str,
     file: str = Query(..., min_length=1),
     col: int = Query(..., ge=1),
     downsample: int = Query(default=1, ge=1, le=1000),
+    max_points: int | None = Query(default=None, ge=2, le=1_000_000),
+    method: DownsampleMethod = Query(default="minmax"),
+    t_start: float | None = Query(default=None),
+    t_end: float | None = Query(default=None),
+    format: ResponseFormat | None = Query(default=None),
+    precision: Precision = Query(default="f64"),
+    delta_t: bool = Query(default=False),
 ):
     idx = trip_index()
     trip = idx.by_id.get(trip_id)
@@ -98,20 +599,41 @@ def get_trip_series(
         raise HTTPException(status_code=404, detail="Trip not found")
 
     try:
-        data = get_series(trip, file_stem=file, col=col, downsample=downsample)
+        path = trip_file_path(trip, file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    validators = _trip_conditional(request, response, trip, [path])
+
+    try:
+        data = get_series(
+            trip,
+            file_stem=file,
+            col=col,
+            downsample=downsample,
+            max_points=max_points,
+            method=method,
+            t_start=t_start,
+            t_end=t_end,
+        )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-    return {
-        "tripId": trip.id,
-        "file": file,
-        "col": col,
-        "offsetSeconds": trip.offset_seconds,
-        "t": data.t.tolist(),
-        "v": data.v.tolist(),
-    }
+    return _columns_response(
+        request,
+        format,
+        {
+            "tripId": trip.id,
+            "file": file,
+            "col": col,
+            "offsetSeconds": trip.offset_seconds,
+        },
+        {"t": data.t, "v": data.v},
+        precision=precision,
+        delta_t=delta_t,
+        headers=validators,
+    )
 
 
 @app.get("/api/trips/{trip_id}/series_files")
@@ -128,43 +650,176 @@ def get_trip_series_files(trip_id: str) -> dict:
 
 
 @app.get("/api/trips/{trip_id}/gps")
+@_offload("interactive")
 def get_trip_gps(
+    request: Request,
+    response: Response,
     trip_id: str,
     downsample: int = Query(default=1, ge=1, le=1000),
+    max_points: int | None = Query(default=None, ge=2, le=1_000_000),
+    method: DownsampleMethod = Query(default="minmax"),
+    t_start: float | None = Query(default=None),
+    t_end: float | None = Query(default=None),
+    format: ResponseFormat | None = Query(default=None),
+    precision: Precision = Query(default="f64"),
+    delta_t: bool = Query(default=False),
 ):
     idx = trip_index()
     trip = idx.by_id.get(trip_id)
     if trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
 
+    validators = _trip_conditional(
+        request, response, trip, [trip.folder_path / "RAW_GPS.txt"]
+    )
     try:
-        gps = get_gps_track(trip, downsample=downsample)
+        gps = get_gps_track(
+            trip,
+            downsample=downsample,
+            max_points=max_points,
+            method=method,
+            t_start=t_start,
+            t_end=t_end,
+        )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
 
-    return {
+    return _columns_response(
+        request,
+        format,
+        {"tripId": trip.id, "offsetSeconds": trip.offset_seconds},
+        {"t": gps.t, "lat": gps.lat, "lon": gps.lon, "speed": gps.speed},
+        precision=precision,
+        delta_t=delta_t,
+        headers=validators,
+    )
+
+
+@app.get("/api/trips/{trip_id}/bundle")
+@_offload("interactive")
+def get_trip_bundle(
+    request: Request,
+    response: Response,
+    trip_id: str,
+    ch: list[str] = Query(default=[]),
+    downsample: int = Query(default=1, ge=1, le=1000),
+    max_points: int | None = Query(default=None, ge=2, le=1_000_000),
+    method: DownsampleMethod = Query(default="minmax"),
+    t_start: float | None = Query(default=None),
+    t_end: float | None = Query(default=None),
+    include_gps: bool = Query(default=False),
+    include_events: bool = Query(default=False),
+    events_prefix: str = Query(default=""),
+    format: ResponseFormat | None = Query(default=None),
+    precision: Precision = Query(default="f64"),
+    delta_t: bool = Query(default=False),
+):
+    """Several channels of one trip in a single response.
+
+    `ch` is repeated, e.g. `ch=accel:x_kf&ch=series:RAW_GPS:1`. Each channel
+    `<key>` is returned as the columns `<key>.t` and `<key>.v`; the GPS track
+    (`include_gps`) as `gps.t`, `gps.lat`, `gps.lon`, `gps.speed`. Channels
+    whose file is missing are listed in `errors` instead of failing the
+    request.
+    """
+
+    idx = trip_index()
+    trip = idx.by_id.get(trip_id)
+    if trip is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    try:
+        specs = [parse_channel_spec(s) for s in ch]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    # Every text file: channels, GPS, events and the `files` listing.
+    validators = _trip_conditional(
+        request, response, trip, sorted(trip.folder_path.glob("*.txt"))
+    )
+    series, errors = get_channels(
+        trip,
+        specs,
+        downsample=downsample,
+        max_points=max_points,
+        method=method,
+        t_start=t_start,
+        t_end=t_end,
+    )
+    columns: dict[str, np.ndarray] = {}
+    for key, data in series.items():
+        columns[f"{key}.t"] = data.t
+        columns[f"{key}.v"] = data.v
+
+    if include_gps:
+        try:
+            gps = get_gps_track(
+                trip,
+                downsample=downsample,
+                max_points=max_points,
+                method=method,
+                t_start=t_start,
+                t_end=t_end,
+            )
+            columns.update(
+                {
+                    "gps.t": gps.t,
+                    "gps.lat": gps.lat,
+                    "gps.lon": gps.lon,
+                    "gps.speed": gps.speed,
+                }
+            )
+        except (FileNotFoundError, ValueError) as e:
+            errors["gps"] = str(e)
+
+    meta: dict = {
         "tripId": trip.id,
         "offsetSeconds": trip.offset_seconds,
-        "t": gps.t.tolist(),
-        "lat": gps.lat.tolist(),
-        "lon": gps.lon.tolist(),
-        "speed": gps.speed.tolist(),
+        "files": get_available_series_files(trip),
+        "channels": list(series),
+        "errors": errors,
     }
+    if include_events:
+        meta["events"] = get_events(trip, file_prefix=events_prefix or None)
+
+    return _columns_response(
+        request,
+        format,
+        meta,
+        columns,
+        precision=precision,
+        delta_t=delta_t,
+        headers=validators,
+    )
 
 
 @app.get("/api/trips/{trip_id}/table")
+@_offload("interactive")
 def get_trip_table(
+    request: Request,
+    response: Response,
     trip_id: str,
     file: str = Query(..., min_length=1),
     downsample: int = Query(default=1, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
     limit: int = Query(default=200, ge=1, le=2000),
+    max_points: int | None = Query(default=None, ge=2, le=1_000_000),
+    method: DownsampleMethod = Query(default="minmax"),
+    sort: str | None = Query(default=None, min_length=1),
+    desc: bool = Query(default=False),
+    filters: list[str] = Query(default=[], alias="filter"),
 ):
     idx = trip_index()
     trip = idx.by_id.get(trip_id)
     if trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
 
+    try:
+        path = trip_file_path(trip, file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    _trip_conditional(request, response, trip, [path])
+
     try:
         columns, rows, total = get_table(
             trip,
@@ -172,6 +827,11 @@ def get_trip_table(
             downsample=downsample,
             offset=offset,
             limit=limit,
+            max_points=max_points,
+            method=method,
+            sort=sort,
+            desc=desc,
+            filters=filters,
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
@@ -185,6 +845,10 @@ def get_trip_table(
         "downsample": downsample,
         "offset": offset,
         "limit": limit,
+        "maxPoints": max_points,
+        "sort": sort,
+        "desc": desc,
+        "filters": filters,
         "total": total,
         "columns": columns,
         "rows": rows.tolist(),
@@ -192,7 +856,10 @@ def get_trip_table(
 
 
 @app.get("/api/trips/{trip_id}/events")
+@_offload("interactive")
 def get_trip_events(
+    request: Request,
+    response: Response,
     trip_id: str,
     filePrefix: str = Query(default="EVENTS_LIST_LANE_CHANGES"),
 ) -> dict:
@@ -201,6 +868,7 @@ def get_trip_events(
     if trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
 
+    _trip_conditional(request, response, trip, sorted(trip.folder_path.glob("EVENTS*")))
     events = get_events(trip, file_prefix=filePrefix or None)
     return {
         "tripId": trip.id,
@@ -211,7 +879,10 @@ def get_trip_events(
 
 
 @app.get("/api/trips/{trip_id}/evidence")
+@_offload("batch")
 def get_trip_evidence(
+    request: Request,
+    response: Response,
     trip_id: str,
     kind: str = Query(..., min_length=1),
     only_events: bool = Query(default=False),
@@ -221,12 +892,23 @@ def get_trip_evidence(
     yaw_rate_threshold_dps: float = Query(default=18.0, ge=0.0, le=500.0),
     default_speed_limit_kmh: float = Query(default=120.0, ge=10.0, le=200.0),
     max_rows: int = Query(default=0, ge=0, le=200000),
+    t_start: float | None = Query(default=None),
+    t_end: float | None = Query(default=None),
 ) -> dict:
     idx = trip_index()
     trip = idx.by_id.get(trip_id)
     if trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
 
+    _trip_conditional(
+        request,
+        response,
+        trip,
+        [
+            trip.folder_path / f"{stem}.txt"
+            for stem in ("RAW_GPS", "RAW_ACCELEROMETERS", "PROC_OPENSTREETMAP_DATA")
+        ],
+    )
     k = kind.strip().lower()
 
     def _clip(arr: np.ndarray) -> np.ndarray:
@@ -272,42 +954,23 @@ def get_trip_evidence(
             )
         return {"columns": columns + ["isEvent"], "rows": rows}
 
+    # Masks and edges are computed on the whole trip and then windowed, so
+    # the first sample of a window sees the same history as in ICM scoring.
+    features = TripFeatures(trip)
+
     if k == "speeding":
-        # Load GPS only for speeding evidence
         try:
-            gps = get_gps_track(trip, downsample=1)
+            gps_t = features.gps_t
         except FileNotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e)) from e
 
-        t = _clip(np.asarray(gps.t, dtype=float))
-        speed = _clip(np.asarray(gps.speed, dtype=float))
-
-        # Use OSM speed limit if aligned; else default.
-        speed_limit = None
-        try:
-            sl = get_series(trip, file_stem="PROC_OPENSTREETMAP_DATA", col=1)
-            rl = get_series(trip, file_stem="PROC_OPENSTREETMAP_DATA", col=2)
-            if sl.v.shape[0] == gps.speed.shape[0]:
-                limit = sl.v.astype(float)
-                if rl.v.shape[0] == limit.shape[0]:
-                    good = (rl.v.astype(float) > 0) & (np.isfinite(rl.v.astype(float)))
-                    limit = np.where(good, limit, np.nan)
-                speed_limit = limit
-        except (FileNotFoundError, ValueError):
-            speed_limit = None
-
-        if speed_limit is None:
-            speed_limit = np.full_like(
-                gps.speed, float(default_speed_limit_kmh), dtype=float
-            )
-
-        speed_limit = _clip(np.asarray(speed_limit, dtype=float))
-        limit = np.where(
-            np.isfinite(speed_limit) & (speed_limit > 0),
-            speed_limit,
-            float(default_speed_limit_kmh),
+        window = time_window(gps_t, t_start, t_end)
+        t = _clip(gps_t[window])
+        speed = _clip(features.speed_kmh[window])
+        limit = _clip(features.limit_kmh(default_speed_limit_kmh)[window])
+        mask = _clip(
+            features.speeding_mask(speed_margin_kmh, default_speed_limit_kmh)[window]
         )
-        mask = (np.isfinite(speed)) & (speed > (limit + float(speed_margin_kmh)))
 
         payload = _rows(
             t,
@@ -332,19 +995,20 @@ def get_trip_evidence(
 
     if k in ("harsh_accel", "harsh_brake"):
         try:
-            ax = get_accelerometers(trip, axis="x_kf", downsample=1)
+            window = time_window(features.accel_t, t_start, t_end)
         except FileNotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e)) from e
 
-        ax_t = np.asarray(ax.t, dtype=float)
-        ax_v = np.asarray(ax.v, dtype=float)
         if k == "harsh_accel":
-            exceed = np.isfinite(ax_v) & (ax_v >= float(accel_threshold_g))
+            exceed = features.accel_exceed(accel_threshold_g)
         else:
-            exceed = np.isfinite(ax_v) & (ax_v <= -float(brake_threshold_g))
+            exceed = features.brake_exceed(brake_threshold_g)
 
         # Mark only event starts (rising edges) to match ICM event counting.
-        mask = exceed & np.logical_not(np.r_[False, exceed[:-1]])
+        mask = rising_edges(exceed)[window]
+        ax_t = features.accel_t[window]
+        ax_v = features.ax_g[window]
+        exceed = exceed[window]
 
         payload = _rows(
             ax_t,
@@ -372,28 +1036,18 @@ def get_trip_evidence(
 
     if k == "harsh_turns":
         try:
-            yaw = get_accelerometers(trip, axis="yaw", downsample=1)
+            window = time_window(features.accel_t, t_start, t_end)
         except FileNotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e)) from e
 
-        yaw_t = np.asarray(yaw.t, dtype=float)
-        yaw_v = np.asarray(yaw.v, dtype=float)
-
-        # Approx dyaw/dt on same sample index (yaw_rate at i uses i-1->i)
-        if yaw_t.shape[0] >= 2:
-            dy = np.diff(yaw_v)
-            dt_y = np.diff(yaw_t)
-            dt_y = np.where(dt_y > 0, dt_y, np.nan)
-            yaw_rate = np.r_[np.nan, dy / dt_y]
-        else:
-            yaw_rate = np.full((yaw_t.shape[0],), np.nan)
-
-        exceed = np.isfinite(yaw_rate) & (
-            np.abs(yaw_rate) >= float(yaw_rate_threshold_dps)
-        )
+        exceed = features.turn_exceed(yaw_rate_threshold_dps)
 
         # Mark only event starts (rising edges) to match ICM event counting.
-        mask = exceed & np.logical_not(np.r_[False, exceed[:-1]])
+        mask = rising_edges(exceed)[window]
+        yaw_t = features.accel_t[window]
+        yaw_v = features.yaw_deg[window]
+        yaw_rate = features.yaw_rate_dps[window]
+        exceed = exceed[window]
 
         payload = _rows(
             yaw_t,
@@ -422,8 +1076,62 @@ def get_trip_evidence(
     raise HTTPException(status_code=400, detail=f"Unknown evidence kind: {kind}")
 
 
+@app.get("/api/segments")
+@_offload("batch")
+def query_segments(
+    kind: Literal["harsh_accel", "harsh_brake", "harsh_turn", "speeding"] = Query(
+        default="harsh_brake"
+    ),
+    min_peak: float | None = Query(default=None),
+    max_peak: float | None = Query(default=None),
+    min_duration: float | None = Query(default=None),
+    max_duration: float | None = Query(default=None),
+    trip: list[str] = Query(default=[]),
+    driver: list[str] = Query(default=[]),
+    ascending: bool = Query(default=False),
+    limit: int = Query(default=100, ge=0, le=100_000),
+    offset: int = Query(default=0, ge=0),
+) -> dict:
+    """Detected segments of all trips, strongest first (e.g. the 100 hardest brakes).
+
+    Segments are detected with the default ICM thresholds; `peak` is in g
+    (accel/brake), deg/s (turn) or km/h over the limit (speeding).
+    """
+
+    index = SEGMENT_INDEX.get(trip_index())
+    hits = index.query(
+        kind,
+        min_peak=min_peak,
+        max_peak=max_peak,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        trip_ids=trip,
+        drivers=driver,
+        ascending=ascending,
+    )
+    return {
+        "kind": kind,
+        "thresholds": SEGMENT_INDEX.thresholds,
+        "total": int(hits.shape[0]),
+        "offset": offset,
+        "limit": limit,
+        "counts": {k: index.count(k) for k in SEGMENT_KINDS},
+        "segments": [index.record(i) for i in hits[offset : offset + limit].tolist()],
+    }
+
+
+def _icm_conditional(request: Request, response: Response, idx: TripIndex) -> None:
+    # Weak: the body also carries live result-cache counters.
+    fingerprints = [fp for t in idx.trips for fp in trip_fingerprint(t)]
+    key = "\0".join(t.id for t in idx.trips)
+    _conditional(request, response, fingerprints, key=key, weak=True)
+
+
 @app.get("/api/icm")
+@_offload("batch")
 def get_icm(
+    request: Request,
+    response: Response,
     speed_margin_kmh: float = Query(default=5.0, ge=0.0, le=50.0),
     accel_threshold_g: float = Query(default=0.25, ge=0.0, le=5.0),
     brake_threshold_g: float = Query(default=0.35, ge=0.0, le=5.0),
@@ -431,22 +1139,18 @@ def get_icm(
     default_speed_limit_kmh: float = Query(default=120.0, ge=10.0, le=200.0),
 ) -> dict:
     idx = trip_index()
-
-    trip_results = []
-    for trip in idx.trips:
-        try:
-            r = compute_trip_icm(
-                trip,
-                speed_margin_kmh=speed_margin_kmh,
-                accel_threshold_g=accel_threshold_g,
-                brake_threshold_g=brake_threshold_g,
-                yaw_rate_threshold_dps=yaw_rate_threshold_dps,
-                default_speed_limit_kmh=default_speed_limit_kmh,
-            )
-            trip_results.append(r)
-        except FileNotFoundError:
-            # Skip trips missing required data
-            continue
+    _icm_conditional(request, response, idx)
+
+    trip_results = compute_icm_for_trips(
+        idx.trips,
+        workers=ICM_WORKERS,
+        cache=ICM_CACHE,
+        speed_margin_kmh=speed_margin_kmh,
+        accel_threshold_g=accel_threshold_g,
+        brake_threshold_g=brake_threshold_g,
+        yaw_rate_threshold_dps=yaw_rate_threshold_dps,
+        default_speed_limit_kmh=default_speed_limit_kmh,
+    )
 
     drivers = aggregate_driver_scores(trip_results)
     return {
@@ -459,6 +1163,82 @@ def get_icm(
             "yawRateThresholdDps": yaw_rate_threshold_dps,
             "defaultSpeedLimitKmh": default_speed_limit_kmh,
         },
+        "cache": ICM_CACHE.stats(),
+    }
+
+
+# Upper bound on grid combinations per /api/icm/sweep request; the response
+# holds one score per combination for every trip.
+_SWEEP_MAX_POINTS = 4096
+
+# Allowed range of each sweep parameter (same bounds as /api/icm).
+_SWEEP_BOUNDS: dict[str, tuple[float, float]] = {
+    "speed_margin_kmh": (0.0, 50.0),
+    "accel_threshold_g": (0.0, 5.0),
+    "brake_threshold_g": (0.0, 5.0),
+    "yaw_rate_threshold_dps": (0.0, 500.0),
+}
+
+
+@app.get("/api/icm/sweep")
+@_offload("batch")
+def get_icm_sweep(
+    request: Request,
+    response: Response,
+    speed_margin_kmh: list[float] = Query(default=[5.0]),
+    accel_threshold_g: list[float] = Query(default=[0.25]),
+    brake_threshold_g: list[float] = Query(default=[0.35]),
+    yaw_rate_threshold_dps: list[float] = Query(default=[18.0]),
+    default_speed_limit_kmh: float = Query(default=120.0, ge=10.0, le=200.0),
+) -> dict:
+    """ICM for every combination of the given parameter values.
+
+    Grid parameters may be repeated (`?accel_threshold_g=0.2&accel_threshold_g=0.3`).
+    `icm` arrays are nested as speed margin x accel x brake x yaw rate.
+    """
+
+    grid = {
+        "speed_margin_kmh": speed_margin_kmh,
+        "accel_threshold_g": accel_threshold_g,
+        "brake_threshold_g": brake_threshold_g,
+        "yaw_rate_threshold_dps": yaw_rate_threshold_dps,
+    }
+    n_points = 1
+    for name, values in grid.items():
+        lo, hi = _SWEEP_BOUNDS[name]
+        if not values:
+            raise HTTPException(status_code=400, detail=f"{name} is empty")
+        if any(not (lo <= v <= hi) for v in values):
+            raise HTTPException(
+                status_code=400, detail=f"{name} values must be in [{lo}, {hi}]"
+            )
+        n_points *= len(values)
+    if n_points > _SWEEP_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Grid has {n_points} points (max {_SWEEP_MAX_POINTS})",
+        )
+
+    idx = trip_index()
+    _icm_conditional(request, response, idx)
+    sweeps = compute_icm_sweep_for_trips(
+        idx.trips,
+        workers=ICM_WORKERS,
+        default_speed_limit_kmh=default_speed_limit_kmh,
+        **{name: tuple(values) for name, values in grid.items()},
+    )
+
+    return {
+        "drivers": aggregate_driver_sweeps(sweeps),
+        "trips": [s.to_dict() for s in sweeps],
+        "grid": {
+            "speedMarginKmh": speed_margin_kmh,
+            "accelThresholdG": accel_threshold_g,
+            "brakeThresholdG": brake_threshold_g,
+            "yawRateThresholdDps": yaw_rate_threshold_dps,
+        },
+        "shape": [len(v) for v in grid.values()],
+        "params": {"defaultSpeedLimitKmh": default_speed_limit_kmh},
     }
 
 
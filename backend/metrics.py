@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Prometheus text exposition format, version 0.0.4.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached responses (sub-ms) up to full-dataset ICM runs.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+Labels = Tuple[str, ...]
+# (labels, value) pairs of one metric, as returned by collectors.
+Samples = List[Tuple[Dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(x: float) -> str:
+    if x == float("inf"):
+        return "+Inf"
+    return repr(float(x)) if isinstance(x, float) else str(x)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(labels[n] for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(
+                f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observing is a bisect and three adds."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum].
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels[n] for n in self.label_names)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][i] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for le, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                labels = _labels(self.label_names, key, f'le="{_number(le)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+Collector = Callable[[], List[Tuple[str, str, str, Samples]]]
+
+
+class Registry:
+    """Counters and histograms updated in place, plus collectors read on render.
+
+    A collector returns `(name, type, help, samples)` tuples for values that
+    already live elsewhere (cache stats, queue depths, RSS).
+    """
+
+    def __init__(self) -> None:
+        self._metrics: List[Counter | Histogram] = []
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, help: str, label_names: Sequence[str] = ()
+    ) -> Histogram:
+        metric = Histogram(name, help, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(
+                        f"{name}{_labels(list(labels), list(labels.values()))} "
+                        f"{_number(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "uah_stage_seconds",
+    "Time spent in one stage (load, parse, compute, serialize) of a request.",
+    ("stage", "name"),
+)
+PARSED_BYTES = REGISTRY.counter(
+    "uah_parsed_bytes_total", "Bytes of dataset text parsed.", ("file",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "uah_http_request_seconds",
+    "HTTP request latency, until the last body byte is sent.",
+    ("route", "method", "status"),
+)
+RESPONSE_BYTES = REGISTRY.counter(
+    "uah_http_response_bytes_total", "HTTP response body bytes sent.", ("route",)
+)
+
+
+@contextmanager
+def stage(stage: str, name: str) -> Iterator[None]:
+    """Record the time spent in the block under uah_stage_seconds."""
+
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage=stage, name=name)
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    return rss if os.uname().sysname == "Darwin" else rss * 1024
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and body size per route template."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_counted(message: dict) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_counted)
+        finally:
+            # The router stores the matched route in the (shared) scope.
+            route = getattr(scope.get("route"), "path", None)
+            if route is None:
+                route = "unmatched" if scope["path"].startswith("/api/") else "static"
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - t0,
+                route=route,
+                method=scope["method"],
+                status=str(status),
+            )
+            RESPONSE_BYTES.inc(size, route=route)
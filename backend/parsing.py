@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import io
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+# OSM `highway=*` values seen in PROC_OPENSTREETMAP_DATA. The code of a road
+# type is its index here, so codes are stable across trips.
+ROAD_TYPES: tuple[str, ...] = (
+    "motorway",
+    "trunk",
+    "primary",
+    "secondary",
+    "tertiary",
+    "unclassified",
+    "residential",
+    "service",
+    "motorway_link",
+    "trunk_link",
+    "primary_link",
+    "secondary_link",
+    "tertiary_link",
+    "living_street",
+    "road",
+)
+
+# Known string-valued columns per file stem (file column index, time is 0).
+CATEGORICAL_COLUMNS: dict[str, dict[int, tuple[str, ...]]] = {
+    "PROC_OPENSTREETMAP_DATA": {3: ROAD_TYPES},
+}
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def _first_data_line(buf: bytes) -> Optional[str]:
+    for line in io.BytesIO(buf):
+        s = line.split(b"#", 1)[0].strip()
+        if s:
+            return s.decode("utf-8", errors="replace")
+    return None
+
+
+def _category_converter(vocab: Sequence[str]) -> Callable[[str], float]:
+    lookup = {name: float(i) for i, name in enumerate(vocab)}
+
+    def convert(token: str) -> float:
+        code = lookup.get(token)
+        if code is not None:
+            return code
+        try:
+            return float(token)
+        except ValueError:
+            return np.nan
+
+    return convert
+
+
+def _parse_bulk(
+    buf: bytes, n_cols: int, cols: Sequence[int], categorical: Dict[int, Sequence[str]]
+) -> Dict[int, np.ndarray]:
+    # One pass of np.loadtxt's C tokenizer for numeric and categorical columns
+    # together: string cells go through a per-column converter, everything
+    # else is converted in C, and columns outside `usecols` are skipped.
+    converters = {c: _category_converter(v) for c, v in categorical.items()}
+    data = np.loadtxt(
+        io.BytesIO(buf),
+        dtype=float,
+        usecols=None if len(cols) == n_cols else cols,
+        converters=converters or None,
+        ndmin=2,
+    )
+    return {c: data[:, j] for j, c in enumerate(cols)}
+
+
+def _parse_lines(
+    buf: bytes,
+    n_cols: int,
+    cols: Sequence[int],
+    categorical: Dict[int, Sequence[str]],
+) -> Dict[int, np.ndarray]:
+    # Tolerant fallback: rows with a different number of fields are skipped
+    # and unparseable cells become NaN (what genfromtxt(invalid_raise=False)
+    # did before).
+    lookups = {
+        c: {name: float(i) for i, name in enumerate(v)} for c, v in categorical.items()
+    }
+    values: Dict[int, list[float]] = {c: [] for c in cols}
+    text = buf.decode("utf-8", errors="replace")
+    for line in io.StringIO(text):
+        parts = line.split("#", 1)[0].split()
+        if len(parts) != n_cols:
+            continue
+        for c in cols:
+            tok = parts[c]
+            try:
+                values[c].append(float(tok))
+            except ValueError:
+                values[c].append(lookups.get(c, {}).get(tok, np.nan))
+    return {c: np.asarray(v, dtype=float) for c, v in values.items()}
+
+
+def parse_file(
+    path: Path, *, usecols: Optional[Iterable[int]] = None
+) -> Dict[int, np.ndarray]:
+    """Parse a UAH-DriveSet text file into float columns.
+
+    Fully numeric files read whole go straight to np.loadtxt, as they always
+    did. Files with string columns, ragged rows or a `usecols` subset are
+    read into memory once and tokenized in a single np.loadtxt pass that
+    only materializes the requested columns (all when None). Known string
+    columns (see CATEGORICAL_COLUMNS) become float category codes in that
+    same pass; any other non-numeric cell becomes NaN.
+
+    Returns a mapping of file column index (0 = time) to a 1D float array.
+    """
+
+    if usecols is None and path.stem not in CATEGORICAL_COLUMNS:
+        try:
+            with warnings.catch_warnings():
+                # Empty or comment-only files: parse_bytes returns {}.
+                warnings.simplefilter("ignore", UserWarning)
+                data = np.loadtxt(str(path), dtype=float, ndmin=2)
+        except ValueError:
+            # String cells or ragged rows: handled by parse_bytes.
+            pass
+        else:
+            if data.size:
+                return {c: data[:, c] for c in range(data.shape[1])}
+    return parse_bytes(path.read_bytes(), path.stem, usecols=usecols)
+
+
+def parse_bytes(
+    buf: bytes, file_stem: str, *, usecols: Optional[Iterable[int]] = None
+) -> Dict[int, np.ndarray]:
+    """`parse_file` on the contents (or a run of whole lines) of a file."""
+
+    first = _first_data_line(buf)
+    if first is None:
+        return {}
+
+    tokens = first.split()
+    n_cols = len(tokens)
+    cols = list(range(n_cols)) if usecols is None else sorted(set(usecols))
+    for c in cols:
+        if c < 0 or c >= n_cols:
+            raise ValueError(f"col out of range: {c} (file has {n_cols - 1})")
+
+    known = CATEGORICAL_COLUMNS.get(file_stem, {})
+    string_cols = {i for i, tok in enumerate(tokens) if not _is_number(tok)}
+    string_cols |= set(known)
+    categorical = {c: known.get(c, ()) for c in cols if c in string_cols}
+
+    try:
+        out = _parse_bulk(buf, n_cols, cols, categorical)
+    except ValueError:
+        # Ragged rows or strings in an unexpected column.
+        out = _parse_lines(buf, n_cols, cols, categorical)
+    return out
+
+
+def parse_event_file(path: Path) -> list[dict]:
+    """Events of one EVENTS* file, in file order.
+
+    Format is not strictly enforced here; we parse as:
+    - ignore empty lines
+    - ignore lines starting with '#'
+    - first token: float timestamp (seconds since route start)
+    - remaining tokens: label text
+    """
+
+    out: list[dict] = []
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            s = line.strip()
+            if not s or s.startswith("#"):
+                continue
+            parts = s.split()
+            if len(parts) == 0:
+                continue
+            try:
+                t = float(parts[0])
+            except ValueError:
+                # Skip header/invalid rows
+                continue
+
+            direction = None
+            label = " ".join(parts[1:]).strip()
+            extras: list[str] = []
+            duration_seconds: float | None = None
+
+            if path.name.startswith("EVENTS_LIST_LANE_CHANGES") and len(parts) >= 2:
+                try:
+                    direction = int(float(parts[1]))
+                except ValueError:
+                    direction = None
+                extras = parts[2:]
+                if len(parts) >= 4:
+                    try:
+                        duration_seconds = float(parts[3])
+                    except ValueError:
+                        duration_seconds = None
+                    if duration_seconds is not None and duration_seconds <= 0:
+                        duration_seconds = None
+                if direction == 1:
+                    label = "Right"
+                elif direction == -1:
+                    label = "Left"
+                else:
+                    label = "LaneChange"
+
+            out.append(
+                {
+                    "t": t,
+                    "label": label,
+                    "source": path.name,
+                    "direction": direction,
+                    "extras": extras,
+                    "durationSeconds": duration_seconds,
+                }
+            )
+    return out
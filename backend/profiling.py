@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import json
+import pstats
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from urllib.parse import parse_qs
+
+T = TypeVar("T")
+
+# Set while a `?profile=1` request is being handled (see ProfileMiddleware).
+CURRENT_PROFILE: ContextVar[Optional["ProfileSession"]] = ContextVar(
+    "CURRENT_PROFILE", default=None
+)
+
+_TOP_FUNCTIONS = 40
+
+# C functions that block (the event loop waiting for workers, lock waits);
+# reported apart so they do not dominate the shares.
+_WAITING = ("poll", "select", "acquire", "'wait'", "sleep")
+
+
+def _group(filename: str, name: str) -> str:
+    """Where a profiled function lives: a backend module, numpy, serialization, ..."""
+
+    path = filename.replace("\\", "/")
+    if path == "~":
+        # C functions and methods: `<method 'tolist' of 'numpy.ndarray' objects>`.
+        if any(w in name for w in _WAITING):
+            return "waiting"
+        if "tolist" in name or "json" in name:
+            return "serialization"
+        if "numpy" in name:
+            return "numpy"
+        return "builtins"
+    if "/backend/" in path:
+        return "backend/" + path.rsplit("/backend/", 1)[1]
+    if "/json/" in path or path.endswith(("fastapi/encoders.py", "responses.py")):
+        return "serialization"
+    if "/numpy/" in path:
+        return "numpy"
+    if "/fastapi/" in path or "/starlette/" in path or "/anyio/" in path:
+        return "framework"
+    if "/asyncio/" in path or "/concurrent/" in path or "threading.py" in path:
+        return "asyncio/threads"
+    return "other"
+
+
+class ProfileSession:
+    """cProfile data of one request, from the event loop and worker threads."""
+
+    def __init__(self) -> None:
+        self._loop_profile = cProfile.Profile()
+        self._profiles: List[cProfile.Profile] = [self._loop_profile]
+        self._notes: List[str] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._loop_profile.enable()
+
+    def stop(self) -> None:
+        self._loop_profile.disable()
+
+    def wrap(self, fn: Callable[[], T]) -> Callable[[], T]:
+        """`fn` profiled in whatever thread runs it, with CURRENT_PROFILE set."""
+
+        def run() -> T:
+            reset = CURRENT_PROFILE.set(self)
+            try:
+                return self._run_profiled(fn)
+            finally:
+                CURRENT_PROFILE.reset(reset)
+
+        return run
+
+    def note(self, text: str) -> None:
+        """Add a caveat to the report (e.g. work that was run differently)."""
+
+        with self._lock:
+            if text not in self._notes:
+                self._notes.append(text)
+
+    def _run_profiled(self, fn: Callable[[], T]) -> T:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: the event loop profiler already covers all threads.
+            return fn()
+        try:
+            return fn()
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def stats(self) -> pstats.Stats:
+        with self._lock:
+            stats = pstats.Stats(self._profiles[0])
+            for p in self._profiles[1:]:
+                stats.add(p)
+        return stats
+
+    def report(self, stats: pstats.Stats) -> Dict[str, Any]:
+        """Self time per group and the top functions by cumulative time.
+
+        Shares are of the time spent working, i.e. without "waiting".
+        `notes` lists what the profile does not show as it would run
+        unprofiled.
+        """
+
+        groups: Dict[str, float] = {}
+        functions = []
+        for (filename, line, name), (cc, nc, tt, ct, _) in stats.stats.items():
+            group = _group(filename, name)
+            groups[group] = groups.get(group, 0.0) + tt
+            functions.append(
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "group": group,
+                    "calls": nc,
+                    "selfSeconds": tt,
+                    "cumulativeSeconds": ct,
+                }
+            )
+        total = sum(s for g, s in groups.items() if g != "waiting") or 1.0
+        functions.sort(key=lambda f: f["cumulativeSeconds"], reverse=True)
+        return {
+            "groups": [
+                {
+                    "group": g,
+                    "selfSeconds": s,
+                    "share": None if g == "waiting" else s / total,
+                }
+                for g, s in sorted(groups.items(), key=lambda kv: kv[1], reverse=True)
+            ],
+            "top": functions[:_TOP_FUNCTIONS],
+            "notes": list(self._notes),
+        }
+
+
+class ProfileMiddleware:
+    """Run `/api/*?profile=1` requests under cProfile and return the profile.
+
+    The handler runs normally (including serialization) but its body is
+    replaced by a JSON report; with `save_dir` the raw pstats file is kept
+    there too. When `token` is set the request must send it in
+    `X-Profile-Token`. Profiled requests run one at a time, and the event
+    loop profile also sees any other request handled meanwhile.
+
+    Only installed when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self, app: Any, *, token: Optional[str] = None, save_dir: Optional[Path] = None
+    ) -> None:
+        self.app = app
+        self.token = token
+        self.save_dir = save_dir
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get("profile", ["0"])[-1] not in ("1", "true"):
+            await self.app(scope, receive, send)
+            return
+
+        if self.token is not None:
+            headers = dict(scope.get("headers") or [])
+            if headers.get(b"x-profile-token", b"").decode("latin-1") != self.token:
+                await _send_json(send, 403, {"detail": "Invalid profile token"})
+                return
+
+        status = 500
+        size = 0
+
+        async def capture(message: dict) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+
+        async with self._lock:
+            session = ProfileSession()
+            reset = CURRENT_PROFILE.set(session)
+            t0 = time.perf_counter()
+            session.start()
+            try:
+                await self.app(scope, receive, capture)
+            finally:
+                session.stop()
+                CURRENT_PROFILE.reset(reset)
+            wall_s = time.perf_counter() - t0
+
+        stats = session.stats()
+        report: Dict[str, Any] = {
+            "path": scope["path"],
+            "status": status,
+            "responseBytes": size,
+            "wallSeconds": wall_s,
+            **session.report(stats),
+        }
+        if self.save_dir is not None:
+            target = (
+                self.save_dir
+                / f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof"
+            )
+            try:
+                self.save_dir.mkdir(parents=True, exist_ok=True)
+                stats.dump_stats(str(target))
+                report["saved"] = str(target)
+            except OSError as e:
+                report["saveError"] = str(e)
+        await _send_json(send, 200, report)
+
+
+async def _send_json(send: Any, status: int, body: Dict[str, Any]) -> None:
+    payload = json.dumps(body).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode("ascii")),
+                (b"cache-control", b"no-store"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": payload})
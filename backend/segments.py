@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .icm import (
+    DEFAULT_ICM_PARAMS,
+    TripFeatures,
+    TripFingerprint,
+    _compute_many,
+    _driver_from_trip_id,
+    trip_fingerprint,
+)
+from .trips import Trip, TripIndex
+
+# Bump when the stored layout or the detection changes.
+SEGMENT_INDEX_VERSION = 1
+
+SEGMENT_KINDS: Tuple[str, ...] = (
+    "harsh_accel",
+    "harsh_brake",
+    "harsh_turn",
+    "speeding",
+)
+
+# Detection thresholds, the defaults of compute_trip_icm.
+DEFAULT_SEGMENT_THRESHOLDS: Dict[str, float] = dict(DEFAULT_ICM_PARAMS)
+
+
+@dataclass(frozen=True)
+class TripSegments:
+    """Detected event segments of one trip, one entry per segment.
+
+    A segment is a run of consecutive samples over the threshold. `start`
+    is the time of its first sample and `end` the time of the first sample
+    after it (the last sample of the trip if the run reaches the end), so
+    speeding durations add up to `speeding_seconds`. `peak` is the largest
+    value inside the run: acceleration or deceleration in g, |yaw rate| in
+    deg/s, or km/h over the limit.
+    """
+
+    kind: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    peak: np.ndarray
+
+
+def _runs(
+    t: np.ndarray, values: np.ndarray, mask: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(start, end, peak) of every run of True in `mask`."""
+
+    m = np.asarray(mask, dtype=bool)
+    if not m.any():
+        empty = np.empty((0,), dtype=float)
+        return empty, empty, empty
+    edges = np.diff(np.r_[0, m.astype(np.int8), 0])
+    first = np.flatnonzero(edges == 1)
+    after = np.flatnonzero(edges == -1)
+    # Samples outside runs cannot win the max of the slice they fall in.
+    peak = np.maximum.reduceat(np.where(m, values, -np.inf), first)
+    end = t[np.minimum(after, t.shape[0] - 1)]
+    return t[first], end, peak
+
+
+def detect_trip_segments(
+    trip: Trip,
+    *,
+    speed_margin_kmh: float = 5.0,
+    accel_threshold_g: float = 0.25,
+    brake_threshold_g: float = 0.35,
+    yaw_rate_threshold_dps: float = 18.0,
+    default_speed_limit_kmh: float = 120.0,
+) -> TripSegments:
+    """Segments of every kind with the same masks as compute_trip_icm.
+
+    Kinds whose source file is missing or unreadable have no segments.
+    """
+
+    features = TripFeatures(trip)
+    detectors: List[Callable[[], Tuple[np.ndarray, np.ndarray, np.ndarray]]] = [
+        lambda: (
+            features.accel_t,
+            features.ax_g,
+            features.accel_exceed(accel_threshold_g),
+        ),
+        lambda: (
+            features.accel_t,
+            -features.ax_g,
+            features.brake_exceed(brake_threshold_g),
+        ),
+        lambda: (
+            features.accel_t,
+            np.abs(features.yaw_rate_dps),
+            features.turn_exceed(yaw_rate_threshold_dps),
+        ),
+        lambda: (
+            features.gps_t,
+            features.speed_kmh - features.limit_kmh(default_speed_limit_kmh),
+            features.speeding_mask(speed_margin_kmh, default_speed_limit_kmh),
+        ),
+    ]
+
+    parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+    for code, detect in enumerate(detectors):
+        try:
+            start, end, peak = _runs(*detect())
+        except (FileNotFoundError, ValueError):
+            continue
+        parts.append((np.full(start.shape, code, np.int8), start, end, peak))
+
+    if not parts:
+        empty = np.empty((0,), dtype=float)
+        return TripSegments(np.empty((0,), np.int8), empty, empty, empty)
+    kind, start, end, peak = (np.concatenate(cols) for cols in zip(*parts))
+    return TripSegments(kind=kind, start=start, end=end, peak=peak)
+
+
+def _detect(trip: Trip, params: Dict[str, float]) -> TripSegments:
+    return detect_trip_segments(trip, **params)
+
+
+@dataclass(frozen=True)
+class SegmentIndex:
+    """Segments of all trips, ordered by (kind, peak).
+
+    `bounds[k]:bounds[k + 1]` is the slice of SEGMENT_KINDS[k], ascending by
+    peak, so top-k is the tail of a slice and a peak range two binary
+    searches; other filters only mask the selected slice.
+    """
+
+    trip_ids: Tuple[str, ...]
+    trip: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    peak: np.ndarray
+    bounds: np.ndarray
+
+    def count(self, kind: str) -> int:
+        k = SEGMENT_KINDS.index(kind)
+        return int(self.bounds[k + 1] - self.bounds[k])
+
+    def query(
+        self,
+        kind: str,
+        *,
+        min_peak: Optional[float] = None,
+        max_peak: Optional[float] = None,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None,
+        trip_ids: Sequence[str] = (),
+        drivers: Sequence[str] = (),
+        ascending: bool = False,
+    ) -> np.ndarray:
+        """Positions of the matching segments of `kind`, by peak (highest first).
+
+        Peak and duration bounds are inclusive. Among equal peaks, segments
+        come in trip and start order (reversed when `ascending`).
+        """
+
+        k = SEGMENT_KINDS.index(kind)
+        lo, hi = int(self.bounds[k]), int(self.bounds[k + 1])
+        peaks = self.peak[lo:hi]
+        a = 0 if min_peak is None else int(np.searchsorted(peaks, min_peak, "left"))
+        b = hi - lo
+        if max_peak is not None:
+            b = int(np.searchsorted(peaks, max_peak, "right"))
+        picked = np.arange(lo + a, lo + max(a, b))
+
+        if min_duration is not None or max_duration is not None or trip_ids or drivers:
+            keep = np.ones(picked.shape, dtype=bool)
+            duration = self.end[picked] - self.start[picked]
+            if min_duration is not None:
+                keep &= duration >= min_duration
+            if max_duration is not None:
+                keep &= duration <= max_duration
+            if trip_ids or drivers:
+                wanted = [
+                    i
+                    for i, tid in enumerate(self.trip_ids)
+                    if tid in trip_ids or _driver_from_trip_id(tid) in drivers
+                ]
+                keep &= np.isin(self.trip[picked], wanted)
+            picked = picked[keep]
+        return picked if ascending else picked[::-1]
+
+    def record(self, i: int) -> dict:
+        trip_id = self.trip_ids[int(self.trip[i])]
+        start, end = float(self.start[i]), float(self.end[i])
+        return {
+            "tripId": trip_id,
+            "driverId": _driver_from_trip_id(trip_id),
+            "start": start,
+            "end": end,
+            "durationSeconds": end - start,
+            "peak": float(self.peak[i]),
+        }
+
+
+_Entry = Tuple[TripFingerprint, TripSegments]
+
+
+def _build(trip_ids: Sequence[str], entries: Dict[str, _Entry]) -> SegmentIndex:
+    trip_col: List[np.ndarray] = []
+    kind_col: List[np.ndarray] = []
+    start_col: List[np.ndarray] = []
+    end_col: List[np.ndarray] = []
+    peak_col: List[np.ndarray] = []
+    for code, tid in enumerate(trip_ids):
+        seg = entries[tid][1]
+        trip_col.append(np.full(seg.kind.shape, code, np.int32))
+        kind_col.append(seg.kind)
+        start_col.append(seg.start)
+        end_col.append(seg.end)
+        peak_col.append(seg.peak)
+
+    trip = _concat(trip_col, np.int32)
+    kind = _concat(kind_col, np.int8)
+    start = _concat(start_col, float)
+    peak = _concat(peak_col, float)
+    # Equal peaks in reverse (trip, start) order, so the descending view
+    # (the common one) lists them in trip/time order.
+    order = np.lexsort((-start, -trip, peak, kind))
+    bounds = np.searchsorted(kind[order], np.arange(len(SEGMENT_KINDS) + 1))
+    return SegmentIndex(
+        trip_ids=tuple(trip_ids),
+        trip=trip[order],
+        start=start[order],
+        end=_concat(end_col, float)[order],
+        peak=peak[order],
+        bounds=bounds,
+    )
+
+
+class SegmentIndexStore:
+    """SegmentIndex over all trips, maintained incrementally.
+
+    Each trip's segments are kept with the fingerprint of its source files
+    (trip_fingerprint); a refresh re-detects only trips that are new or
+    whose files changed (on the ICM process pool when `workers` > 1), then
+    rebuilds the sorted arrays.
+
+    Queries are served from the last built snapshot; only the very first one
+    waits for a build. Once the snapshot is older than `max_age_s`, or the
+    trip index changed, the next query starts a refresh on a background
+    thread.
+    With a `path`, per-trip segments are saved there so a restart does not
+    re-detect unchanged trips.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        max_age_s: float = 30.0,
+        thresholds: Optional[Dict[str, float]] = None,
+        workers: int = 1,
+    ) -> None:
+        self.path = path
+        self.max_age_s = max_age_s
+        self.thresholds = dict(thresholds or DEFAULT_SEGMENT_THRESHOLDS)
+        self.workers = workers
+        self._entries: Optional[Dict[str, _Entry]] = None
+        self._index: Optional[SegmentIndex] = None
+        self._trips: Optional[TripIndex] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Held for a whole refresh, so only one detects segments at a time.
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self.last_refresh: dict = {}
+
+    def get(self, trips: TripIndex) -> SegmentIndex:
+        with self._lock:
+            index = self._index
+            if index is not None:
+                if not self._is_fresh(trips) and not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._refresh_in_background,
+                        args=(trips,),
+                        name="segment-index",
+                        daemon=True,
+                    ).start()
+                return index
+        return self._refresh(trips)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _is_fresh(self, trips: TripIndex) -> bool:
+        age = time.monotonic() - self._checked_at
+        return self._trips is trips and age < self.max_age_s
+
+    def _refresh_in_background(self, trips: TripIndex) -> None:
+        try:
+            self._refresh(trips)
+        except Exception:
+            # Keep serving the previous snapshot; the next query retries.
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh(self, trips: TripIndex) -> SegmentIndex:
+        with self._refresh_lock:
+            with self._lock:
+                if self._index is not None and self._is_fresh(trips):
+                    return self._index
+                previous = self._index
+
+            t0 = time.perf_counter()
+            if self._entries is None:
+                self._entries = self._load()
+
+            fingerprints = {t.id: trip_fingerprint(t) for t in trips.trips}
+            stale = [
+                t
+                for t in trips.trips
+                if t.id not in self._entries
+                or self._entries[t.id][0] != fingerprints[t.id]
+            ]
+            detected = _compute_many(stale, self.thresholds, self.workers, _detect)
+            entries = {
+                t.id: self._entries[t.id] for t in trips.trips if t.id in self._entries
+            }
+            for trip, segments in zip(stale, detected):
+                entries[trip.id] = (fingerprints[trip.id], segments)
+
+            trip_ids = [t.id for t in trips.trips]
+            index = previous
+            if index is None or stale or list(index.trip_ids) != trip_ids:
+                index = _build(trip_ids, entries)
+            if stale or entries.keys() != self._entries.keys():
+                self._save(entries)
+            self._entries = entries
+            with self._lock:
+                self._index = index
+                self._trips = trips
+                self._checked_at = time.monotonic()
+                self.last_refresh = {
+                    "at": time.time(),
+                    "detectedTrips": len(stale),
+                    "durationMs": (time.perf_counter() - t0) * 1000.0,
+                }
+            return index
+
+    def _load(self) -> Dict[str, _Entry]:
+        if self.path is None:
+            return {}
+        try:
+            with np.load(self.path) as z:
+                meta = json.loads(str(z["meta"]))
+                trip = z["trip"]
+                kind, start, end, peak = z["kind"], z["start"], z["end"], z["peak"]
+            if (
+                meta["version"] != SEGMENT_INDEX_VERSION
+                or meta["thresholds"] != self.thresholds
+            ):
+                return {}
+            entries: Dict[str, _Entry] = {}
+            for code, (tid, fp) in enumerate(zip(meta["trips"], meta["fingerprints"])):
+                sel = trip == code
+                fingerprint = tuple(tuple(x) if x is not None else None for x in fp)
+                entries[tid] = (
+                    fingerprint,
+                    TripSegments(kind[sel], start[sel], end[sel], peak[sel]),
+                )
+            return entries
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save(self, entries: Dict[str, _Entry]) -> None:
+        if self.path is None:
+            return
+        trip_ids = sorted(entries)
+        segments = [entries[tid][1] for tid in trip_ids]
+        meta = {
+            "version": SEGMENT_INDEX_VERSION,
+            "thresholds": self.thresholds,
+            "trips": trip_ids,
+            "fingerprints": [entries[tid][0] for tid in trip_ids],
+        }
+        tmp = self.path.parent / f".{self.path.name}.{uuid.uuid4().hex}"
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f,
+                    meta=np.array(json.dumps(meta)),
+                    trip=_concat(
+                        [np.full(s.kind.shape, i) for i, s in enumerate(segments)],
+                        np.int32,
+                    ),
+                    kind=_concat([s.kind for s in segments], np.int8),
+                    start=_concat([s.start for s in segments], float),
+                    end=_concat([s.end for s in segments], float),
+                    peak=_concat([s.peak for s in segments], float),
+                )
+            os.replace(tmp, self.path)
+        except OSError:
+            # Read-only location: the index still works, just without reuse.
+            tmp.unlink(missing_ok=True)
+
+
+def _concat(cols: List[np.ndarray], dtype: Any) -> np.ndarray:
+    return np.concatenate(cols).astype(dtype) if cols else np.empty((0,), dtype)
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import file_fingerprint
+from .sidecar import FileColumns, SidecarStore
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): the shared cache stays disabled.
+    fcntl = None  # type: ignore[assignment]
+
+_LOCKS = ".locks"
+_MANIFEST = "manifest.json"
+
+# Temp directories of writes older than this were left by a dead worker.
+_STALE_TMP_S = 600.0
+
+
+def default_shared_root(dataset_root: Path) -> Path:
+    """A per-dataset directory on tmpfs (/dev/shm) when available."""
+
+    shm = Path("/dev/shm")
+    base = shm if shm.is_dir() else Path(tempfile.gettempdir())
+    digest = hashlib.sha1(str(dataset_root.resolve()).encode("utf-8")).hexdigest()
+    return base / f"uah-columns-{digest[:12]}"
+
+
+def _is_mapped(cols: FileColumns) -> bool:
+    return all(isinstance(c, np.memmap) for c in cols.columns)
+
+
+class SharedColumnCache:
+    """Parsed columns shared by all server processes as memory-mapped files.
+
+    Entries use the sidecar layout (see SidecarStore) under `root`, normally
+    on tmpfs, so each file is held in RAM once and every worker maps the same
+    pages. On a miss the worker takes an exclusive flock for that file: one
+    process parses while the others wait and then map its result. Columns
+    that already come memory-mapped (fresh sidecars) are returned as is.
+
+    A dead worker cannot wedge or corrupt the cache: the kernel releases its
+    locks, entries only appear through an atomic rename, and temp directories
+    it left behind are removed by a later eviction pass. The total size is
+    bounded by `max_bytes`, least recently used entries first; unlinking a
+    mapped file is safe, workers still holding it keep reading it and the
+    memory is freed when the last one drops it.
+    """
+
+    def __init__(self, root: Optional[Path] = None, *, max_bytes: int = 1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None and fcntl is not None
+
+    def load_or_build(
+        self, source: Path, build: Callable[[Path], FileColumns]
+    ) -> FileColumns:
+        """Columns of `source` from the shared directory, building them once."""
+
+        cols = self._load(source)
+        if cols is not None:
+            self._count("hits")
+            return cols
+
+        key = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:16]
+        with self._locked(key):
+            # Another worker may have built it while we waited for the lock.
+            cols = self._load(source)
+            if cols is not None:
+                self._count("waits")
+                return cols
+            self._count("misses")
+            fp = file_fingerprint(source)
+            built = build(source)
+            if built.n_cols == 0 or _is_mapped(built):
+                return built
+            try:
+                self._store.write(source, built.columns, fp)
+            except OSError:
+                return built
+        self._evict()
+        return self._load(source) or built
+
+    def stats(self) -> dict:
+        entries = self._scan()[0] if self.enabled else []
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "root": str(self.root) if self.root is not None else None,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "evictions": self.evictions,
+            }
+
+    @property
+    def _store(self) -> SidecarStore:
+        return SidecarStore(self.root)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _load(self, source: Path) -> Optional[FileColumns]:
+        cols = self._store.load(source)
+        if cols is not None:
+            # Manifest mtime is the entry's last use, for LRU eviction.
+            try:
+                os.utime(self._store.location(source) / _MANIFEST)
+            except OSError:
+                pass
+        return cols
+
+    @contextmanager
+    def _locked(self, name: str, *, blocking: bool = True) -> Iterator[bool]:
+        assert self.root is not None and fcntl is not None
+        locks = self.root / _LOCKS
+        locks.mkdir(parents=True, exist_ok=True)
+        fd = os.open(locks / f"{name}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+        finally:
+            # Closing the descriptor releases the lock.
+            os.close(fd)
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, Path]], List[Path]]:
+        """(last use, bytes, dir) of every entry, and abandoned temp dirs."""
+
+        assert self.root is not None
+        entries: List[Tuple[float, int, Path]] = []
+        abandoned: List[Path] = []
+        now = time.time()
+        try:
+            bases = [b for b in self.root.iterdir() if not b.name.startswith(".")]
+        except OSError:
+            return entries, abandoned
+        for base in bases:
+            try:
+                locs = list(base.iterdir())
+            except OSError:
+                continue
+            for loc in locs:
+                try:
+                    if loc.name.startswith("."):
+                        if now - loc.stat().st_mtime > _STALE_TMP_S:
+                            abandoned.append(loc)
+                        continue
+                    used = (loc / _MANIFEST).stat().st_mtime
+                    size = sum(f.stat().st_size for f in loc.iterdir())
+                except OSError:
+                    # Half-written by a dead worker, or removed meanwhile.
+                    continue
+                entries.append((used, size, loc))
+        return entries, abandoned
+
+    def _evict(self) -> None:
+        # One process evicts at a time; the others skip the pass.
+        with self._locked("evict", blocking=False) as acquired:
+            if not acquired:
+                return
+            entries, abandoned = self._scan()
+            for loc in abandoned:
+                shutil.rmtree(loc, ignore_errors=True)
+            total = sum(size for _, size, _ in entries)
+            for _, size, loc in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(loc, ignore_errors=True)
+                total -= size
+                self._count("evictions")
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache import Fingerprint, file_fingerprint
+
+# Bump when the on-disk layout changes so old sidecars are rebuilt.
+SIDECAR_VERSION = 2
+
+_MANIFEST = "manifest.json"
+
+
+def default_sidecar_root(dataset_root: Path) -> Path:
+    """A per-dataset directory in the user cache ($XDG_CACHE_HOME or ~/.cache)."""
+
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    digest = hashlib.sha1(str(dataset_root.resolve()).encode("utf-8")).hexdigest()
+    return Path(base) / "uah" / digest[:12]
+
+
+@dataclass(frozen=True)
+class FileColumns:
+    """Columns of one dataset text file (column 0 is time)."""
+
+    columns: Tuple[np.ndarray, ...]
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.columns[0].shape[0]) if self.columns else 0
+
+    @property
+    def n_cols(self) -> int:
+        return len(self.columns)
+
+    def col(self, i: int) -> np.ndarray:
+        if i < 0 or i >= len(self.columns):
+            raise ValueError(
+                f"col out of range: {i} (file has {len(self.columns) - 1})"
+            )
+        return self.columns[i]
+
+    def rows(self, index: slice | np.ndarray) -> np.ndarray:
+        """Materialize the selected rows (all columns) as a 2D float array."""
+
+        if not self.columns:
+            return np.empty((0, 0), dtype=float)
+        return np.column_stack(
+            [np.asarray(c[index], dtype=float) for c in self.columns]
+        )
+
+    @classmethod
+    def from_mapping(cls, columns: Dict[int, np.ndarray]) -> "FileColumns":
+        return cls(columns=tuple(columns[i] for i in range(len(columns))))
+
+
+class SidecarStore:
+    """Per-column `.npy` copies of dataset text files, opened memory-mapped.
+
+    Each source file `<trip>/<STEM>.txt` gets a directory with one `c<i>.npy`
+    per column and a `manifest.json` recording the source mtime/size it was
+    built from. A sidecar whose manifest does not match the current source is
+    treated as missing.
+
+    Sidecars are kept under `root/<hash of trip folder>/<STEM>/`; the server
+    and `backend.ingest` use `default_sidecar_root` unless told otherwise, so
+    the dataset itself is never written. With `root=None` (opt-in, see
+    UAH_SIDECAR_IN_DATASET) they live next to the data in
+    `<trip>/.columns/<STEM>/` instead.
+    """
+
+    def __init__(self, root: Optional[Path] = None, *, enabled: bool = True) -> None:
+        self.root = root
+        self.enabled = enabled
+
+    def location(self, source: Path) -> Path:
+        folder = source.parent
+        if self.root is None:
+            base = folder / ".columns"
+        else:
+            digest = hashlib.sha1(str(folder.resolve()).encode("utf-8")).hexdigest()
+            base = self.root / digest[:16]
+        return base / source.stem
+
+    def line_index_location(self, source: Path) -> Path:
+        """Where the line-offset index of `source` is kept (see lineindex.py)."""
+
+        loc = self.location(source)
+        return loc.parent / f"{loc.name}.lines.npz"
+
+    def load(self, source: Path) -> Optional[FileColumns]:
+        """Open a fresh sidecar for `source`, or return None if missing/stale."""
+
+        if not self.enabled:
+            return None
+        loc = self.location(source)
+        try:
+            manifest = json.loads((loc / _MANIFEST).read_text(encoding="utf-8"))
+            if not self._is_fresh(manifest, file_fingerprint(source)):
+                return None
+            columns = tuple(
+                np.load(loc / f"c{i}.npy", mmap_mode="r")
+                for i in range(int(manifest["cols"]))
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+        return FileColumns(columns=columns)
+
+    def write(
+        self, source: Path, columns: Sequence[np.ndarray], fingerprint: Fingerprint
+    ) -> None:
+        """Atomically replace the sidecar of `source`. Raises OSError on failure."""
+
+        loc = self.location(source)
+        loc.parent.mkdir(parents=True, exist_ok=True)
+        tmp = loc.parent / f".{loc.name}.{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            for i, c in enumerate(columns):
+                np.save(tmp / f"c{i}.npy", np.ascontiguousarray(c))
+            manifest = {
+                "version": SIDECAR_VERSION,
+                "source": source.name,
+                "mtimeNs": fingerprint[0],
+                "size": fingerprint[1],
+                "rows": int(columns[0].shape[0]) if len(columns) else 0,
+                "cols": len(columns),
+            }
+            # Manifest last: a sidecar without one is never considered fresh.
+            (tmp / _MANIFEST).write_text(json.dumps(manifest), encoding="utf-8")
+
+            if loc.exists():
+                old = loc.parent / f".{loc.name}.old.{uuid.uuid4().hex}"
+                os.replace(loc, old)
+                shutil.rmtree(old, ignore_errors=True)
+            os.replace(tmp, loc)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def load_or_build(
+        self, source: Path, parse: Callable[[Path], FileColumns]
+    ) -> FileColumns:
+        """Memory-mapped columns of `source`, parsing the text file when needed.
+
+        A missing or stale sidecar is rebuilt from the text parse. If the
+        sidecar cannot be written the parsed columns are returned in memory.
+        """
+
+        cols = self.load(source)
+        if cols is not None:
+            return cols
+
+        # Fingerprint before parsing: if the file changes mid-parse the
+        # manifest is already stale and the next load rebuilds it.
+        fp = file_fingerprint(source)
+        parsed = parse(source)
+        if not self.enabled or parsed.n_cols == 0:
+            return parsed
+        try:
+            self.write(source, parsed.columns, fp)
+        except OSError:
+            return parsed
+        return self.load(source) or parsed
+
+    @staticmethod
+    def _is_fresh(manifest: dict, fingerprint: Fingerprint) -> bool:
+        return (
+            manifest.get("version") == SIDECAR_VERSION
+            and int(manifest.get("mtimeNs", -1)) == fingerprint[0]
+            and int(manifest.get("size", -1)) == fingerprint[1]
+        )
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+Op = Literal[">", ">=", "<", "<=", "==", "!=", "between"]
+
+_BETWEEN_RE = re.compile(
+    r"^\s*([A-Za-z_]\w*)\s+between\s+(\S+)\s+and\s+(\S+)\s*$", re.IGNORECASE
+)
+_COMPARE_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*(>=|<=|==|!=|=|>|<)\s*(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """`column op value` (or `column between lo and hi`, inclusive).
+
+    NaN cells never match, whatever the operator.
+    """
+
+    column: str
+    op: Op
+    lo: float
+    hi: float = float("nan")
+
+    def mask(self, values: np.ndarray) -> np.ndarray:
+        v = np.asarray(values, dtype=float)
+        if self.op == ">":
+            return v > self.lo
+        if self.op == ">=":
+            return v >= self.lo
+        if self.op == "<":
+            return v < self.lo
+        if self.op == "<=":
+            return v <= self.lo
+        if self.op == "==":
+            return v == self.lo
+        if self.op == "!=":
+            return ~np.isnan(v) & (v != self.lo)
+        return (v >= self.lo) & (v <= self.hi)
+
+    def sorted_range(self, sorted_values: np.ndarray) -> Optional[Tuple[int, int]]:
+        """[a, b) of the matching entries of ascending, NaN-free values.
+
+        None for operators that do not select one contiguous range (`!=`).
+        """
+
+        def left(x: float) -> int:
+            return int(np.searchsorted(sorted_values, x, side="left"))
+
+        def right(x: float) -> int:
+            return int(np.searchsorted(sorted_values, x, side="right"))
+
+        n = int(sorted_values.shape[0])
+        if self.op == ">":
+            return right(self.lo), n
+        if self.op == ">=":
+            return left(self.lo), n
+        if self.op == "<":
+            return 0, left(self.lo)
+        if self.op == "<=":
+            return 0, right(self.lo)
+        if self.op == "==":
+            return left(self.lo), right(self.lo)
+        if self.op == "between":
+            return left(self.lo), right(self.hi)
+        return None
+
+
+def _number(token: str, text: str) -> float:
+    try:
+        x = float(token)
+    except ValueError:
+        raise ValueError(f"Invalid filter: {text!r}") from None
+    if np.isnan(x):
+        raise ValueError(f"Invalid filter: {text!r}")
+    return x
+
+
+def parse_predicate(text: str) -> Predicate:
+    """Parse `speed>120`, `col3 <= 0.5` or `t between 10 and 60`."""
+
+    m = _BETWEEN_RE.match(text)
+    if m:
+        lo, hi = _number(m.group(2), text), _number(m.group(3), text)
+        return Predicate(column=m.group(1), op="between", lo=lo, hi=hi)
+    m = _COMPARE_RE.match(text)
+    if m:
+        op = "==" if m.group(2) == "=" else m.group(2)
+        return Predicate(column=m.group(1), op=op, lo=_number(m.group(3), text))
+    raise ValueError(f"Invalid filter: {text!r}")
+
+
+@dataclass(frozen=True)
+class SortIndex:
+    """Stable ascending argsort of one column, NaN rows last.
+
+    `desc_order` holds the non-NaN rows by descending value, ties still in
+    row order; `desc_order[n_valid - b : n_valid - a]` are the rows of
+    `order[a:b]` whenever [a, b) does not split a run of equal values.
+    """
+
+    order: np.ndarray
+    sorted_values: np.ndarray
+    n_valid: int
+    desc_order: np.ndarray
+
+
+def build_sort_index(values: np.ndarray) -> SortIndex:
+    v = np.asarray(values, dtype=float)
+    order = np.argsort(v, kind="stable")
+    sorted_values = v[order]
+    n_valid = int(np.count_nonzero(~np.isnan(sorted_values)))
+    # Ties are already in row order, so a stable sort on the negated values
+    # keeps them that way.
+    flip = np.argsort(-sorted_values[:n_valid], kind="stable")
+    return SortIndex(
+        order=order,
+        sorted_values=sorted_values,
+        n_valid=n_valid,
+        desc_order=order[:n_valid][flip],
+    )
+
+
+@dataclass(frozen=True)
+class RowSelection:
+    """Selected rows in display order: `valid` rows, then `tail` (NaN sort keys)."""
+
+    valid: np.ndarray
+    tail: np.ndarray
+
+    @property
+    def total(self) -> int:
+        return int(self.valid.shape[0] + self.tail.shape[0])
+
+    def page(self, offset: int, limit: int) -> np.ndarray:
+        n = self.valid.shape[0]
+        head = self.valid[offset : offset + limit]
+        if offset + limit <= n:
+            return head
+        rest = self.tail[max(0, offset - n) : offset + limit - n]
+        return np.concatenate([head, rest])
+
+
+def select_rows(
+    n_rows: int,
+    column: Callable[[int], np.ndarray],
+    predicates: Sequence[Tuple[int, Predicate]],
+    *,
+    rows: Optional[np.ndarray] = None,
+    sort_col: Optional[int] = None,
+    sort_index: Optional[SortIndex] = None,
+    desc: bool = False,
+) -> RowSelection:
+    """Rows (of `rows`, default all) matching every predicate, optionally sorted.
+
+    `predicates` pairs a file column index with its predicate. When sorting,
+    predicates on the sort column narrow a range of the cached argsort by
+    binary search; only the other predicates (or a row subset) need a
+    boolean mask over the file. Without those, building a page does not
+    touch the rest of the file.
+    """
+
+    if sort_col is None or sort_index is None:
+        keep = _mask(n_rows, column, predicates, rows)
+        picked = np.flatnonzero(keep) if keep is not None else np.arange(n_rows)
+        return RowSelection(valid=picked, tail=picked[:0])
+
+    n = sort_index.n_valid
+    a, b = 0, n
+    others: List[Tuple[int, Predicate]] = []
+    for col, p in predicates:
+        r = p.sorted_range(sort_index.sorted_values[:n]) if col == sort_col else None
+        if r is None:
+            others.append((col, p))
+            continue
+        a, b = max(a, r[0]), min(b, r[1])
+    b = max(a, b)
+
+    # Ranges from sorted_range start and end on runs of equal values, so the
+    # descending order selects the same rows.
+    valid = sort_index.desc_order[n - b : n - a] if desc else sort_index.order[a:b]
+    # NaN keys only survive when nothing filters on the sort column.
+    nan_ok = len(others) == len(predicates)
+    tail = sort_index.order[sort_index.n_valid :] if nan_ok else valid[:0]
+
+    keep = _mask(n_rows, column, others, rows)
+    if keep is not None:
+        valid = valid[keep[valid]]
+        tail = tail[keep[tail]]
+    return RowSelection(valid=valid, tail=tail)
+
+
+def _mask(
+    n_rows: int,
+    column: Callable[[int], np.ndarray],
+    predicates: Sequence[Tuple[int, Predicate]],
+    rows: Optional[np.ndarray],
+) -> Optional[np.ndarray]:
+    if not predicates and rows is None:
+        return None
+    keep = np.ones(n_rows, dtype=bool)
+    if rows is not None:
+        keep[:] = False
+        keep[rows] = True
+    for col, p in predicates:
+        keep &= p.mask(column(col))
+    return keep
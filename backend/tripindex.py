@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .trips import Trip, TripIndex, make_trip, make_trip_index
+
+# Bump when the manifest layout changes so old manifests are ignored.
+MANIFEST_VERSION = 1
+
+# Directory mtimes this recent are not trusted: a change in the same clock
+# tick as the scan would leave the mtime unchanged.
+_MTIME_SETTLE_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class _DirEntry:
+    """What one scan found in a directory, valid while its mtime is unchanged."""
+
+    mtime_ns: int
+    subdirs: Tuple[str, ...]
+    is_trip: bool
+    video: Optional[str]
+
+    def to_json(self) -> dict:
+        return {
+            "mtimeNs": self.mtime_ns,
+            "subdirs": list(self.subdirs),
+            "trip": self.is_trip,
+            "video": self.video,
+        }
+
+    @classmethod
+    def from_json(cls, d: dict) -> "_DirEntry":
+        return cls(
+            mtime_ns=int(d["mtimeNs"]),
+            subdirs=tuple(str(s) for s in d["subdirs"]),
+            is_trip=bool(d["trip"]),
+            video=d.get("video"),
+        )
+
+
+class TripIndexStore:
+    """Trip index kept in a JSON manifest and refreshed incrementally.
+
+    The manifest records, for every directory under the dataset's `D*`
+    folders, its mtime and what listing it found (subdirectories, whether it
+    holds RAW_ACCELEROMETERS.txt, its first video). A refresh stats every
+    directory but only lists the ones whose mtime changed, instead of
+    globbing the whole tree. Adding or removing trips, files or videos
+    changes the mtime of the directory that contains them.
+
+    Hidden directories (e.g. sidecar `.columns`) are not scanned.
+    """
+
+    def __init__(self, dataset_root: Path, manifest_path: Optional[Path] = None):
+        self.dataset_root = dataset_root
+        self.manifest_path = manifest_path
+        self._dirs: Dict[str, _DirEntry] = {}
+        self._index: Optional[TripIndex] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.last_refresh: dict = {}
+
+    def index(self) -> TripIndex:
+        """The current index, built (from the manifest if any) on first use."""
+
+        idx = self._index
+        if idx is None:
+            idx = self.refresh()
+        return idx
+
+    def refresh(self, *, full: bool = False) -> TripIndex:
+        """Rescan changed directories (all of them when `full`)."""
+
+        with self._lock:
+            if not self.dataset_root.exists():
+                raise FileNotFoundError(f"Dataset root not found: {self.dataset_root}")
+            if self._index is None and not full:
+                self._dirs = self._load_manifest()
+
+            t0 = time.perf_counter()
+            previous = {} if full else self._dirs
+            dirs, listed = self._scan(previous)
+            trips: List[Trip] = []
+            for rel, entry in dirs.items():
+                if not entry.is_trip:
+                    continue
+                folder = self.dataset_root / rel
+                video = folder / entry.video if entry.video else None
+                trips.append(make_trip(self.dataset_root, folder, video))
+
+            if dirs != self._dirs:
+                self._save_manifest(dirs)
+            self._dirs = dirs
+            self._index = make_trip_index(trips)
+            self.last_refresh = {
+                "at": time.time(),
+                "full": full,
+                "dirs": len(dirs),
+                "listedDirs": listed,
+                "durationMs": (time.perf_counter() - t0) * 1000.0,
+            }
+            return self._index
+
+    def stats(self) -> dict:
+        idx = self._index
+        return {
+            "trips": len(idx.trips) if idx is not None else None,
+            "manifest": str(self.manifest_path) if self.manifest_path else None,
+            "watching": self._watcher is not None,
+            "lastRefresh": dict(self.last_refresh),
+        }
+
+    def start_watcher(self, interval_s: float) -> None:
+        """Refresh every `interval_s` seconds on a daemon thread."""
+
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval_s):
+                try:
+                    self.refresh()
+                except OSError:
+                    # Dataset temporarily unavailable; keep the last index.
+                    pass
+
+        self._watcher = threading.Thread(
+            target=run, name="trip-index-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join(timeout=5.0)
+        self._watcher = None
+
+    def _scan(self, previous: Dict[str, _DirEntry]) -> Tuple[Dict[str, _DirEntry], int]:
+        dirs: Dict[str, _DirEntry] = {}
+        listed = 0
+        now_ns = time.time_ns()
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            path = self.dataset_root / rel if rel else self.dataset_root
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            entry = previous.get(rel)
+            if entry is None or entry.mtime_ns != mtime_ns:
+                entry = self._list(path, rel, mtime_ns, now_ns)
+                listed += 1
+            dirs[rel] = entry
+            stack.extend(f"{rel}/{d}" if rel else d for d in entry.subdirs)
+        return dirs, listed
+
+    @staticmethod
+    def _list(path: Path, rel: str, mtime_ns: int, now_ns: int) -> _DirEntry:
+        subdirs: List[str] = []
+        files: List[str] = []
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    if e.name.startswith("."):
+                        continue
+                    if e.is_dir():
+                        subdirs.append(e.name)
+                    else:
+                        files.append(e.name)
+        except OSError:
+            pass
+
+        if not rel:
+            # Trip folders are nested under D1..D6.
+            subdirs = [d for d in subdirs if fnmatch.fnmatchcase(d, "D*")]
+        videos = sorted(f for f in files if fnmatch.fnmatchcase(f, "*.mp4"))
+        return _DirEntry(
+            # Force a re-list next time if the mtime could still move.
+            mtime_ns=mtime_ns if now_ns - mtime_ns > _MTIME_SETTLE_NS else -1,
+            subdirs=tuple(sorted(subdirs)),
+            is_trip=bool(rel) and "RAW_ACCELEROMETERS.txt" in files,
+            video=videos[0] if videos else None,
+        )
+
+    def _load_manifest(self) -> Dict[str, _DirEntry]:
+        if self.manifest_path is None:
+            return {}
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if data.get("version") != MANIFEST_VERSION or data.get("root") != str(
+                self.dataset_root.resolve()
+            ):
+                return {}
+            return {rel: _DirEntry.from_json(d) for rel, d in data["dirs"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save_manifest(self, dirs: Dict[str, _DirEntry]) -> None:
+        if self.manifest_path is None:
+            return
+        data = {
+            "version": MANIFEST_VERSION,
+            "root": str(self.dataset_root.resolve()),
+            "dirs": {rel: e.to_json() for rel, e in dirs.items()},
+        }
+        tmp = (
+            self.manifest_path.parent / f".{self.manifest_path.name}.{uuid.uuid4().hex}"
+        )
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.manifest_path)
+        except OSError:
+            # Read-only location: the index still works, just without reuse.
+            tmp.unlink(missing_ok=True)
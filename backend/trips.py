@@ -1,12 +1,28 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Sequence
 
 import numpy as np
 
+from .cache import ArrayCache, file_fingerprint
+from .downsample import DownsampleMethod, downsample_indices
+from .lineindex import (
+    LineIndex,
+    build_line_index,
+    load_line_index,
+    read_rows,
+    save_line_index,
+)
+from .metrics import PARSED_BYTES, stage
+from .parsing import parse_event_file, parse_file
+from .sharedcache import SharedColumnCache
+from .sidecar import FileColumns, SidecarStore
+from .tablequery import SortIndex, build_sort_index, parse_predicate, select_rows
+
 AccelAxis = Literal[
     "x",
     "y",
@@ -33,6 +49,47 @@ _ACCEL_AXIS_TO_COL: dict[AccelAxis, int] = {
 }
 
 
+# Parsed file arrays shared by every loader. main.py sizes the budget from
+# UAH_CACHE_MAX_MB at startup.
+ARRAY_CACHE = ArrayCache(max_bytes=512 * 1024 * 1024)
+
+# Columnar .npy copies of the text files (see backend/ingest.py). main.py
+# configures location/enablement from UAH_SIDECAR_DIR / UAH_SIDECAR.
+SIDECAR_STORE = SidecarStore()
+
+# Columns shared between uvicorn workers (see backend/sharedcache.py); off
+# until main.py sets a root from UAH_SHARED_CACHE / UAH_SHARED_CACHE_DIR.
+SHARED_CACHE = SharedColumnCache()
+
+
+def _parse_columns(path: Path) -> FileColumns:
+    with stage("parse", path.stem):
+        columns = FileColumns.from_mapping(parse_file(path))
+    PARSED_BYTES.inc(path.stat().st_size, file=path.stem)
+    return columns
+
+
+def _build_columns(path: Path) -> FileColumns:
+    return SIDECAR_STORE.load_or_build(path, _parse_columns)
+
+
+def _read_columns(path: Path) -> FileColumns:
+    with stage("load", path.stem):
+        if SHARED_CACHE.enabled:
+            return SHARED_CACHE.load_or_build(path, _build_columns)
+        return _build_columns(path)
+
+
+def _load_columns(path: Path) -> FileColumns:
+    """Columns of `path`, memory-mapped from its sidecar when available.
+
+    The text file is parsed at most once while the result stays cached; a
+    missing or stale sidecar is rebuilt on the way.
+    """
+
+    return ARRAY_CACHE.get(path, _read_columns)
+
+
 @dataclass(frozen=True)
 class Trip:
     id: str
@@ -73,73 +130,24 @@ class GpsTrack:
     speed: np.ndarray
 
 
+def _parse_events(path: Path) -> list[dict]:
+    with stage("parse", "EVENTS"):
+        events = parse_event_file(path)
+    PARSED_BYTES.inc(path.stat().st_size, file="EVENTS")
+    return events
+
+
 def get_events(trip: Trip, *, file_prefix: str | None = None) -> list[dict]:
     out: list[dict] = []
 
     # UAH DriveSet event files are stored per-trip and start with EVENTS.
-    # Format is not strictly enforced here; we parse as:
-    # - ignore empty lines
-    # - ignore lines starting with '#'
-    # - first token: float timestamp (seconds since route start)
-    # - remaining tokens: label text
     for p in sorted(trip.folder_path.glob("EVENTS*")):
         if not p.is_file():
             continue
         if file_prefix and not p.name.startswith(file_prefix):
             continue
         try:
-            with p.open("r", encoding="utf-8", errors="replace") as f:
-                for line in f:
-                    s = line.strip()
-                    if not s or s.startswith("#"):
-                        continue
-                    parts = s.split()
-                    if len(parts) == 0:
-                        continue
-                    try:
-                        t = float(parts[0])
-                    except ValueError:
-                        # Skip header/invalid rows
-                        continue
-
-                    direction = None
-                    label = " ".join(parts[1:]).strip()
-                    extras: list[str] = []
-                    duration_seconds: float | None = None
-
-                    if (
-                        p.name.startswith("EVENTS_LIST_LANE_CHANGES")
-                        and len(parts) >= 2
-                    ):
-                        try:
-                            direction = int(float(parts[1]))
-                        except ValueError:
-                            direction = None
-                        extras = parts[2:]
-                        if len(parts) >= 4:
-                            try:
-                                duration_seconds = float(parts[3])
-                            except ValueError:
-                                duration_seconds = None
-                            if duration_seconds is not None and duration_seconds <= 0:
-                                duration_seconds = None
-                        if direction == 1:
-                            label = "Right"
-                        elif direction == -1:
-                            label = "Left"
-                        else:
-                            label = "LaneChange"
-
-                    out.append(
-                        {
-                            "t": t,
-                            "label": label,
-                            "source": p.name,
-                            "direction": direction,
-                            "extras": extras,
-                            "durationSeconds": duration_seconds,
-                        }
-                    )
+            out.extend(ARRAY_CACHE.get(p, _parse_events, tag="events"))
         except OSError:
             # Ignore unreadable files
             continue
@@ -218,6 +226,52 @@ _TABLE_COLUMN_NAMES: dict[str, list[str]] = {
     ],
 }
 
+# Short names accepted by /table `sort` and `filter` besides `t` and `colN`
+# (N = file column index, as in get_series).
+_TABLE_COLUMN_ALIASES: dict[str, dict[str, int]] = {
+    "RAW_ACCELEROMETERS": dict(_ACCEL_AXIS_TO_COL),
+    "RAW_GPS": {"speed": 1, "lat": 2, "lon": 3},
+}
+
+
+def time_window(
+    t: np.ndarray, t_start: Optional[float] = None, t_end: Optional[float] = None
+) -> slice:
+    """Row range of `t` (ascending, as in every dataset file) within [t_start, t_end].
+
+    Resolved with two binary searches, so the cost does not depend on the
+    trip length.
+    """
+
+    n = int(t.shape[0])
+    lo = 0 if t_start is None else int(np.searchsorted(t, t_start, side="left"))
+    hi = n if t_end is None else int(np.searchsorted(t, t_end, side="right"))
+    return slice(lo, max(lo, hi))
+
+
+def _reduce(
+    t: np.ndarray,
+    values: list[np.ndarray],
+    downsample: int,
+    max_points: Optional[int],
+    method: DownsampleMethod,
+    t_start: Optional[float] = None,
+    t_end: Optional[float] = None,
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    with stage("compute", "reduce"):
+        if t_start is not None or t_end is not None:
+            w = time_window(t, t_start, t_end)
+            t = t[w]
+            values = [v[w] for v in values]
+        if downsample > 1:
+            t = t[::downsample]
+            values = [v[::downsample] for v in values]
+        if max_points is not None:
+            idx = downsample_indices(t, values, max_points, method)
+            t = t[idx]
+            values = [v[idx] for v in values]
+    return t, values
+
 
 def _parse_datetime_prefix(name: str) -> Optional[datetime]:
     if len(name) < 14:
@@ -236,6 +290,33 @@ def _trip_id_from_relative_path(rel: Path) -> str:
     return rel.as_posix().replace("/", "|")
 
 
+def make_trip(dataset_root: Path, folder: Path, video_path: Optional[Path]) -> Trip:
+    rel = folder.relative_to(dataset_root)
+    trip_id = _trip_id_from_relative_path(rel)
+
+    data_start = _parse_datetime_prefix(folder.name)
+    video_start = _parse_datetime_prefix(video_path.name) if video_path else None
+
+    offset_seconds = 0.0
+    if data_start and video_start:
+        offset_seconds = (data_start - video_start).total_seconds()
+
+    return Trip(
+        id=trip_id,
+        folder_path=folder,
+        video_path=video_path,
+        data_start=data_start,
+        video_start=video_start,
+        offset_seconds=offset_seconds,
+    )
+
+
+def make_trip_index(trips: List[Trip]) -> TripIndex:
+    trips = sorted(trips, key=lambda t: t.id)
+    by_id = {t.id: t for t in trips}
+    return TripIndex(trips=trips, by_id=by_id)
+
+
 def build_trip_index(dataset_root: Path) -> TripIndex:
     if not dataset_root.exists():
         raise FileNotFoundError(f"Dataset root not found: {dataset_root}")
@@ -245,37 +326,71 @@ def build_trip_index(dataset_root: Path) -> TripIndex:
     # Trip folders are nested under D1..D6 and contain RAW_ACCELEROMETERS.txt
     for accel_path in dataset_root.glob("D*/**/RAW_ACCELEROMETERS.txt"):
         folder = accel_path.parent
-        rel = folder.relative_to(dataset_root)
-        trip_id = _trip_id_from_relative_path(rel)
 
         # Pick the first mp4 if present
         videos = sorted(folder.glob("*.mp4"))
         video_path = videos[0] if videos else None
 
-        data_start = _parse_datetime_prefix(folder.name)
-        video_start = _parse_datetime_prefix(video_path.name) if video_path else None
-
-        offset_seconds = 0.0
-        if data_start and video_start:
-            offset_seconds = (data_start - video_start).total_seconds()
-
-        trips.append(
-            Trip(
-                id=trip_id,
-                folder_path=folder,
-                video_path=video_path,
-                data_start=data_start,
-                video_start=video_start,
-                offset_seconds=offset_seconds,
-            )
-        )
+        trips.append(make_trip(dataset_root, folder, video_path))
 
-    trips.sort(key=lambda t: t.id)
-    by_id = {t.id: t for t in trips}
-    return TripIndex(trips=trips, by_id=by_id)
+    return make_trip_index(trips)
+
+
+def _columns_resident(path: Path) -> bool:
+    # Parsed columns are already in memory or have a fresh sidecar to map.
+    if ARRAY_CACHE.peek(path) is not None:
+        return True
+    return SIDECAR_STORE.load(path) is not None
+
+
+def _read_line_index(path: Path) -> LineIndex:
+    location = SIDECAR_STORE.line_index_location(path)
+    if SIDECAR_STORE.enabled:
+        index = load_line_index(location, path)
+        if index is not None:
+            return index
+    with stage("parse", "line_index"):
+        index = build_line_index(path)
+    PARSED_BYTES.inc(path.stat().st_size, file=path.stem)
+    if SIDECAR_STORE.enabled:
+        try:
+            save_line_index(location, index)
+        except OSError:
+            pass
+    return index
+
+
+def _load_line_index(path: Path) -> LineIndex:
+    return ARRAY_CACHE.get(path, _read_line_index, tag="lines")
+
+
+def trip_file_path(trip: Trip, file_stem: str) -> Path:
+    """Path of one of the trip's series/table files (ValueError for other names)."""
+
+    if file_stem not in _ALLOWED_SERIES_FILES:
+        raise ValueError(f"File not allowed: {file_stem}")
+    return trip.folder_path / f"{file_stem}.txt"
+
+
+def get_file_columns(trip: Trip, file_stem: str) -> FileColumns:
+    """All columns of one of the trip's files (column 0 is time), via the cache."""
+
+    path = trip_file_path(trip, file_stem)
+    if not path.exists():
+        raise FileNotFoundError(f"{file_stem} not found: {path}")
+    return _load_columns(path)
 
 
-def get_accelerometers(trip: Trip, axis: AccelAxis, downsample: int = 1) -> Series:
+def get_accelerometers(
+    trip: Trip,
+    axis: AccelAxis,
+    downsample: int = 1,
+    *,
+    max_points: Optional[int] = None,
+    method: DownsampleMethod = "minmax",
+    t_start: Optional[float] = None,
+    t_end: Optional[float] = None,
+) -> Series:
     accel_path = trip.folder_path / "RAW_ACCELEROMETERS.txt"
     if not accel_path.exists():
         raise FileNotFoundError(f"RAW_ACCELEROMETERS not found: {accel_path}")
@@ -283,14 +398,10 @@ def get_accelerometers(trip: Trip, axis: AccelAxis, downsample: int = 1) -> Seri
     col = _ACCEL_AXIS_TO_COL[axis]
 
     # File is space-delimited. Column 0 is timestamp since route start.
-    data = np.loadtxt(str(accel_path), dtype=float)
-    t = data[:, 0]
-    v = data[:, col]
-
-    if downsample > 1:
-        t = t[::downsample]
-        v = v[::downsample]
-
+    data = _load_columns(accel_path)
+    t, (v,) = _reduce(
+        data.col(0), [data.col(col)], downsample, max_points, method, t_start, t_end
+    )
     return Series(t=t, v=v)
 
 
@@ -301,7 +412,19 @@ def get_table(
     downsample: int = 1,
     offset: int = 0,
     limit: int = 200,
+    max_points: Optional[int] = None,
+    method: DownsampleMethod = "minmax",
+    sort: Optional[str] = None,
+    desc: bool = False,
+    filters: Sequence[str] = (),
 ) -> tuple[list[str], np.ndarray, int]:
+    """One page of a file as rows, and the number of rows across all pages.
+
+    Rows are the file's (strided or `max_points`-reduced) rows that match
+    every `filters` predicate (see tablequery.parse_predicate), in file order
+    or sorted by the `sort` column.
+    """
+
     if file_stem not in _ALLOWED_SERIES_FILES:
         raise ValueError(f"File not allowed: {file_stem}")
     if downsample < 1:
@@ -315,56 +438,159 @@ def get_table(
     if not path.exists():
         raise FileNotFoundError(f"Table file not found: {path}")
 
-    data = np.loadtxt(str(path), dtype=float)
-    if downsample > 1:
-        data = data[::downsample]
+    predicates = [parse_predicate(f) for f in filters]
+    plain = max_points is None and sort is None and not predicates
+    if plain and not _columns_resident(path):
+        # Cold file: seek to the page through the line index instead of
+        # parsing the whole file.
+        index = _load_line_index(path)
+        n_cols = index.n_cols
+        total = (index.n_rows + downsample - 1) // downsample
+        start = min(offset, total)
+        end = min(start + limit, total)
+        if end > start:
+            rows = range(start * downsample, end * downsample, downsample)
+            with stage("parse", "table_page"):
+                slice_ = read_rows(path, index, rows)
+        else:
+            slice_ = np.empty((0, n_cols), dtype=float)
+        return _table_columns(file_stem, n_cols), slice_, total
+
+    data = _load_columns(path)
+
+    if sort is not None or predicates:
+        if max_points is None:
+            rows = None if downsample == 1 else np.arange(0, data.n_rows, downsample)
+        else:
+            rows = _reduced_rows(data, downsample, max_points, method)
+        resolved = [
+            (_table_column_index(file_stem, p.column, data.n_cols), p)
+            for p in predicates
+        ]
+        sort_col = None
+        sort_index = None
+        if sort is not None:
+            sort_col = _table_column_index(file_stem, sort, data.n_cols)
+            sort_index = _load_sort_index(path, sort_col)
+        with stage("compute", "table_query"):
+            selection = select_rows(
+                data.n_rows,
+                data.col,
+                resolved,
+                rows=rows,
+                sort_col=sort_col,
+                sort_index=sort_index,
+                desc=desc,
+            )
+        total = selection.total
+        slice_ = data.rows(selection.page(min(offset, total), limit))
+    elif max_points is None:
+        total = (data.n_rows + downsample - 1) // downsample
+        start = min(offset, total)
+        end = min(start + limit, total)
+        # Only the requested page is materialized from the (possibly mapped) columns.
+        slice_ = data.rows(slice(start * downsample, end * downsample, downsample))
+    else:
+        picked = _reduced_rows(data, downsample, max_points, method)
+        total = int(picked.shape[0])
+        start = min(offset, total)
+        end = min(start + limit, total)
+        slice_ = data.rows(picked[start:end])
+
+    return _table_columns(file_stem, data.n_cols), slice_, total
+
+
+def _reduced_rows(
+    data: FileColumns, downsample: int, max_points: int, method: DownsampleMethod
+) -> np.ndarray:
+    strided = np.arange(0, data.n_rows, downsample)
+    values = [c[strided] for c in data.columns[1:]]
+    return strided[downsample_indices(data.col(0)[strided], values, max_points, method)]
+
+
+def _table_column_index(file_stem: str, name: str, n_cols: int) -> int:
+    key = name.strip().lower()
+    col = 0 if key == "t" else _TABLE_COLUMN_ALIASES.get(file_stem, {}).get(key)
+    if col is None:
+        m = re.fullmatch(r"col(\d+)", key)
+        col = int(m.group(1)) if m else None
+    if col is None or col >= n_cols:
+        raise ValueError(f"Unknown column: {name}")
+    return col
+
+
+def _load_sort_index(path: Path, col: int) -> SortIndex:
+    # Built once per file column and kept in the array cache (invalidated
+    # with the file like the parsed columns).
+    return ARRAY_CACHE.get(
+        path,
+        lambda p: build_sort_index(_load_columns(p).col(col)),
+        tag=("argsort", col),
+    )
 
-    total = int(data.shape[0])
-    start = min(offset, total)
-    end = min(start + limit, total)
-    slice_ = data[start:end]
 
-    expected_cols = int(data.shape[1]) - 1
+def _table_columns(file_stem: str, n_cols: int) -> list[str]:
+    expected_cols = n_cols - 1
     names = _TABLE_COLUMN_NAMES.get(file_stem)
     if names and len(names) == expected_cols:
         col_names = names
     else:
         col_names = [f"col{i}" for i in range(1, expected_cols + 1)]
 
-    columns = ["t"] + col_names
-    return columns, slice_, total
+    return ["t"] + col_names
 
 
-def get_gps_track(trip: Trip, downsample: int = 1) -> GpsTrack:
+def get_gps_track(
+    trip: Trip,
+    downsample: int = 1,
+    *,
+    max_points: Optional[int] = None,
+    method: DownsampleMethod = "minmax",
+    t_start: Optional[float] = None,
+    t_end: Optional[float] = None,
+) -> GpsTrack:
     gps_path = trip.folder_path / "RAW_GPS.txt"
     if not gps_path.exists():
         raise FileNotFoundError(f"RAW_GPS not found: {gps_path}")
 
-    data = np.loadtxt(str(gps_path), dtype=float)
+    data = _load_columns(gps_path)
     # Column mapping based on dataset reader:
     # 0: timestamp since route start
     # 1: speed (Km/h)
     # 2: latitude
     # 3: longitude
-    t = data[:, 0]
-    speed = data[:, 1]
-    lat = data[:, 2]
-    lon = data[:, 3]
-
-    if downsample > 1:
-        t = t[::downsample]
-        speed = speed[::downsample]
-        lat = lat[::downsample]
-        lon = lon[::downsample]
+    # The envelope is taken on speed first so LTTB keeps its shape; minmax
+    # also keeps lat/lon extremes so the map outline survives.
+    t, (speed, lat, lon) = _reduce(
+        data.col(0),
+        [data.col(1), data.col(2), data.col(3)],
+        downsample,
+        max_points,
+        method,
+        t_start,
+        t_end,
+    )
 
     return GpsTrack(t=t, lat=lat, lon=lon, speed=speed)
 
 
-def get_series(trip: Trip, file_stem: str, col: int, downsample: int = 1) -> Series:
+def get_series(
+    trip: Trip,
+    file_stem: str,
+    col: int,
+    downsample: int = 1,
+    *,
+    max_points: Optional[int] = None,
+    method: DownsampleMethod = "minmax",
+    t_start: Optional[float] = None,
+    t_end: Optional[float] = None,
+) -> Series:
     """Load a (t, v) series from a dataset text file.
 
     - `file_stem`: e.g. RAW_GPS (without .txt)
     - `col`: 1-based column index excluding time (col=1 means 2nd column in file)
+    - `max_points`: cap the result size using `method` (see backend/downsample.py)
+    - `t_start` / `t_end`: only return samples in this time window (seconds)
     """
 
     if file_stem not in _ALLOWED_SERIES_FILES:
@@ -376,25 +602,133 @@ def get_series(trip: Trip, file_stem: str, col: int, downsample: int = 1) -> Ser
     if not path.exists():
         raise FileNotFoundError(f"Series file not found: {path}")
 
-    # Some dataset files can contain non-numeric columns (e.g. OSM road type like
-    # 'motorway'). When the caller requests a single numeric series, read only
-    # the required columns (time + target column) to avoid parse failures.
+    # Non-numeric cells (e.g. OSM road type like 'motorway') are parsed as NaN,
+    # so any numeric column of the file can be served from the cached array.
     col0 = col  # file column index, since data[:,0] is time.
-    data = np.genfromtxt(
-        str(path),
-        dtype=float,
-        usecols=(0, col0),
-        invalid_raise=False,
-    )
+    data = _load_columns(path)
 
-    if data.ndim != 2 or data.shape[1] != 2:
+    if data.n_cols < 2:
         raise ValueError("Failed to parse series file")
 
-    t = data[:, 0]
-    v = data[:, 1]
+    t, (v,) = _reduce(
+        data.col(0), [data.col(col0)], downsample, max_points, method, t_start, t_end
+    )
+    return Series(t=t, v=v)
 
-    if downsample > 1:
-        t = t[::downsample]
-        v = v[::downsample]
 
-    return Series(t=t, v=v)
+def ingest_trip(trip: Trip, *, force: bool = False) -> list[str]:
+    """Build columnar sidecars for every known text file of `trip`.
+
+    Returns the stems that were (re)written; fresh sidecars are left alone
+    unless `force` is set.
+    """
+
+    written: list[str] = []
+    for stem in get_available_series_files(trip):
+        path = trip.folder_path / f"{stem}.txt"
+        if not force and SIDECAR_STORE.load(path) is not None:
+            continue
+        fp = file_fingerprint(path)
+        parsed = _parse_columns(path)
+        if parsed.n_cols == 0:
+            continue
+        SIDECAR_STORE.write(path, parsed.columns, fp)
+        ARRAY_CACHE.invalidate(path)
+        written.append(stem)
+    return written
+
+
+@dataclass(frozen=True)
+class ChannelSpec:
+    key: str
+    file_stem: str
+    col: int
+
+
+def parse_channel_spec(spec: str) -> ChannelSpec:
+    """Parse a bundle channel spec.
+
+    - `accel:<axis>` (or a bare axis name) for RAW_ACCELEROMETERS columns
+    - `series:<FILE>:<col>` (or `<FILE>:<col>`) with the same 1-based `col`
+      as get_series
+    """
+
+    s = spec.strip()
+    parts = s.split(":")
+    if parts[0] == "accel" and len(parts) == 2:
+        parts = parts[1:]
+    if parts[0] == "series" and len(parts) == 3:
+        parts = parts[1:]
+
+    if len(parts) == 1 and parts[0] in _ACCEL_AXIS_TO_COL:
+        axis = parts[0]
+        return ChannelSpec(
+            key=f"accel:{axis}",
+            file_stem="RAW_ACCELEROMETERS",
+            col=_ACCEL_AXIS_TO_COL[axis],  # type: ignore[index]
+        )
+    if len(parts) == 2:
+        file_stem, col_s = parts
+        if file_stem not in _ALLOWED_SERIES_FILES:
+            raise ValueError(f"File not allowed: {file_stem}")
+        try:
+            col = int(col_s)
+        except ValueError:
+            raise ValueError(f"Invalid channel col: {spec}") from None
+        if col < 1:
+            raise ValueError("col must be >= 1")
+        return ChannelSpec(
+            key=f"series:{file_stem}:{col}", file_stem=file_stem, col=col
+        )
+    raise ValueError(f"Invalid channel spec: {spec}")
+
+
+def get_channels(
+    trip: Trip,
+    specs: list[ChannelSpec],
+    downsample: int = 1,
+    *,
+    max_points: Optional[int] = None,
+    method: DownsampleMethod = "minmax",
+    t_start: Optional[float] = None,
+    t_end: Optional[float] = None,
+) -> tuple[dict[str, Series], dict[str, str]]:
+    """Load several channels, touching each underlying file once.
+
+    Returns (series by spec key, error message by spec key). A missing or
+    unparseable file only fails the channels that read from it.
+    """
+
+    by_file: dict[str, list[ChannelSpec]] = {}
+    for spec in specs:
+        by_file.setdefault(spec.file_stem, []).append(spec)
+
+    out: dict[str, Series] = {}
+    errors: dict[str, str] = {}
+    for file_stem, file_specs in by_file.items():
+        path = trip.folder_path / f"{file_stem}.txt"
+        try:
+            if not path.exists():
+                raise FileNotFoundError(f"Series file not found: {path}")
+            data = _load_columns(path)
+        except (FileNotFoundError, ValueError) as e:
+            for spec in file_specs:
+                errors[spec.key] = str(e)
+            continue
+
+        for spec in file_specs:
+            try:
+                t, (v,) = _reduce(
+                    data.col(0),
+                    [data.col(spec.col)],
+                    downsample,
+                    max_points,
+                    method,
+                    t_start,
+                    t_end,
+                )
+            except ValueError as e:
+                errors[spec.key] = str(e)
+                continue
+            out[spec.key] = Series(t=t, v=v)
+    return out, errors
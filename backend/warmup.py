@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+from .trips import (
+    SIDECAR_STORE,
+    Trip,
+    TripIndex,
+    get_available_series_files,
+    get_events,
+    get_file_columns,
+    ingest_trip,
+)
+
+# In run order. "sidecars" converts text files to .npy columns, "cache" loads
+# every file into ARRAY_CACHE (bounded by its budget), "icm" scores all trips
+# at the default parameters and "segments" builds the /api/segments index.
+WARMUP_STEPS = ("index", "sidecars", "cache", "icm", "segments")
+DEFAULT_WARMUP = "index,sidecars,icm"
+
+# Trips scored per compute_icm_for_trips call, so progress moves during "icm".
+_ICM_BATCH = 8
+
+
+def parse_steps(spec: str) -> List[str]:
+    """Steps named in a comma-separated `spec`, in run order ("0" = none)."""
+
+    names = {s.strip() for s in spec.split(",") if s.strip()} - {"0"}
+    unknown = names - set(WARMUP_STEPS)
+    if unknown:
+        raise ValueError(f"Unknown warm-up steps: {', '.join(sorted(unknown))}")
+    return [s for s in WARMUP_STEPS if s in names]
+
+
+class _Step:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = "pending"
+        self.done = 0
+        self.total: Optional[int] = None
+        self.errors = 0
+        self.seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "done": self.done,
+            "total": self.total,
+            "errors": self.errors,
+            "seconds": self.seconds,
+        }
+
+
+class Warmup:
+    """Startup work run on a daemon thread while the server takes requests.
+
+    Per-trip steps use `concurrency` threads of their own, so the data
+    executor stays free for users. A failing trip is counted in the step's
+    `errors` and skipped; a failing step ends the warm-up early, and the
+    server counts as ready either way since it works cold, only slower.
+    """
+
+    def __init__(
+        self,
+        steps: Sequence[str],
+        *,
+        trips: Callable[[], TripIndex],
+        icm: Callable[[List[Trip]], Any],
+        segments: Callable[[TripIndex], Any],
+        concurrency: int = 2,
+    ) -> None:
+        self._steps = [_Step(s) for s in steps]
+        self._trips = trips
+        self._icm = icm
+        self._segments = segments
+        self.concurrency = max(1, concurrency)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return not self._steps or self._finished_at is not None
+
+    def start(self) -> None:
+        if self._thread is not None or not self._steps:
+            return
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> dict:
+        with self._lock:
+            steps = [s.stats() for s in self._steps]
+        running = next((s["name"] for s in steps if s["state"] == "running"), None)
+        end = self._finished_at or time.perf_counter()
+        return {
+            "ready": self.ready,
+            "phase": running or ("done" if self.ready else "starting"),
+            "elapsedSeconds": (
+                end - self._started_at if self._started_at is not None else 0.0
+            ),
+            "error": self._error,
+            "steps": steps,
+        }
+
+    def _run(self) -> None:
+        try:
+            for step in self._steps:
+                if self._stop.is_set():
+                    break
+                t0 = time.perf_counter()
+                with self._lock:
+                    step.state = "running"
+                try:
+                    self._run_step(step)
+                except Exception as e:
+                    with self._lock:
+                        step.state = "failed"
+                    self._error = f"{step.name}: {e}"
+                    break
+                finally:
+                    step.seconds = time.perf_counter() - t0
+                with self._lock:
+                    step.state = "stopped" if self._stop.is_set() else "done"
+        finally:
+            self._finished_at = time.perf_counter()
+
+    def _run_step(self, step: _Step) -> None:
+        idx = self._trips()
+        if step.name == "index":
+            step.total = step.done = len(idx.trips)
+        elif step.name == "sidecars":
+            if SIDECAR_STORE.enabled:
+                self._per_trip(step, idx.trips, ingest_trip)
+            else:
+                step.total = 0
+        elif step.name == "cache":
+            self._per_trip(step, idx.trips, _load_trip)
+        elif step.name == "icm":
+            step.total = len(idx.trips)
+            for i in range(0, len(idx.trips), _ICM_BATCH):
+                if self._stop.is_set():
+                    return
+                batch = idx.trips[i : i + _ICM_BATCH]
+                self._icm(batch)
+                with self._lock:
+                    step.done += len(batch)
+        elif step.name == "segments":
+            step.total = len(idx.trips)
+            self._segments(idx)
+            step.done = step.total
+
+    def _per_trip(
+        self, step: _Step, trips: List[Trip], fn: Callable[[Trip], Any]
+    ) -> None:
+        step.total = len(trips)
+
+        def one(trip: Trip) -> None:
+            if self._stop.is_set():
+                return
+            try:
+                fn(trip)
+            except (OSError, ValueError):
+                with self._lock:
+                    step.errors += 1
+            with self._lock:
+                step.done += 1
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="warmup"
+        ) as pool:
+            list(pool.map(one, trips))
+
+
+def _load_trip(trip: Trip) -> None:
+    for stem in get_available_series_files(trip):
+        get_file_columns(trip, stem)
+    get_events(trip)
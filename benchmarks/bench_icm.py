@@ -0,0 +1,50 @@
+"""Time ICM scoring of every trip with different worker counts.
+
+Usage:
+    python -m benchmarks.bench_icm --dataset-root PATH [--workers 1,2,4,8]
+
+Each worker count runs twice; the second (warm) run is the one to compare,
+since the first also pays for process start-up and the first file parses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from backend.icm import compute_icm_for_trips, shutdown_icm_pool
+from backend.trips import ARRAY_CACHE, build_trip_index
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_icm")
+    parser.add_argument("--dataset-root", type=Path, required=True)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args(argv)
+
+    trips = build_trip_index(args.dataset_root).trips
+    counts = [int(w) for w in args.workers.split(",") if w.strip()]
+
+    print(f"{len(trips)} trips")
+    print(f"{'workers':>7} {'cold (s)':>9} {'warm (s)':>9} {'speedup':>8}")
+    base = None
+    for workers in counts:
+        # Cold run: empty in-process cache and a freshly spawned pool.
+        ARRAY_CACHE.invalidate()
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            compute_icm_for_trips(trips, workers=workers)
+            timings.append(time.perf_counter() - started)
+        shutdown_icm_pool()
+        base = base or timings[1]
+        print(
+            f"{workers:>7} {timings[0]:>9.3f} {timings[1]:>9.3f} "
+            f"{base / timings[1]:>7.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+"""Compare backend.parsing.parse_file against the np.loadtxt / np.genfromtxt
+calls the loaders used before.
+
+Usage:
+    python -m benchmarks.bench_parser [--rows 300000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from backend.parsing import ROAD_TYPES, parse_file
+
+
+def _write_accelerometers(path: Path, rows: int, rng: np.random.Generator) -> None:
+    t = np.arange(rows) * 0.1
+    data = np.column_stack(
+        [
+            t,
+            np.ones(rows),
+            rng.normal(0.0, 0.1, (rows, 6)),
+            rng.normal(0.0, 5.0, (rows, 3)),
+        ]
+    )
+    np.savetxt(path, data, fmt="%.6f")
+
+
+def _write_osm(path: Path, rows: int, rng: np.random.Generator) -> None:
+    roads = np.asarray(ROAD_TYPES[:6])[rng.integers(0, 6, rows)]
+    speed = rng.uniform(0.0, 130.0, rows)
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(rows):
+            f.write(
+                f"{i:.2f} 120 1 {roads[i]} 3 2 40.41234 -3.70123 0.25 {speed[i]:.2f}\n"
+            )
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_parser")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        accel = Path(tmp) / "RAW_ACCELEROMETERS.txt"
+        osm = Path(tmp) / "PROC_OPENSTREETMAP_DATA.txt"
+        _write_accelerometers(accel, args.rows, rng)
+        _write_osm(osm, args.rows, rng)
+
+        cases = [
+            (
+                "accel, all columns",
+                lambda: np.loadtxt(str(accel), dtype=float),
+                lambda: parse_file(accel),
+            ),
+            (
+                "accel, t + x_kf",
+                lambda: np.loadtxt(str(accel), dtype=float),
+                lambda: parse_file(accel, usecols=(0, 5)),
+            ),
+            (
+                "osm, t + maxspeed",
+                lambda: np.genfromtxt(
+                    str(osm), dtype=float, usecols=(0, 1), invalid_raise=False
+                ),
+                lambda: parse_file(osm, usecols=(0, 1)),
+            ),
+            (
+                "osm, all columns",
+                lambda: np.genfromtxt(str(osm), dtype=float, invalid_raise=False),
+                lambda: parse_file(osm),
+            ),
+        ]
+
+        print(f"rows={args.rows} repeat={args.repeat} (best of)")
+        print(f"{'case':<22} {'numpy (s)':>10} {'parse_file (s)':>15} {'speedup':>8}")
+        for name, baseline, candidate in cases:
+            b = _best_of(baseline, args.repeat)
+            c = _best_of(candidate, args.repeat)
+            print(f"{name:<22} {b:>10.3f} {c:>15.3f} {b / c:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
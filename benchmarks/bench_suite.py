@@ -0,0 +1,339 @@
+"""Time the trip index, every loader, ICM scoring and the HTTP endpoints.
+
+Usage:
+    python -m benchmarks.bench_suite [--dataset-root PATH] [--out results.json]
+        [--compare previous.json] [--repeat 5] [--workers 1]
+        [--drivers 6] [--trips-per-driver 2] [--duration-s 600]
+        [--accel-hz 10] [--gps-hz 1] [--seed 0]
+
+Without --dataset-root a synthetic dataset (see benchmarks/synth.py) is
+written to a temporary folder, so runs with the same arguments time the same
+input. Sidecars and indexes always go to a temporary folder, never into the
+dataset. Loaders are timed three ways: `parse` (text, empty cache),
+`sidecar` (.npy columns, empty cache) and `warm` (cached). Endpoints are
+called in-process through the ASGI app, after one untimed request.
+
+Results (min/median/mean per case, plus the git revision and parameters)
+are printed and, with --out, saved as JSON; --compare prints the median
+ratio against a previous file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from benchmarks.synth import SynthConfig, generate_dataset
+
+Result = Dict[str, Any]
+
+
+def _time(
+    fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None
+) -> Result:
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "runs": repeat,
+    }
+
+
+def git_revision() -> Optional[str]:
+    root = Path(__file__).resolve().parents[1]
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return rev + ("-dirty" if dirty else "")
+
+
+async def asgi_get(app: Any, url: str) -> Tuple[int, int]:
+    """GET `url` (percent-encoded) from `app` in-process; returns (status, bytes)."""
+
+    raw_path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": unquote(raw_path),
+        "raw_path": raw_path.encode("ascii"),
+        "query_string": query.encode("ascii"),
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    status = 0
+    size = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, size
+
+
+def _bench_library(
+    trips: List[Any], dataset_root: Path, args: Any
+) -> Dict[str, Result]:
+    from backend.icm import ICM_CACHE, compute_icm_for_trips, compute_trip_icm
+    from backend.tripindex import TripIndexStore
+    from backend.trips import (
+        ARRAY_CACHE,
+        SIDECAR_STORE,
+        build_trip_index,
+        get_accelerometers,
+        get_channels,
+        get_events,
+        get_gps_track,
+        get_series,
+        get_table,
+        ingest_trip,
+        parse_channel_spec,
+    )
+
+    repeat = args.repeat
+    results: Dict[str, Result] = {}
+    results["index/build_trip_index"] = _time(
+        lambda: build_trip_index(dataset_root), repeat
+    )
+    manifest = Path(tempfile.mkdtemp(prefix="uah-bench-index-")) / "trip_index.json"
+    TripIndexStore(dataset_root, manifest).refresh(full=True)
+    results["index/manifest_refresh"] = _time(
+        lambda: TripIndexStore(dataset_root, manifest).refresh(), repeat
+    )
+
+    trip = trips[0]
+    specs = [
+        parse_channel_spec(s)
+        for s in (
+            "accel:x",
+            "accel:y",
+            "accel:z",
+            "RAW_GPS:1",
+            "PROC_OPENSTREETMAP_DATA:1",
+        )
+    ]
+    loaders: Dict[str, Callable[[], Any]] = {
+        "accelerometers": lambda: get_accelerometers(trip, "x", max_points=2000),
+        "gps": lambda: get_gps_track(trip, max_points=2000),
+        "series_osm": lambda: get_series(
+            trip, "PROC_OPENSTREETMAP_DATA", 1, max_points=2000
+        ),
+        "table": lambda: get_table(trip, "RAW_ACCELEROMETERS", offset=100, limit=200),
+        "channels": lambda: get_channels(trip, specs, max_points=2000),
+        "events": lambda: get_events(trip),
+    }
+
+    SIDECAR_STORE.enabled = False
+    for name, fn in loaders.items():
+        results[f"load/{name}/parse"] = _time(fn, repeat, ARRAY_CACHE.invalidate)
+    SIDECAR_STORE.enabled = True
+    for t in trips:
+        ingest_trip(t)
+    for name, fn in loaders.items():
+        results[f"load/{name}/sidecar"] = _time(fn, repeat, ARRAY_CACHE.invalidate)
+    for name, fn in loaders.items():
+        fn()
+        results[f"load/{name}/warm"] = _time(fn, repeat)
+
+    results["icm/trip"] = _time(lambda: compute_trip_icm(trip), repeat)
+    icm_all = lambda: compute_icm_for_trips(trips, workers=args.workers)
+    results["icm/all_trips/cold"] = _time(icm_all, repeat, ARRAY_CACHE.invalidate)
+    icm_all()
+    results["icm/all_trips/warm"] = _time(icm_all, repeat)
+    cached = lambda: compute_icm_for_trips(trips, workers=args.workers, cache=ICM_CACHE)
+    cached()
+    results["icm/all_trips/result_cache"] = _time(cached, repeat)
+    return results
+
+
+def _bench_http(trip_id: str, args: Any) -> Dict[str, Result]:
+    from backend import main as server
+    from backend.icm import ICM_CACHE
+
+    base = f"/api/trips/{quote(trip_id, safe='')}"
+    urls = {
+        "trips": "/api/trips",
+        "accelerometers": f"{base}/accelerometers?axis=x&max_points=2000",
+        "series": f"{base}/series?file=RAW_GPS&col=1&max_points=2000",
+        "gps": f"{base}/gps?max_points=2000",
+        "bundle": (
+            f"{base}/bundle?ch=accel:x&ch=accel:y&ch=RAW_GPS:1"
+            "&include_gps=true&include_events=true&max_points=2000"
+        ),
+        "table": f"{base}/table?file=RAW_ACCELEROMETERS&offset=100&limit=200",
+        "trip_events": f"{base}/events",
+        "evidence": f"{base}/evidence?kind=harsh_brake&only_events=true",
+        "events": "/api/events?type=LANE_CHANGES&limit=500",
+        "segments": "/api/segments?kind=harsh_brake&limit=100",
+        "icm": "/api/icm",
+        "icm_sweep": (
+            "/api/icm/sweep?accel_threshold_g=0.2&accel_threshold_g=0.3"
+            "&speed_margin_kmh=0&speed_margin_kmh=5"
+        ),
+        "metrics": "/api/metrics",
+    }
+
+    loop = asyncio.new_event_loop()
+    results: Dict[str, Result] = {}
+    try:
+        for name, url in urls.items():
+            status, _ = loop.run_until_complete(asgi_get(server.app, url))
+            if status != 200:
+                print(f"  {name}: HTTP {status}, skipped", file=sys.stderr)
+                continue
+            results[f"http/{name}"] = _time(
+                lambda url=url: loop.run_until_complete(asgi_get(server.app, url)),
+                args.repeat,
+            )
+        results["http/icm/uncached"] = _time(
+            lambda: loop.run_until_complete(asgi_get(server.app, urls["icm"])),
+            args.repeat,
+            ICM_CACHE.clear,
+        )
+    finally:
+        loop.close()
+        server.DATA_EXECUTOR.shutdown(wait=True)
+        server.shutdown_icm_pool()
+    return results
+
+
+def _compare(results: Dict[str, Result], previous: Dict[str, Any]) -> None:
+    old = previous.get("results", {})
+    print(f"\n{'case':<34} {'old (ms)':>10} {'new (ms)':>10} {'ratio':>7}")
+    for name, res in results.items():
+        if name not in old:
+            continue
+        before = old[name]["median_s"]
+        after = res["median_s"]
+        ratio = after / before if before > 0 else float("inf")
+        flag = "  slower" if ratio > 1.1 else ("  faster" if ratio < 0.9 else "")
+        print(
+            f"{name:<34} {before * 1e3:>10.3f} {after * 1e3:>10.3f} {ratio:>6.2f}x{flag}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite")
+    parser.add_argument("--dataset-root", type=Path)
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--drivers", type=int, default=6)
+    parser.add_argument("--trips-per-driver", type=int, default=2)
+    parser.add_argument("--duration-s", type=float, default=600.0)
+    parser.add_argument("--accel-hz", type=float, default=10.0)
+    parser.add_argument("--gps-hz", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    synth: Optional[SynthConfig] = None
+    dataset_root = args.dataset_root
+    if dataset_root is None:
+        synth = SynthConfig(
+            drivers=args.drivers,
+            trips_per_driver=args.trips_per_driver,
+            duration_s=args.duration_s,
+            accel_hz=args.accel_hz,
+            gps_hz=args.gps_hz,
+            seed=args.seed,
+        )
+        dataset_root = Path(tempfile.mkdtemp(prefix="uah-bench-data-"))
+        generate_dataset(dataset_root, synth)
+
+    # Read by backend.main on import; keep every write out of the dataset.
+    os.environ["UAH_DATASET_ROOT"] = str(dataset_root)
+    os.environ["UAH_SIDECAR_DIR"] = tempfile.mkdtemp(prefix="uah-bench-columns-")
+    os.environ["UAH_ICM_WORKERS"] = str(args.workers)
+    os.environ.setdefault("UAH_SEGMENT_INDEX", "0")
+    os.environ.setdefault("UAH_TRIP_INDEX", "0")
+
+    from backend import main as server
+
+    trips = server.trip_index().trips
+    if not trips:
+        print(f"No trips found in {dataset_root}", file=sys.stderr)
+        return 1
+    print(f"{len(trips)} trips in {dataset_root}")
+
+    results = _bench_library(trips, dataset_root, args)
+    results.update(_bench_http(trips[0].id, args))
+
+    print(f"\n{'case':<34} {'min (ms)':>10} {'median (ms)':>12}")
+    for name, res in results.items():
+        print(f"{name:<34} {res['min_s'] * 1e3:>10.3f} {res['median_s'] * 1e3:>12.3f}")
+
+    report = {
+        "meta": {
+            "git": git_revision(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "trips": len(trips),
+            "dataset": (
+                {"synthetic": synth.__dict__}
+                if synth is not None
+                else {"root": str(dataset_root)}
+            ),
+        },
+        "results": results,
+    }
+    if args.out is not None:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nSaved {args.out}")
+    if args.compare is not None:
+        _compare(results, json.loads(args.compare.read_text(encoding="utf-8")))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,501 @@
+"""Replay the viewer pages' request pattern at increasing concurrency.
+
+Usage:
+    python -m benchmarks.loadtest [--url http://127.0.0.1:8000 | --in-process]
+        [--concurrency 1,2,4,8,16] [--duration-s 20] [--think-s 0]
+        [--mix viewer=6,compare=2,icm=2] [--server-workers 1]
+        [--out results.json] [--compare previous.json] [--tolerance 0.2]
+        [--dataset-root PATH | --drivers 6 --trips-per-driver 2 ...]
+
+Each virtual user runs sessions back to back; a session is the sequence of
+requests one page makes, awaited one after the other like the browser does:
+
+- viewer (app.js loadTrip): /api/trips, the trip bundle in binary format and
+  the speeding evidence.
+- compare (compare.js): /api/trips, then GPS speed and the x_kf/y_kf/z_kf/yaw
+  accelerometer axes of two trips of one driver against two of another.
+- icm (icm.js): /api/icm, then one trip's evidence, in full and events only.
+
+Without --url a uvicorn server (`--server-workers` processes) is started on a
+free port over --dataset-root or a synthetic dataset (benchmarks/synth.py);
+--in-process calls the ASGI app directly instead. Each session type runs once
+before measuring so levels are not skewed by the first file parses.
+
+Reports p50/p95/p99 latency, requests and sessions per second and error
+rates per level (503s from admission control are counted apart), per route in
+the JSON. With --compare, exits with status 1 if any level's p95 grew or its
+throughput dropped by more than --tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+from benchmarks.bench_suite import git_revision, asgi_get
+from benchmarks.synth import SynthConfig, generate_dataset
+
+# (route name, url) pairs of one page load.
+Session = List[Tuple[str, str]]
+# Sends one GET; returns (status, body bytes).
+Get = Callable[[str], Awaitable[Tuple[int, int]]]
+
+_ACCEL_AXES = ("x_kf", "y_kf", "z_kf", "yaw")
+_EVIDENCE_KINDS = ("speeding", "harsh_accel", "harsh_brake", "harsh_turns")
+_DOWNSAMPLE = 10
+
+
+def _trip_url(trip_id: str, tail: str) -> str:
+    return f"/api/trips/{quote(trip_id, safe='')}/{tail}"
+
+
+def _viewer(trips: List[str], by_driver: Dict[str, List[str]], rng: random.Random):
+    trip = rng.choice(trips)
+    channels = [f"accel:{a}" for a in ("x", "y", "z", "roll", "pitch", "yaw")]
+    channels += [
+        "series:PROC_VEHICLE_DETECTION:1",
+        "series:RAW_GPS:1",
+        "series:PROC_OPENSTREETMAP_DATA:1",
+    ]
+    query = "&".join(f"ch={quote(c)}" for c in channels)
+    return [
+        ("trips", "/api/trips"),
+        (
+            "bundle",
+            _trip_url(
+                trip,
+                f"bundle?{query}&downsample={_DOWNSAMPLE}"
+                "&include_gps=true&include_events=true&format=bin",
+            ),
+        ),
+        (
+            "evidence",
+            _trip_url(trip, "evidence?kind=speeding&only_events=false&max_rows=0"),
+        ),
+    ]
+
+
+def _compare(trips: List[str], by_driver: Dict[str, List[str]], rng: random.Random):
+    drivers = rng.sample(sorted(by_driver), min(2, len(by_driver)))
+    picked = [
+        t for d in drivers for t in rng.sample(by_driver[d], min(2, len(by_driver[d])))
+    ]
+    session: Session = [("trips", "/api/trips")]
+    for trip in picked:
+        session.append(("gps", _trip_url(trip, f"gps?downsample={_DOWNSAMPLE}")))
+    for trip in picked:
+        for axis in _ACCEL_AXES:
+            session.append(
+                (
+                    "accelerometers",
+                    _trip_url(
+                        trip, f"accelerometers?axis={axis}&downsample={_DOWNSAMPLE}"
+                    ),
+                )
+            )
+    return session
+
+
+def _icm(trips: List[str], by_driver: Dict[str, List[str]], rng: random.Random):
+    trip = rng.choice(trips)
+    kind = rng.choice(_EVIDENCE_KINDS)
+    return [
+        ("icm", "/api/icm"),
+        (
+            "evidence",
+            _trip_url(trip, f"evidence?kind={kind}&only_events=false&max_rows=0"),
+        ),
+        (
+            "evidence",
+            _trip_url(trip, f"evidence?kind={kind}&only_events=true&max_rows=0"),
+        ),
+    ]
+
+
+SCENARIOS = {"viewer": _viewer, "compare": _compare, "icm": _icm}
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection, like a browser tab's."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def get(self, url: str) -> Tuple[int, int]:
+        try:
+            return await self._get(url)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _get(self, url: str) -> Tuple[int, int]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        assert self._reader is not None
+        self._writer.write(
+            f"GET {url} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n\r\n".encode(
+                "latin-1"
+            )
+        )
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        if "content-length" in headers:
+            size = len(await self._reader.readexactly(int(headers["content-length"])))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                n = int((await self._reader.readline()).split(b";")[0], 16)
+                await self._reader.readexactly(n + 2)
+                size += n
+                if n == 0:
+                    break
+        else:
+            size = len(await self._reader.read())
+            self.close()
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, size
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1e3, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+async def _run_level(
+    make_get: Callable[[], Tuple[Get, Callable[[], None]]],
+    trips: List[str],
+    by_driver: Dict[str, List[str]],
+    mix: Dict[str, float],
+    concurrency: int,
+    duration_s: float,
+    think_s: float,
+    seed: int,
+) -> Dict[str, Any]:
+    # (route, latency s, status; 0 = connection error)
+    samples: List[Tuple[str, float, int]] = []
+    sessions = 0
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    deadline = time.perf_counter() + duration_s
+
+    async def user(k: int) -> None:
+        nonlocal sessions
+        rng = random.Random(seed * 1000 + k)
+        get, close = make_get()
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                for route, url in SCENARIOS[name](trips, by_driver, rng):
+                    t0 = time.perf_counter()
+                    try:
+                        status, _ = await get(url)
+                    except (
+                        OSError,
+                        ValueError,
+                        IndexError,
+                        asyncio.IncompleteReadError,
+                    ):
+                        status = 0
+                    samples.append((route, time.perf_counter() - t0, status))
+                sessions += 1
+                if think_s > 0:
+                    await asyncio.sleep(rng.expovariate(1.0 / think_s))
+        finally:
+            close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(k) for k in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    def summary(rows: List[Tuple[str, float, int]]) -> Dict[str, Any]:
+        errors = sum(1 for _, _, s in rows if s == 0 or (s >= 400 and s != 503))
+        rejected = sum(1 for _, _, s in rows if s == 503)
+        ok = [lat for _, lat, s in rows if 200 <= s < 400]
+        return {
+            "requests": len(rows),
+            "error_rate": errors / len(rows) if rows else 0.0,
+            "rejected_rate": rejected / len(rows) if rows else 0.0,
+            **_percentiles(ok),
+        }
+
+    routes = sorted({r for r, _, _ in samples})
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "sessions": sessions,
+        "sessions_per_s": sessions / elapsed,
+        "requests_per_s": len(samples) / elapsed,
+        **summary(samples),
+        "routes": {r: summary([s for s in samples if s[0] == r]) for r in routes},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(dataset_root: Path, workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        UAH_DATASET_ROOT=str(dataset_root),
+        UAH_SIDECAR_DIR=tempfile.mkdtemp(prefix="uah-load-columns-"),
+        UAH_TRIP_INDEX="0",
+        UAH_SEGMENT_INDEX="0",
+    )
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=Path(__file__).resolve().parents[1],
+        env=env,
+    )
+    deadline = time.monotonic() + 60.0
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(
+                f"http://127.0.0.1:{port}/api/trips", timeout=2
+            ):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not start within 60 s")
+
+
+def _parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; use {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _check(
+    levels: List[Dict[str, Any]], previous: Dict[str, Any], tolerance: float
+) -> bool:
+    """Print the comparison with `previous`; False if any level regressed."""
+
+    old = {lv["concurrency"]: lv for lv in previous.get("levels", [])}
+    ok = True
+    print(
+        f"\n{'conc':>5} {'req/s old':>10} {'req/s new':>10} {'p95 old':>9} {'p95 new':>9}"
+    )
+    for lv in levels:
+        before = old.get(lv["concurrency"])
+        if before is None:
+            continue
+        slower = lv["p95_ms"] > before["p95_ms"] * (1 + tolerance)
+        fewer = lv["requests_per_s"] < before["requests_per_s"] * (1 - tolerance)
+        flag = "  REGRESSED" if slower or fewer else ""
+        ok = ok and not flag
+        print(
+            f"{lv['concurrency']:>5} {before['requests_per_s']:>10.1f} "
+            f"{lv['requests_per_s']:>10.1f} {before['p95_ms']:>9.1f} "
+            f"{lv['p95_ms']:>9.1f}{flag}"
+        )
+    return ok
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url")
+    target.add_argument("--in-process", action="store_true")
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--duration-s", type=float, default=20.0)
+    parser.add_argument("--think-s", type=float, default=0.0)
+    parser.add_argument("--mix", default="viewer=6,compare=2,icm=2")
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dataset-root", type=Path)
+    parser.add_argument("--drivers", type=int, default=6)
+    parser.add_argument("--trips-per-driver", type=int, default=2)
+    parser.add_argument("--trip-duration-s", type=float, default=600.0)
+    args = parser.parse_args(argv)
+
+    mix = _parse_mix(args.mix)
+    levels_n = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    dataset_root = args.dataset_root
+    if args.url is None and dataset_root is None:
+        dataset_root = Path(tempfile.mkdtemp(prefix="uah-load-data-"))
+        generate_dataset(
+            dataset_root,
+            SynthConfig(
+                drivers=args.drivers,
+                trips_per_driver=args.trips_per_driver,
+                duration_s=args.trip_duration_s,
+                seed=args.seed,
+            ),
+        )
+
+    server: Optional[subprocess.Popen] = None
+    if args.in_process:
+        os.environ["UAH_DATASET_ROOT"] = str(dataset_root)
+        os.environ["UAH_SIDECAR_DIR"] = tempfile.mkdtemp(prefix="uah-load-columns-")
+        os.environ.setdefault("UAH_TRIP_INDEX", "0")
+        os.environ.setdefault("UAH_SEGMENT_INDEX", "0")
+        from backend import main as app_module
+
+        def make_get() -> Tuple[Get, Callable[[], None]]:
+            return (lambda url: asgi_get(app_module.app, url)), (lambda: None)
+
+        def list_trips() -> List[str]:
+            return [t.id for t in app_module.trip_index().trips]
+
+        base = "in-process"
+    else:
+        if args.url is None:
+            port = _free_port()
+            server = _start_server(dataset_root, args.server_workers, port)
+            base = f"http://127.0.0.1:{port}"
+        else:
+            base = args.url.rstrip("/")
+        parts = urlsplit(base)
+        host, port = parts.hostname or "127.0.0.1", parts.port or 80
+
+        def make_get() -> Tuple[Get, Callable[[], None]]:
+            conn = _Connection(host, port)
+            return conn.get, conn.close
+
+        def list_trips() -> List[str]:
+            with urllib.request.urlopen(f"{base}/api/trips", timeout=30) as res:
+                return [t["id"] for t in json.load(res)["trips"]]
+
+    async def run() -> List[Dict[str, Any]]:
+        trips = list_trips()
+        if not trips:
+            raise RuntimeError("No trips to load")
+        by_driver: Dict[str, List[str]] = {}
+        for t in trips:
+            by_driver.setdefault(t.split("|", 1)[0], []).append(t)
+
+        # Warm-up: every session type once, untimed.
+        get, close = make_get()
+        try:
+            rng = random.Random(args.seed)
+            for build in (SCENARIOS[n] for n in mix):
+                for _, url in build(trips, by_driver, rng):
+                    await get(url)
+        finally:
+            close()
+
+        levels = []
+        for n in levels_n:
+            level = await _run_level(
+                make_get,
+                trips,
+                by_driver,
+                mix,
+                n,
+                args.duration_s,
+                args.think_s,
+                args.seed,
+            )
+            levels.append(level)
+            print(
+                f"{n:>5} {level['requests_per_s']:>8.1f} {level['sessions_per_s']:>8.2f} "
+                f"{level['p50_ms']:>8.1f} {level['p95_ms']:>8.1f} {level['p99_ms']:>8.1f} "
+                f"{level['error_rate']:>7.2%} {level['rejected_rate']:>7.2%}"
+            )
+        return levels
+
+    print(f"Target {base}, mix {args.mix}, {args.duration_s:g} s per level")
+    print(
+        f"{'conc':>5} {'req/s':>8} {'sess/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'503':>7}"
+    )
+    try:
+        levels = asyncio.run(run())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "git": git_revision(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "target": base,
+            "server_workers": args.server_workers if server is not None else None,
+            "mix": mix,
+            "duration_s": args.duration_s,
+            "think_s": args.think_s,
+            "cpus": os.cpu_count(),
+            "dataset": str(dataset_root) if dataset_root is not None else None,
+        },
+        "levels": levels,
+    }
+    if args.out is not None:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nSaved {args.out}")
+    if args.compare is not None:
+        previous = json.loads(args.compare.read_text(encoding="utf-8"))
+        if not _check(levels, previous, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
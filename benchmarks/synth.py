@@ -0,0 +1,189 @@
+"""Write a synthetic UAH-DriveSet tree (D1..D6 trip folders) for benchmarks.
+
+Usage:
+    python -m benchmarks.synth --out PATH [--drivers 6] [--trips-per-driver 2]
+        [--duration-s 600] [--accel-hz 10] [--gps-hz 1] [--seed 0]
+
+Files follow the layouts the loaders read: RAW_ACCELEROMETERS (11 columns),
+RAW_GPS (12), PROC_OPENSTREETMAP_DATA with string road types, and
+EVENTS_LIST_LANE_CHANGES, plus an empty video whose name starts 10 s before
+the data. Signals are random but plausible (speed follows the road's limit,
+accelerations follow speed changes) and reproducible for a given seed.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# (road type, speed limit km/h), picked per road segment.
+_ROADS = (("motorway", 120.0), ("secondary", 90.0), ("residential", 50.0))
+_BEHAVIORS = ("NORMAL", "AGGRESSIVE", "DROWSY")
+_G = 9.81
+
+
+@dataclass(frozen=True)
+class SynthConfig:
+    drivers: int = 6
+    trips_per_driver: int = 2
+    duration_s: float = 600.0
+    accel_hz: float = 10.0
+    gps_hz: float = 1.0
+    seed: int = 0
+
+
+def _road_segments(n: int, hz: float, rng: np.random.Generator) -> np.ndarray:
+    """Road index per sample, changing every 1-4 minutes."""
+
+    out = np.empty(n, dtype=np.int64)
+    i = 0
+    while i < n:
+        length = int(rng.uniform(60.0, 240.0) * hz)
+        out[i : i + length] = rng.integers(0, len(_ROADS))
+        i += length
+    return out
+
+
+def _speed_profile(limit: np.ndarray, hz: float, rng: np.random.Generator):
+    # Smoothly track the limit with noise; some drivers run over it.
+    target = limit * rng.uniform(0.8, 1.0) + rng.normal(0.0, 4.0, limit.shape)
+    speed = np.empty_like(target)
+    v = 0.0
+    alpha = min(1.0, 0.05 / hz)
+    for i, goal in enumerate(target.tolist()):
+        v += alpha * (goal - v)
+        speed[i] = v
+    return np.clip(speed, 0.0, None)
+
+
+def write_trip(
+    folder: Path, start: datetime, config: SynthConfig, rng: np.random.Generator
+) -> None:
+    folder.mkdir(parents=True, exist_ok=True)
+    video = start - timedelta(seconds=10)
+    (folder / f"{video:%Y%m%d%H%M%S}.mp4").write_bytes(b"")
+
+    # GPS
+    tg = np.arange(0.0, config.duration_s, 1.0 / config.gps_hz)
+    road = _road_segments(tg.size, config.gps_hz, rng)
+    limit = np.asarray([_ROADS[r][1] for r in road.tolist()])
+    speed = _speed_profile(limit, config.gps_hz, rng)
+    # Gentle drift plus the odd sharp turn.
+    turns = np.where(rng.random(tg.size) < 0.01, rng.normal(0.0, 30.0, tg.size), 0.0)
+    heading = np.cumsum(rng.normal(0.0, 2.0, tg.size) + turns)
+    step_km = speed / 3600.0 / config.gps_hz
+    lat = 40.4 + np.cumsum(step_km * np.cos(np.radians(heading))) / 111.0
+    lon = -3.7 + np.cumsum(step_km * np.sin(np.radians(heading))) / 85.0
+    gps = np.column_stack(
+        [
+            tg,
+            speed,
+            lat,
+            lon,
+            rng.normal(650.0, 5.0, tg.size),
+            rng.uniform(3.0, 10.0, tg.size),
+            rng.uniform(3.0, 10.0, tg.size),
+            np.mod(heading, 360.0),
+            np.r_[0.0, np.diff(heading)],
+            rng.uniform(0.0, 1.0, (tg.size, 3)),
+        ]
+    )
+    np.savetxt(folder / "RAW_GPS.txt", gps, fmt="%.6f")
+
+    # OSM, one row per GPS sample
+    with (folder / "PROC_OPENSTREETMAP_DATA.txt").open("w", encoding="utf-8") as f:
+        for i in range(tg.size):
+            name, max_speed = _ROADS[road[i]]
+            reliable = 0 if rng.random() < 0.05 else 1
+            f.write(
+                f"{tg[i]:.2f} {max_speed:.0f} {reliable} {name} 2 1 "
+                f"{lat[i]:.6f} {lon[i]:.6f} {rng.random():.2f} {speed[i]:.2f}\n"
+            )
+
+    # Accelerometers: longitudinal accel follows speed changes (in g)
+    ta = np.arange(0.0, config.duration_s, 1.0 / config.accel_hz)
+    v_ms = np.interp(ta, tg, speed) / 3.6
+    ax = np.gradient(v_ms, ta) / _G if ta.size > 1 else np.zeros_like(ta)
+    spikes = rng.random(ta.size) < 0.002
+    ax = ax + np.where(spikes, rng.normal(0.0, 0.5, ta.size), 0.0)
+    noisy = rng.normal(0.0, 0.05, (ta.size, 3))
+    yaw = np.interp(ta, tg, heading) + rng.normal(0.0, 0.1, ta.size)
+    accel = np.column_stack(
+        [
+            ta,
+            (np.interp(ta, tg, speed) > 50.0).astype(float),
+            ax + noisy[:, 0],
+            noisy[:, 1],
+            1.0 + noisy[:, 2],
+            ax,
+            noisy[:, 1] * 0.5,
+            1.0 + noisy[:, 2] * 0.5,
+            rng.normal(0.0, 2.0, ta.size),
+            rng.normal(0.0, 2.0, ta.size),
+            yaw,
+        ]
+    )
+    np.savetxt(folder / "RAW_ACCELEROMETERS.txt", accel, fmt="%.6f")
+
+    # Lane changes: t, direction, level, duration, lat, lon
+    with (folder / "EVENTS_LIST_LANE_CHANGES.txt").open("w", encoding="utf-8") as f:
+        t = rng.uniform(10.0, 60.0)
+        while t < config.duration_s:
+            i = min(int(t * config.gps_hz), tg.size - 1)
+            f.write(
+                f"{t:.2f} {rng.choice((-1, 1))} {rng.integers(1, 4)} "
+                f"{rng.uniform(1.0, 6.0):.2f} {lat[i]:.6f} {lon[i]:.6f}\n"
+            )
+            t += rng.uniform(20.0, 120.0)
+
+
+def generate_dataset(root: Path, config: SynthConfig = SynthConfig()) -> list[Path]:
+    """Write `config.drivers` x `config.trips_per_driver` trips under `root`."""
+
+    rng = np.random.default_rng(config.seed)
+    folders: list[Path] = []
+    start = datetime(2016, 1, 1, 8, 0, 0)
+    for d in range(1, config.drivers + 1):
+        for k in range(config.trips_per_driver):
+            start += timedelta(hours=3)
+            behavior = _BEHAVIORS[k % len(_BEHAVIORS)]
+            road = "MOTORWAY" if k % 2 == 0 else "SECONDARY"
+            km = int(config.duration_s / 3600.0 * 100.0)
+            folder = (
+                root / f"D{d}" / f"{start:%Y%m%d%H%M%S}-{km}km-D{d}-{behavior}-{road}"
+            )
+            write_trip(folder, start, config, rng)
+            folders.append(folder)
+    return folders
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synth")
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--drivers", type=int, default=6)
+    parser.add_argument("--trips-per-driver", type=int, default=2)
+    parser.add_argument("--duration-s", type=float, default=600.0)
+    parser.add_argument("--accel-hz", type=float, default=10.0)
+    parser.add_argument("--gps-hz", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = SynthConfig(
+        drivers=args.drivers,
+        trips_per_driver=args.trips_per_driver,
+        duration_s=args.duration_s,
+        accel_hz=args.accel_hz,
+        gps_hz=args.gps_hz,
+        seed=args.seed,
+    )
+    folders = generate_dataset(args.out, config)
+    print(f"{len(folders)} trips written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
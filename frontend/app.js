@@ -343,6 +343,47 @@ function safeNumber(v, fallback) {
   return Number.isFinite(n) ? n : fallback;
 }
 
+// Decode the binary column format served with `format=bin`
+// (see backend/encoding.py). Returns typed arrays keyed by column name.
+function decodeColumns(buffer) {
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== "UAHB") throw new Error("Unexpected binary payload");
+  const headerLen = new DataView(buffer).getUint32(4, true);
+  const header = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, 8, headerLen))
+  );
+  const start = 8 + headerLen;
+  const columns = {};
+  for (const spec of header.columns || []) {
+    const Ctor = spec.dtype === "<f4" ? Float32Array : Float64Array;
+    const arr = new Ctor(buffer, start + spec.offset, spec.length);
+    if (spec.delta) {
+      const out = new Float64Array(spec.length);
+      let acc = 0;
+      for (let i = 0; i < arr.length; i++) {
+        acc += arr[i];
+        out[i] = acc;
+      }
+      columns[spec.name] = out;
+    } else {
+      columns[spec.name] = arr;
+    }
+  }
+  return { meta: header.meta || {}, columns };
+}
+
+function channelKeyForSpec(spec) {
+  return spec.kind === "accelerometers"
+    ? `accel:${spec.axis}`
+    : `series:${spec.file}:${spec.col}`;
+}
+
+function shiftTimes(tArr, offsetSeconds) {
+  return Array.from(tArr || [], (n) =>
+    Number.isFinite(n) ? n + offsetSeconds : n
+  );
+}
+
 const els = {
   sidebarToggle: document.getElementById("sidebarToggle"),
   driverSelect: document.getElementById("driverSelect"),
@@ -2130,20 +2171,29 @@ async function loadTripData() {
   const offsetSeconds =
     overrideSeconds == null ? offsetSecondsBase : Number(overrideSeconds) || 0;
 
-  // Determine which per-trip series files exist to avoid noisy network errors
-  // when optional files (e.g. PROC_OPENSTREETMAP_DATA) are missing.
-  state.availableSeriesFiles = null;
-  try {
-    const filesUrl = `/api/trips/${encodeURIComponent(tripId)}/series_files`;
-    const filesRes = await fetch(filesUrl);
-    if (filesRes.ok) {
-      const filesJson = await filesRes.json();
-      const files = Array.isArray(filesJson?.files) ? filesJson.files : [];
-      state.availableSeriesFiles = new Set(files.map((s) => String(s)));
-    }
-  } catch {
-    state.availableSeriesFiles = null;
-  }
+  // Load every panel channel, the OSM max speed overlay, the GPS track and
+  // the events in one request. Missing optional files (e.g.
+  // PROC_OPENSTREETMAP_DATA) come back in `errors` instead of failing.
+  const limitKey = "series:PROC_OPENSTREETMAP_DATA:1";
+  const bundleParams = new URLSearchParams();
+  for (const p of state.panels) {
+    if (p.spec.kind === "computed") continue;
+    bundleParams.append("ch", channelKeyForSpec(p.spec));
+  }
+  bundleParams.append("ch", limitKey);
+  bundleParams.set("downsample", String(state.downsample));
+  bundleParams.set("include_gps", "true");
+  bundleParams.set("include_events", "true");
+  bundleParams.set("format", "bin");
+  const bundleRes = await fetch(
+    `/api/trips/${encodeURIComponent(tripId)}/bundle?${bundleParams}`
+  );
+  if (!bundleRes.ok) throw new Error(`Failed to load trip (${bundleRes.status})`);
+  const bundle = decodeColumns(await bundleRes.arrayBuffer());
+  const bundleCol = (name) => bundle.columns[name];
+
+  const files = Array.isArray(bundle.meta.files) ? bundle.meta.files : [];
+  state.availableSeriesFiles = new Set(files.map((s) => String(s)));
 
   // Load each panel data
   for (const p of state.panels) {
@@ -2159,46 +2209,20 @@ async function loadTripData() {
       continue;
     }
     if (p.spec.kind === "accelerometers") {
-      const url = `/api/trips/${encodeURIComponent(
-        tripId
-      )}/accelerometers?axis=${encodeURIComponent(
-        p.spec.axis
-      )}&downsample=${encodeURIComponent(state.downsample)}`;
-      const res = await fetch(url);
-      if (!res.ok)
+      const key = channelKeyForSpec(p.spec);
+      if (!bundleCol(`${key}.t`))
         throw new Error(`Failed to load accelerometers axis ${p.spec.axis}`);
-      const json = await res.json();
-      const tRaw = json.t || [];
-      p.t = Array.isArray(tRaw)
-        ? tRaw.map((tt) => {
-            const n = Number(tt);
-            return Number.isFinite(n) ? n + offsetSeconds : n;
-          })
-        : [];
-      p.v = json.v || [];
+      p.t = shiftTimes(bundleCol(`${key}.t`), offsetSeconds);
+      p.v = Array.from(bundleCol(`${key}.v`));
       p.vRaw = Array.from(p.v);
     } else {
-      const url = `/api/trips/${encodeURIComponent(
-        tripId
-      )}/series?file=${encodeURIComponent(
-        p.spec.file
-      )}&col=${encodeURIComponent(p.spec.col)}&downsample=${encodeURIComponent(
-        state.downsample
-      )}`;
-      const res = await fetch(url);
-      if (!res.ok)
+      const key = channelKeyForSpec(p.spec);
+      if (!bundleCol(`${key}.t`))
         throw new Error(
           `Failed to load series ${p.spec.file} col ${p.spec.col}`
         );
-      const json = await res.json();
-      const tRaw = json.t || [];
-      p.t = Array.isArray(tRaw)
-        ? tRaw.map((tt) => {
-            const n = Number(tt);
-            return Number.isFinite(n) ? n + offsetSeconds : n;
-          })
-        : [];
-      p.v = json.v || [];
+      p.t = shiftTimes(bundleCol(`${key}.t`), offsetSeconds);
+      p.v = Array.from(bundleCol(`${key}.v`));
     }
 
     if (p.spec.key === "gps_speed") {
@@ -2238,23 +2262,9 @@ async function loadTripData() {
             "PROC_OPENSTREETMAP_DATA not available for this trip"
           );
         }
-        const limitUrl = `/api/trips/${encodeURIComponent(
-          tripId
-        )}/series?file=${encodeURIComponent(
-          "PROC_OPENSTREETMAP_DATA"
-        )}&col=${encodeURIComponent(1)}&downsample=${encodeURIComponent(
-          state.downsample
-        )}`;
-        const limitRes = await fetch(limitUrl);
-        if (limitRes.ok) {
-          const limitJson = await limitRes.json();
-          const t2 = Array.isArray(limitJson.t)
-            ? limitJson.t.map((tt) => {
-                const n = Number(tt);
-                return Number.isFinite(n) ? n + offsetSeconds : n;
-              })
-            : [];
-          const v2 = Array.isArray(limitJson.v) ? limitJson.v : [];
+        if (bundleCol(`${limitKey}.t`)) {
+          const t2 = shiftTimes(bundleCol(`${limitKey}.t`), offsetSeconds);
+          const v2 = Array.from(bundleCol(`${limitKey}.v`));
 
           if (
             p.chart?.data?.datasets?.[2] &&
@@ -2334,23 +2344,16 @@ async function loadTripData() {
 
   state.events = [];
   try {
-    const eventsUrl = `/api/trips/${encodeURIComponent(
-      tripId
-    )}/events?filePrefix=${encodeURIComponent("")}`;
-    const eventsRes = await fetch(eventsUrl);
-    if (eventsRes.ok) {
-      const eventsJson = await eventsRes.json();
-      const raw = Array.isArray(eventsJson.events) ? eventsJson.events : [];
-      state.events = raw
-        .map((e) => {
-          const t = Number(e?.t);
-          return {
-            ...e,
-            t: Number.isFinite(t) ? t + offsetSeconds : e?.t,
-          };
-        })
-        .sort((a, b) => Number(a?.t || 0) - Number(b?.t || 0));
-    }
+    const raw = Array.isArray(bundle.meta.events) ? bundle.meta.events : [];
+    state.events = raw
+      .map((e) => {
+        const t = Number(e?.t);
+        return {
+          ...e,
+          t: Number.isFinite(t) ? t + offsetSeconds : e?.t,
+        };
+      })
+      .sort((a, b) => Number(a?.t || 0) - Number(b?.t || 0));
   } catch {
     state.events = [];
   }
@@ -2384,22 +2387,11 @@ async function loadTripData() {
   state.gps = null;
   state.gpsRaw = null;
   try {
-    const gpsUrl = `/api/trips/${encodeURIComponent(
-      tripId
-    )}/gps?downsample=${encodeURIComponent(state.downsample)}`;
-    const gpsRes = await fetch(gpsUrl);
-    if (gpsRes.ok) {
-      const gpsJson = await gpsRes.json();
-      const tShifted = Array.isArray(gpsJson.t)
-        ? gpsJson.t.map((tt) => {
-            const n = Number(tt);
-            return Number.isFinite(n) ? n + offsetSeconds : n;
-          })
-        : [];
+    if (bundleCol("gps.t")) {
       state.gpsRaw = {
-        t: tShifted,
-        lat: gpsJson.lat || [],
-        lon: gpsJson.lon || [],
+        t: shiftTimes(bundleCol("gps.t"), offsetSeconds),
+        lat: Array.from(bundleCol("gps.lat")),
+        lon: Array.from(bundleCol("gps.lon")),
       };
       const settings = gpsFilterSettingsFromUi();
       state.gps = applyGpsFilter(state.gpsRaw, settings);
@@ -5,6 +5,9 @@ const els = {
   downsample: document.getElementById("tblDownsample"),
   offset: document.getElementById("tblOffset"),
   limit: document.getElementById("tblLimit"),
+  sort: document.getElementById("tblSort"),
+  desc: document.getElementById("tblDesc"),
+  filter: document.getElementById("tblFilter"),
   prev: document.getElementById("tblPrev"),
   next: document.getElementById("tblNext"),
   load: document.getElementById("tblLoad"),
@@ -58,6 +61,9 @@ function parseQuery() {
     downsample: downsample != null ? safeNumber(downsample, null) : null,
     offset: offset != null ? safeNumber(offset, null) : null,
     limit: limit != null ? safeNumber(limit, null) : null,
+    sort: sp.get("sort") || "",
+    desc: sp.get("desc") === "1",
+    filter: sp.get("filter") || "",
   };
 }
 
@@ -95,6 +101,9 @@ function renderTable(columns, rows, meta) {
       parts.push(`downsample=${meta.downsample}`);
     if (typeof meta?.offset === "number") parts.push(`offset=${meta.offset}`);
     if (typeof meta?.limit === "number") parts.push(`limit=${meta.limit}`);
+    if (meta?.sort) parts.push(`sort=${meta.sort}${meta.desc ? " desc" : ""}`);
+    if (Array.isArray(meta?.filters) && meta.filters.length)
+      parts.push(`filter=${meta.filters.join("; ")}`);
     if (typeof meta?.total === "number") parts.push(`total=${meta.total}`);
     els.meta.textContent = parts.join(" · ");
   }
@@ -204,6 +213,9 @@ async function loadTrips() {
     els.downsample.value = String(q.downsample);
   if (q.offset != null && els.offset) els.offset.value = String(q.offset);
   if (q.limit != null && els.limit) els.limit.value = String(q.limit);
+  if (els.sort) els.sort.value = q.sort;
+  if (els.desc) els.desc.checked = q.desc;
+  if (els.filter) els.filter.value = q.filter;
 
   // Keep query in sync
   const syncQueryFromControls = () => {
@@ -213,6 +225,7 @@ async function loadTrips() {
       downsample: safeNumber(els.downsample?.value, 10),
       offset: Math.max(0, Math.floor(safeNumber(els.offset?.value, 0))),
       limit: Math.max(1, Math.floor(safeNumber(els.limit?.value, 200))),
+      ...sortFilterQuery(),
     });
   };
 
@@ -221,6 +234,30 @@ async function loadTrips() {
     els.downsample.addEventListener("change", syncQueryFromControls);
   if (els.offset) els.offset.addEventListener("change", syncQueryFromControls);
   if (els.limit) els.limit.addEventListener("change", syncQueryFromControls);
+  if (els.sort) els.sort.addEventListener("change", syncQueryFromControls);
+  if (els.desc) els.desc.addEventListener("change", syncQueryFromControls);
+  if (els.filter) els.filter.addEventListener("change", syncQueryFromControls);
+}
+
+function sortFilterQuery() {
+  return {
+    sort: String(els.sort?.value || "").trim(),
+    desc: els.desc?.checked ? "1" : "",
+    filter: String(els.filter?.value || "").trim(),
+  };
+}
+
+// Filter box holds predicates separated by ";" (one `filter` param each).
+function sortFilterParams() {
+  const { sort, desc, filter } = sortFilterQuery();
+  const sp = new URLSearchParams();
+  if (sort) sp.set("sort", sort);
+  if (desc) sp.set("desc", "true");
+  for (const f of filter.split(";")) {
+    if (f.trim()) sp.append("filter", f.trim());
+  }
+  const s = sp.toString();
+  return s ? `&${s}` : "";
 }
 
 async function loadTable() {
@@ -231,13 +268,15 @@ async function loadTable() {
   const offset = Math.max(0, Math.floor(safeNumber(els.offset?.value, 0)));
   const limit = clamp(Math.floor(safeNumber(els.limit?.value, 200)), 1, 2000);
 
-  setQuery({ tripId, file, downsample, offset, limit });
+  setQuery({ tripId, file, downsample, offset, limit, ...sortFilterQuery() });
 
   const url = `/api/trips/${encodeURIComponent(
     tripId
   )}/table?file=${encodeURIComponent(file)}&downsample=${encodeURIComponent(
     downsample
-  )}&offset=${encodeURIComponent(offset)}&limit=${encodeURIComponent(limit)}`;
+  )}&offset=${encodeURIComponent(offset)}&limit=${encodeURIComponent(
+    limit
+  )}${sortFilterParams()}`;
 
   const res = await fetch(url);
   if (!res.ok) {
@@ -251,6 +290,9 @@ async function loadTable() {
     offset: json.offset,
     limit: json.limit,
     total: json.total,
+    sort: json.sort,
+    desc: json.desc,
+    filters: json.filters,
     offsetSeconds: json.offsetSeconds,
   });
 }
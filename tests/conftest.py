@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from backend.trips import ARRAY_CACHE, SIDECAR_STORE, Trip, build_trip_index
+from benchmarks.synth import SynthConfig, generate_dataset
+
+# Small enough to generate in well under a second, large enough for every
+# file to span several line-index strides.
+SYNTH = SynthConfig(drivers=2, trips_per_driver=2, duration_s=300.0, seed=0)
+
+
+@pytest.fixture(scope="session")
+def dataset_root(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    root = tmp_path_factory.mktemp("dataset")
+    generate_dataset(root, SYNTH)
+    return root
+
+
+@pytest.fixture(scope="session")
+def trips(dataset_root: Path) -> List[Trip]:
+    return build_trip_index(dataset_root).trips
+
+
+@pytest.fixture(autouse=True)
+def _isolated_columns(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[None]:
+    # Every test starts cold, with sidecars in its own directory.
+    monkeypatch.setattr(SIDECAR_STORE, "root", tmp_path / "columns")
+    monkeypatch.setattr(SIDECAR_STORE, "enabled", True)
+    ARRAY_CACHE.invalidate()
+    yield
+    ARRAY_CACHE.invalidate()
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.trips import SIDECAR_STORE, _load_columns, _load_sort_index
+
+
+def test_cached_arrays_are_read_only(trips, monkeypatch) -> None:
+    # Parsed in memory, not memory-mapped read-only from a sidecar.
+    monkeypatch.setattr(SIDECAR_STORE, "enabled", False)
+    path = trips[0].folder_path / "RAW_GPS.txt"
+
+    cols = _load_columns(path)
+    assert cols is _load_columns(path)
+    with pytest.raises(ValueError):
+        cols.columns[0][0] = 0.0
+
+    index = _load_sort_index(path, 1)
+    with pytest.raises(ValueError):
+        index.order[0] = 0
+    with pytest.raises(ValueError):
+        index.desc_order[0] = 0
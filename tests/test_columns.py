@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.parsing import parse_file
+from backend.sidecar import FileColumns
+from backend.trips import SIDECAR_STORE, get_file_columns, ingest_trip
+
+STEMS = ("RAW_ACCELEROMETERS", "RAW_GPS", "PROC_OPENSTREETMAP_DATA")
+
+
+def _assert_same(cols: FileColumns, path: Path) -> None:
+    expected = parse_file(path)
+    assert cols.n_cols == len(expected)
+    for i in range(cols.n_cols):
+        np.testing.assert_array_equal(np.asarray(cols.col(i)), expected[i])
+
+
+@pytest.mark.parametrize("stem", STEMS)
+def test_sidecar_matches_parse_file(trips, stem) -> None:
+    trip = trips[0]
+    path = trip.folder_path / f"{stem}.txt"
+    assert stem in ingest_trip(trip)
+
+    cols = SIDECAR_STORE.load(path)
+    assert cols is not None
+    assert all(isinstance(c, np.memmap) for c in cols.columns)
+    _assert_same(cols, path)
+    _assert_same(get_file_columns(trip, stem), path)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backend.encoding import decode_columns, encode_columns
+
+
+@pytest.fixture
+def columns() -> dict:
+    rng = np.random.default_rng(0)
+    t = 12345.678 + np.arange(50_000) * 0.1
+    v = rng.normal(0.0, 1.0, t.shape)
+    v[::97] = np.nan
+    return {"t": t, "v": v, "empty": np.empty(0)}
+
+
+@pytest.mark.parametrize("delta", [(), ("t",)])
+def test_f64_round_trip(columns, delta) -> None:
+    meta, out = decode_columns(
+        encode_columns({"trip": "D1|x", "n": 3}, columns, delta=delta)
+    )
+
+    assert meta == {"trip": "D1|x", "n": 3}
+    assert list(out) == list(columns)
+    np.testing.assert_array_equal(out["v"], columns["v"])
+    np.testing.assert_array_equal(out["empty"], columns["empty"])
+    if delta:
+        np.testing.assert_allclose(out["t"], columns["t"], rtol=0, atol=1e-9)
+    else:
+        np.testing.assert_array_equal(out["t"], columns["t"])
+
+
+@pytest.mark.parametrize("delta", [(), ("t",)])
+def test_f32_round_trip_is_float32_of_the_values(columns, delta) -> None:
+    _, out = decode_columns(encode_columns({}, columns, precision="f32", delta=delta))
+
+    # Delta t decodes to exactly float32(t): no drift along the column.
+    for name in ("t", "v"):
+        expected = columns[name].astype(np.float32).astype(float)
+        np.testing.assert_array_equal(out[name], expected)
+
+
+def test_buffers_are_aligned(columns) -> None:
+    payload = encode_columns({}, columns, precision="f32", delta=("t",))
+    header_len = int.from_bytes(payload[4:8], "little")
+
+    assert payload[:4] == b"UAHB"
+    assert (8 + header_len) % 8 == 0
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import importlib
+import os
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import quote
+
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client(dataset_root: Path, tmp_path_factory: pytest.TempPathFactory) -> Iterator:
+    # backend.main reads its configuration on import.
+    env = pytest.MonkeyPatch()
+    env.setenv("UAH_DATASET_ROOT", str(dataset_root))
+    env.setenv("UAH_SIDECAR_DIR", str(tmp_path_factory.mktemp("server-columns")))
+    env.setenv("UAH_WARMUP", "0")
+    env.setenv("UAH_TRIP_INDEX", "0")
+    env.setenv("UAH_SEGMENT_INDEX", "0")
+    env.setenv("UAH_ICM_WORKERS", "1")
+    main = importlib.import_module("backend.main")
+    try:
+        with TestClient(main.app) as c:
+            yield c
+    finally:
+        env.undo()
+
+
+def _series_url(trip_id: str) -> str:
+    return f"/api/trips/{quote(trip_id, safe='')}/series?file=RAW_GPS&col=1"
+
+
+def test_etag_revalidation_returns_304(client, trips) -> None:
+    url = _series_url(trips[0].id)
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    since = client.get(
+        url, headers={"If-Modified-Since": first.headers["last-modified"]}
+    )
+    assert since.status_code == 304
+
+
+def test_changed_file_gets_a_new_etag(client, trips) -> None:
+    trip = trips[1]
+    url = _series_url(trip.id)
+    etag = client.get(url).headers["etag"]
+
+    path = trip.folder_path / "RAW_GPS.txt"
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_icm_revalidation_returns_304(client) -> None:
+    first = client.get("/api/icm")
+    assert first.status_code == 200
+
+    again = client.get("/api/icm", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pytest
+
+from backend.icm import (
+    ICM_CACHE,
+    compute_icm_for_trips,
+    compute_trip_icm,
+    compute_trip_icm_sweep,
+)
+from backend.trips import Trip
+
+PARAMS = [
+    {},
+    {
+        "speed_margin_kmh": 0.0,
+        "accel_threshold_g": 0.1,
+        "brake_threshold_g": 0.15,
+        "yaw_rate_threshold_dps": 8.0,
+        "default_speed_limit_kmh": 90.0,
+    },
+]
+
+
+def _load(path) -> np.ndarray:
+    # What the loaders did before the parser and caches were added.
+    try:
+        return np.loadtxt(str(path), dtype=float, ndmin=2)
+    except ValueError:
+        return np.atleast_2d(np.genfromtxt(str(path), dtype=float, invalid_raise=False))
+
+
+def _rising(mask: np.ndarray) -> int:
+    return int(np.sum(mask & ~np.r_[False, mask[:-1]])) if mask.size else 0
+
+
+def _baseline_icm(
+    trip: Trip,
+    speed_margin_kmh: float = 5.0,
+    accel_threshold_g: float = 0.25,
+    brake_threshold_g: float = 0.35,
+    yaw_rate_threshold_dps: float = 18.0,
+    default_speed_limit_kmh: float = 120.0,
+) -> dict:
+    """The per-trip scoring as written before TripFeatures, on freshly parsed text."""
+
+    gps = _load(trip.folder_path / "RAW_GPS.txt")
+    t, speed = gps[:, 0], gps[:, 1]
+    dt = np.where(np.diff(t) > 0, np.diff(t), 0.0)
+    duration_s = float(max(0.0, t[-1] - t[0]))
+    distance_km = max(0.0, float(np.sum(np.nan_to_num(speed[:-1]) * dt) / 3600.0))
+
+    osm = _load(trip.folder_path / "PROC_OPENSTREETMAP_DATA.txt")
+    limit = np.full_like(speed, default_speed_limit_kmh)
+    if osm.shape[0] == speed.size:
+        good = np.isfinite(osm[:, 2]) & (osm[:, 2] > 0)
+        limit = np.where(good, osm[:, 1], np.nan)
+    limit = np.where(np.isfinite(limit) & (limit > 0), limit, default_speed_limit_kmh)
+    speeding = np.isfinite(speed) & (speed > limit + speed_margin_kmh)
+    speeding_s = float(np.sum(dt * speeding[:-1]))
+
+    acc = _load(trip.folder_path / "RAW_ACCELEROMETERS.txt")
+    ax = acc[:, 5]
+    accel = _rising(np.isfinite(ax) & (ax >= accel_threshold_g))
+    brake = _rising(np.isfinite(ax) & (ax <= -brake_threshold_g))
+    dt_y = np.diff(acc[:, 0])
+    rate = np.diff(acc[:, 10]) / np.where(dt_y > 0, dt_y, np.nan)
+    turn = _rising(np.isfinite(rate) & (np.abs(rate) >= yaw_rate_threshold_dps))
+
+    hours = max(1e-6, duration_s / 3600.0)
+    km = max(1e-6, distance_km)
+    penalty = (
+        min(45.0, 2.0 * speeding_s / 60.0 / hours)
+        + min(20.0, accel / km * 100.0)
+        + min(25.0, 1.2 * brake / km * 100.0)
+        + min(20.0, 0.8 * turn / km * 100.0)
+    )
+    return {
+        "distanceKm": distance_km,
+        "durationSeconds": duration_s,
+        "speedingSeconds": speeding_s,
+        "harshAccelEvents": accel,
+        "harshBrakeEvents": brake,
+        "harshTurnEvents": turn,
+        "icm": float(max(0.0, min(100.0, 100.0 - penalty))),
+    }
+
+
+def _assert_matches(result: dict, expected: dict) -> None:
+    for name, value in expected.items():
+        assert result[name] == pytest.approx(value, rel=1e-12, abs=1e-12), name
+
+
+@pytest.mark.parametrize("params", PARAMS)
+def test_trip_icm_matches_baseline(trips, params) -> None:
+    for trip in trips:
+        _assert_matches(
+            compute_trip_icm(trip, **params).to_dict(), _baseline_icm(trip, **params)
+        )
+
+
+@pytest.mark.parametrize("params", PARAMS)
+def test_cached_icm_for_trips_matches_baseline(trips, params) -> None:
+    ICM_CACHE.clear()
+    for _ in range(2):  # computed, then served from the result cache
+        results = compute_icm_for_trips(trips, cache=ICM_CACHE, **params)
+        assert [r.trip_id for r in results] == [t.id for t in trips]
+        for trip, r in zip(trips, results):
+            _assert_matches(r.to_dict(), _baseline_icm(trip, **params))
+    ICM_CACHE.clear()
+
+
+# Unsorted and repeated values, and thresholds past every sample, so the
+# per-axis counts cannot rely on the grid being ordered.
+SWEEP = {
+    "speed_margin_kmh": (5.0, 0.0, 40.0),
+    "accel_threshold_g": (0.25, 0.05, 0.25),
+    "brake_threshold_g": (0.35, 0.1, 9.0),
+    "yaw_rate_threshold_dps": (30.0, 2.0, 18.0),
+}
+
+
+def test_sweep_matches_trip_icm_at_every_point(trips) -> None:
+    for trip in trips:
+        sweep = compute_trip_icm_sweep(trip, **SWEEP)
+        assert sweep.icm_scores.shape == (3, 3, 3, 3)
+        for idx in itertools.product(range(3), repeat=4):
+            point = {name: SWEEP[name][i] for name, i in zip(SWEEP, idx)}
+            r = compute_trip_icm(trip, **point)
+            i, j, k, l = idx
+            assert sweep.speeding_s[i] == pytest.approx(r.speeding_s), point
+            assert sweep.harsh_accel_events[j] == r.harsh_accel_events, point
+            assert sweep.harsh_brake_events[k] == r.harsh_brake_events, point
+            assert sweep.harsh_turn_events[l] == r.harsh_turn_events, point
+            assert sweep.icm_scores[idx] == pytest.approx(r.icm_score), point
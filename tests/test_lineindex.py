@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.lineindex import build_line_index, read_rows
+from backend.parsing import parse_file
+from backend.trips import ARRAY_CACHE, SIDECAR_STORE, get_file_columns, get_table
+
+
+def _write_ragged(path: Path, n: int = 2000) -> None:
+    rng = np.random.default_rng(1)
+    lines = ["# header comment"]
+    for i in range(n):
+        r = rng.random()
+        if r < 0.02:
+            lines.append(f"{i} 1 2")
+        elif r < 0.04:
+            lines.append(f"{i} 1 2 3 4 5")
+        elif r < 0.05:
+            lines.append("   ")
+        elif r < 0.06:
+            lines.append("  # indented comment")
+        elif r < 0.07:
+            lines.append(f"{i} 1 2 x # trailing comment")
+        else:
+            lines.append(f"{i} {i * 2} {i * 3} {i % 7}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _parsed(path: Path) -> np.ndarray:
+    cols = parse_file(path)
+    return np.column_stack([cols[i] for i in range(len(cols))])
+
+
+@pytest.mark.parametrize(
+    "rows", [range(0, 50), range(37, 400, 3), range(1500, 1800), range(5, 6)]
+)
+def test_read_rows_matches_parse_file_on_ragged_rows(tmp_path: Path, rows) -> None:
+    path = tmp_path / "RAW_GPS.txt"
+    _write_ragged(path)
+    full = _parsed(path)
+    index = build_line_index(path, stride=16)
+
+    assert index.n_rows == full.shape[0]
+    assert index.n_cols == full.shape[1]
+    np.testing.assert_array_equal(
+        read_rows(path, index, rows), full[rows.start : rows.stop : rows.step]
+    )
+
+
+@pytest.mark.parametrize("stem", ["RAW_ACCELEROMETERS", "RAW_GPS"])
+@pytest.mark.parametrize(
+    "offset,limit,downsample", [(0, 200, 1), (1234, 57, 1), (40, 100, 7)]
+)
+def test_cold_table_pages_match_cached_pages(
+    trips, monkeypatch, stem, offset, limit, downsample
+) -> None:
+    trip = trips[0]
+    # No sidecars and nothing cached: the page is read through the line index.
+    monkeypatch.setattr(SIDECAR_STORE, "enabled", False)
+    names, cold, cold_total = get_table(
+        trip, stem, offset=offset, limit=limit, downsample=downsample
+    )
+    assert ARRAY_CACHE.peek(trip.folder_path / f"{stem}.txt") is None
+
+    get_file_columns(trip, stem)
+    names_warm, warm, warm_total = get_table(
+        trip, stem, offset=offset, limit=limit, downsample=downsample
+    )
+
+    assert names == names_warm
+    assert cold_total == warm_total
+    np.testing.assert_array_equal(cold, warm)
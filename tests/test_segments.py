@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import threading
+
+import backend.segments as segments
+from backend.segments import SegmentIndexStore
+from backend.trips import build_trip_index
+
+
+def test_stale_index_is_served_while_refreshing(dataset_root, monkeypatch) -> None:
+    trips = build_trip_index(dataset_root)
+    store = SegmentIndexStore(max_age_s=0.0)
+    first = store.get(trips)  # The first query builds synchronously.
+
+    release = threading.Event()
+    scanning = threading.Event()
+    fingerprint = segments.trip_fingerprint
+
+    def slow_fingerprint(trip):
+        scanning.set()
+        assert release.wait(10)
+        return fingerprint(trip)
+
+    monkeypatch.setattr(segments, "trip_fingerprint", slow_fingerprint)
+    # Stale: returns the snapshot at once and refreshes in the background.
+    assert store.get(trips) is first
+    assert scanning.wait(10)
+    assert store.get(trips) is first
+
+    release.set()
+    refresh = next(t for t in threading.enumerate() if t.name == "segment-index")
+    refresh.join(10)
+    assert not refresh.is_alive()
+    assert store.last_refresh["detectedTrips"] == 0
+    assert store.get(trips) is first  # Nothing changed, same arrays.
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.parsing import parse_file
+from backend.sharedcache import SharedColumnCache
+from backend.sidecar import FileColumns
+
+STEMS = ("RAW_ACCELEROMETERS", "RAW_GPS", "PROC_OPENSTREETMAP_DATA")
+
+pytestmark = pytest.mark.skipif(
+    not SharedColumnCache(Path(".")).enabled, reason="no flock on this platform"
+)
+
+# Workers are forked so they can run the module-level helpers below.
+_fork = multiprocessing.get_context("fork")
+
+
+def _build(path: Path) -> FileColumns:
+    return FileColumns.from_mapping(parse_file(path))
+
+
+def _assert_same(cols: FileColumns, path: Path) -> None:
+    expected = parse_file(path)
+    assert cols.n_cols == len(expected)
+    for i in range(cols.n_cols):
+        np.testing.assert_array_equal(np.asarray(cols.col(i)), expected[i])
+
+
+def _key(source: Path) -> str:
+    return hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:16]
+
+
+def _worker_load(root: Path, source: Path, log: Path, barrier) -> None:
+    def build(path: Path) -> FileColumns:
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.3)  # Long enough for every other worker to queue up.
+        return _build(path)
+
+    cache = SharedColumnCache(root)
+    barrier.wait()
+    _assert_same(cache.load_or_build(source, build), source)
+
+
+def _worker_hold_lock(root: Path, source: Path, locked) -> None:
+    with SharedColumnCache(root)._locked(_key(source)):
+        locked.set()
+        time.sleep(60)
+
+
+@pytest.mark.parametrize("stem", STEMS)
+def test_shared_cache_matches_parse_file(trips, tmp_path, stem) -> None:
+    cache = SharedColumnCache(tmp_path / "shm")
+    path = trips[1].folder_path / f"{stem}.txt"
+
+    built = cache.load_or_build(path, _build)
+    mapped = cache.load_or_build(path, _build)
+
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert all(isinstance(c, np.memmap) for c in mapped.columns)
+    _assert_same(built, path)
+    _assert_same(mapped, path)
+
+
+def test_concurrent_workers_build_once(trips, tmp_path) -> None:
+    root = tmp_path / "shm"
+    source = trips[0].folder_path / "RAW_GPS.txt"
+    log = tmp_path / "builds.log"
+    n = 4
+    barrier = _fork.Barrier(n)
+    workers = [
+        _fork.Process(target=_worker_load, args=(root, source, log, barrier))
+        for _ in range(n)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(30)
+
+    assert [w.exitcode for w in workers] == [0] * n
+    assert len(log.read_text(encoding="utf-8").split()) == 1
+
+    cache = SharedColumnCache(root)
+    _assert_same(cache.load_or_build(source, _build), source)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_dead_worker_releases_its_lock(trips, tmp_path) -> None:
+    root = tmp_path / "shm"
+    source = trips[0].folder_path / "RAW_GPS.txt"
+    locked = _fork.Event()
+    worker = _fork.Process(target=_worker_hold_lock, args=(root, source, locked))
+    worker.start()
+    assert locked.wait(10)
+    os.kill(worker.pid, signal.SIGKILL)
+    worker.join(10)
+
+    done = threading.Event()
+    cache = SharedColumnCache(root)
+
+    def load() -> None:
+        cache.load_or_build(source, _build)
+        done.set()
+
+    threading.Thread(target=load, daemon=True).start()
+    assert done.wait(10)
+    assert cache.misses == 1
+
+
+def test_evicts_least_recently_used(trips, tmp_path) -> None:
+    cache = SharedColumnCache(tmp_path / "shm")
+    first, second, third = (t.folder_path / "RAW_ACCELEROMETERS.txt" for t in trips[:3])
+    cache.load_or_build(first, _build)
+    cache.load_or_build(second, _build)
+    size = cache.stats()["bytes"]
+    # Room for two entries; `first` is touched last, so `second` goes.
+    cache.max_bytes = size
+    past = time.time() - 60
+    os.utime(cache._store.location(second) / "manifest.json", (past, past))
+    cache.load_or_build(first, _build)
+
+    cache.load_or_build(third, _build)
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache._store.load(second) is None
+    assert cache._store.load(first) is not None
+    assert cache._store.load(third) is not None
+
+
+def test_eviction_removes_temp_dirs_left_by_dead_workers(trips, tmp_path) -> None:
+    cache = SharedColumnCache(tmp_path / "shm")
+    source = trips[0].folder_path / "RAW_GPS.txt"
+    loc = cache._store.location(source)
+    loc.parent.mkdir(parents=True)
+    # What a worker killed halfway through SidecarStore.write leaves behind.
+    stale = loc.parent / f".{loc.name}.dead"
+    stale.mkdir()
+    (stale / "c0.npy").write_bytes(b"\0" * 64)
+    past = time.time() - 3600
+    os.utime(stale, (past, past))
+    # A write still in progress elsewhere.
+    active = loc.parent / f".{loc.name}.active"
+    active.mkdir()
+
+    _assert_same(cache.load_or_build(source, _build), source)
+
+    assert not stale.exists()
+    assert active.exists()
+    assert cache.stats()["entries"] == 1
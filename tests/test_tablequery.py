@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backend.tablequery import build_sort_index, parse_predicate, select_rows
+
+
+def _reference(cols, predicates, sort_col, desc):
+    keep = np.ones(cols.shape[1], dtype=bool)
+    for col, p in predicates:
+        keep &= p.mask(cols[col])
+    rows = np.flatnonzero(keep)
+    keys = cols[sort_col][rows]
+    valid = rows[~np.isnan(keys)]
+    tail = rows[np.isnan(keys)]
+    vkeys = cols[sort_col][valid]
+    # Ties in row order either way; NaN keys last.
+    valid = valid[np.lexsort((valid, -vkeys if desc else vkeys))]
+    return np.concatenate([valid, tail])
+
+
+@pytest.mark.parametrize("desc", [False, True])
+@pytest.mark.parametrize(
+    "filters",
+    [[], ["c1 >= 2"], ["c1 between 1 and 3", "c2 < 5"], ["c2 != 4"], ["c1 == 2"]],
+)
+def test_select_rows_sorts_ties_by_row(desc, filters) -> None:
+    rng = np.random.default_rng(0)
+    cols = rng.integers(0, 6, size=(3, 500)).astype(float)
+    cols[1, rng.random(500) < 0.1] = np.nan
+    predicates = [(int(f[1]), parse_predicate(f)) for f in filters]
+
+    selection = select_rows(
+        cols.shape[1],
+        lambda i: cols[i],
+        predicates,
+        sort_col=1,
+        sort_index=build_sort_index(cols[1]),
+        desc=desc,
+    )
+
+    got = selection.page(0, selection.total)
+    np.testing.assert_array_equal(got, _reference(cols, predicates, 1, desc))